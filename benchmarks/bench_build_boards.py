@@ -0,0 +1,107 @@
+"""Micro-benchmark of the construction of the boards, run with: python -m benchmarks.bench_build_boards
+
+Compares the former implementation (a scan of the boards for each player, then a sort with Board.__lt__) with
+TournamentSnapshotBuilder._build_boards() (a map of the boards by player id, then a sort with precomputed keys), and
+checks that both give the same boards in the same order."""
+import random
+import time
+
+from data.board import Board
+from data.pairing import Pairing
+from data.player import Player
+from data.tournament_snapshot import TournamentSnapshotBuilder, TournamentSnapshotKey
+from data.util import Color, PlayerGender, PlayerTitle, Result
+
+PLAYER_COUNTS: tuple[int, ...] = (100, 500, 2000, )
+ROUNDS: int = 9
+CURRENT_ROUND: int = 5
+REPEAT: int = 5
+
+NAMES: tuple[str, ...] = ('MARTIN', 'BERNARD', 'THOMAS', 'PETIT', 'ROBERT', 'RICHARD', 'DURAND', 'DUBOIS', )
+
+
+def _create_players(player_count: int) -> dict[int, Player]:
+    rnd: random.Random = random.Random(player_count)
+    players_by_id: dict[int, Player] = {
+        1: Player(1, 'EXEMPT', '', PlayerGender.NONE, PlayerTitle.NONE, 0, 'E', 0, False,
+                  {round_: Pairing('R', None, Result.NOT_PAIRED) for round_ in range(1, ROUNDS + 1)}),
+    }
+    for player_id in range(2, player_count + 2):
+        players_by_id[player_id] = Player(
+            player_id, rnd.choice(NAMES), f'Prénom{rnd.randint(1, player_count // 4)}', PlayerGender.MALE,
+            rnd.choice(list(PlayerTitle)), rnd.randint(1000, 2600), 'F', 0, True,
+            {round_: Pairing('R', None, Result.NOT_PAIRED) for round_ in range(1, ROUNDS + 1)})
+    player_ids: list[int] = list(players_by_id)[1:]
+    for round_ in range(1, CURRENT_ROUND + 1):
+        rnd.shuffle(player_ids)
+        if len(player_ids) % 2:
+            players_by_id[player_ids[-1]].pairings[round_] = Pairing(Color.WHITE, 1, Result.PAB_OR_FORFEIT_GAIN_OR_FPB)
+        for white_id, black_id in zip(player_ids[::2], player_ids[1::2]):
+            result: Result = rnd.choice((Result.GAIN, Result.DRAW_OR_HPB, Result.LOSS, ))
+            if round_ == CURRENT_ROUND and rnd.random() < .5:
+                result = Result.NOT_PAIRED
+            players_by_id[white_id].pairings[round_] = Pairing(Color.WHITE, black_id, result)
+            players_by_id[black_id].pairings[round_] = Pairing(Color.BLACK, white_id, result.opposite_result)
+    for player in players_by_id.values():
+        if player.id != 1:
+            player.compute_points(CURRENT_ROUND)
+            player.vpoints = player.points
+    return players_by_id
+
+
+def _former_build_boards(players_by_id: dict[int, Player], current_round: int) -> list[Board]:
+    boards: list[Board] = []
+    for player in players_by_id.values():
+        opponent_id = player.pairings[current_round].opponent_id
+        if opponent_id in players_by_id:
+            player_board: Board | None = None
+            for board in boards:
+                if board.white_player is not None and board.white_player.id == opponent_id:
+                    player_board = board
+                    player_board.black_player = player
+                    break
+                elif board.black_player is not None and board.black_player.id == opponent_id:
+                    player_board = board
+                    player_board.white_player = player
+                    break
+            if player_board is None:
+                if player.pairings[current_round].color == Color.WHITE:
+                    boards.append(Board(white_player=player))
+                else:
+                    boards.append(Board(black_player=player))
+    return sorted(boards, reverse=True)
+
+
+def _build_boards(players_by_id: dict[int, Player], current_round: int) -> list[Board]:
+    builder: TournamentSnapshotBuilder = TournamentSnapshotBuilder.__new__(TournamentSnapshotBuilder)
+    builder._key = TournamentSnapshotKey('bench', 'bench', None)
+    builder._players_by_id = players_by_id
+    builder._current_round = current_round
+    builder._pending_player_ids = {}
+    builder._build_boards()
+    return builder._boards
+
+
+def _time(function, *args) -> tuple[float, list[Board]]:
+    boards: list[Board] = []
+    start: float = time.perf_counter()
+    for _ in range(REPEAT):
+        boards = function(*args)
+    return (time.perf_counter() - start) / REPEAT * 1000, boards
+
+
+def main():
+    print(f'{"players":>8} {"former (ms)":>12} {"_build_boards (ms)":>19}')
+    for player_count in PLAYER_COUNTS:
+        players_by_id: dict[int, Player] = _create_players(player_count)
+        former_time, former_boards = _time(_former_build_boards, players_by_id, CURRENT_ROUND)
+        former_order: list[tuple[int, int]] = [
+            (board.white_player.id, board.black_player.id) for board in former_boards]
+        new_time, new_boards = _time(_build_boards, players_by_id, CURRENT_ROUND)
+        new_order: list[tuple[int, int]] = [(board.white_player.id, board.black_player.id) for board in new_boards]
+        assert new_order == former_order, 'the boards are not in the same order'
+        print(f'{player_count:>8} {former_time:>12.3f} {new_time:>19.3f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Memory benchmark of the data model, run with: python -m benchmarks.bench_memory
+
+Measures the memory allocated for the players (with their pairings) and the boards of a synthetic tournament, with the
+former data model (dataclasses with a __dict__ per instance, a dict of Pairing objects per player) and with the current
+one (slotted dataclasses, pairings stored in a PairingTable)."""
+import random
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass, field, fields, make_dataclass
+from typing import Any
+
+from data.board import Board
+from data.pairing import Pairing
+from data.pairing_table import PairingTable
+from data.player import Player
+from data.util import Color, PlayerGender, PlayerTitle, Result
+
+PLAYERS: int = 2000
+ROUNDS: int = 11
+
+NAMES: tuple[str, ...] = ('MARTIN', 'BERNARD', 'THOMAS', 'PETIT', 'ROBERT', 'RICHARD', 'DURAND', 'DUBOIS', )
+
+
+def _unslotted(cls: type) -> type:
+    """Returns a copy of a slotted dataclass with a __dict__ per instance (the former data model)."""
+    return make_dataclass(
+        cls.__name__,
+        [(f.name, f.type, field(default=f.default, init=f.init)) for f in fields(cls)],
+        frozen=cls.__dataclass_params__.frozen)
+
+
+@dataclass
+class _Tournament:
+    """The pairings of the synthetic tournament, by player id and round."""
+    ratings: dict[int, int]
+    colors: dict[int, list[Color | None]]
+    opponent_ids: dict[int, list[int | None]]
+    results: dict[int, list[Result]]
+
+
+def _create_tournament() -> _Tournament:
+    rnd: random.Random = random.Random(PLAYERS)
+    player_ids: list[int] = list(range(2, PLAYERS + 2))
+    tournament: _Tournament = _Tournament(
+        {player_id: rnd.randint(1000, 2600) for player_id in player_ids},
+        {player_id: [None] * ROUNDS for player_id in player_ids},
+        {player_id: [None] * ROUNDS for player_id in player_ids},
+        {player_id: [Result.NOT_PAIRED] * ROUNDS for player_id in player_ids})
+    for round_index in range(ROUNDS):
+        rnd.shuffle(player_ids)
+        for white_id, black_id in zip(player_ids[::2], player_ids[1::2]):
+            result: Result = rnd.choice((Result.GAIN, Result.DRAW_OR_HPB, Result.LOSS, ))
+            tournament.colors[white_id][round_index] = Color.WHITE
+            tournament.colors[black_id][round_index] = Color.BLACK
+            tournament.opponent_ids[white_id][round_index] = black_id
+            tournament.opponent_ids[black_id][round_index] = white_id
+            tournament.results[white_id][round_index] = result
+            tournament.results[black_id][round_index] = result.opposite_result
+    return tournament
+
+
+def _create_players(
+        tournament: _Tournament, player_class: type, pairing_class: type, pairing_table: bool) -> dict[int, Any]:
+    table: PairingTable = PairingTable(ROUNDS)
+    players_by_id: dict[int, Any] = {}
+    for player_id, rating in tournament.ratings.items():
+        colors: list[Color | None] = tournament.colors[player_id]
+        opponent_ids: list[int | None] = tournament.opponent_ids[player_id]
+        results: list[Result] = tournament.results[player_id]
+        if pairing_table:
+            pairings = table.add_player(player_id, colors, opponent_ids, results)
+        else:
+            pairings = {
+                round_index + 1: pairing_class(color, opponent_id, result)
+                for round_index, (color, opponent_id, result) in enumerate(zip(colors, opponent_ids, results))
+            }
+        player = player_class(
+            player_id, NAMES[player_id % len(NAMES)], f'Prénom{player_id}', PlayerGender.MALE, PlayerTitle.NONE,
+            rating, 'F', 0, True, pairings)
+        player.points = float(sum(result.point_value for result in results))
+        player.vpoints = player.points
+        players_by_id[player_id] = player
+    return players_by_id
+
+
+def _create_boards(players_by_id: dict[int, Any], board_class: type) -> list[Any]:
+    player_ids: list[int] = sorted(players_by_id)
+    return [
+        board_class(index, index + 1, players_by_id[white_id], players_by_id[black_id], Result.NOT_PAIRED)
+        for index, (white_id, black_id) in enumerate(zip(player_ids[::2], player_ids[1::2]))
+    ]
+
+
+def _measure(function: Callable[[], Any]) -> tuple[int, Any]:
+    """Returns the memory allocated by the function (and kept by its result) and its result."""
+    tracemalloc.start()
+    start: int = tracemalloc.get_traced_memory()[0]
+    result: Any = function()
+    size: int = tracemalloc.get_traced_memory()[0] - start
+    tracemalloc.stop()
+    return size, result
+
+
+def main():
+    tournament: _Tournament = _create_tournament()
+    print(f'{PLAYERS} players, {ROUNDS} rounds')
+    print(f'{"":>8} {"bytes per player":>17} {"bytes per board":>16}')
+    for name, player_class, pairing_class, board_class, pairing_table in (
+            ('former', _unslotted(Player), _unslotted(Pairing), _unslotted(Board), False, ),
+            ('current', Player, Pairing, Board, True, ),
+    ):
+        players_size, players_by_id = _measure(
+            lambda: _create_players(tournament, player_class, pairing_class, pairing_table))
+        boards_size, boards = _measure(lambda: _create_boards(players_by_id, board_class))
+        print(f'{name:>8} {players_size / len(players_by_id):>17.0f} {boards_size / len(boards):>16.0f}')
+
+
+if __name__ == '__main__':
+    main()
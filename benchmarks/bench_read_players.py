@@ -0,0 +1,128 @@
+"""Micro-benchmark of the decoding of the players, run with: python -m benchmarks.bench_read_players
+
+Compares the former implementation (a dict per row, three f-string keys per round, the enums decoded by
+from_papi_value()) with PapiDatabase.read_players() (a precompiled projection, rows fetched by batches and decoded by
+index, the enums decoded with lookup tables), on a stand-in cursor serving rows from memory, and checks that both
+read the same players."""
+import random
+import time
+from contextlib import suppress
+from itertools import product
+from typing import Any
+
+from data.pairing_table import PairingTable
+from data.player import Player
+from data.util import Color, PlayerGender, PlayerTitle, Result, TournamentRating
+from database.papi import PapiDatabase, _PLAYER_FIELDS
+
+PLAYER_COUNTS: tuple[int, ...] = (100, 500, 2000, )
+ROUNDS: int = 11
+REPEAT: int = 5
+
+
+class _StandInCursor:
+    """A cursor serving rows from memory, so that only the decoding of the rows is measured."""
+    def __init__(self, columns: list[str], rows: list[tuple]):
+        self.description: list[tuple[str]] = [(column, ) for column in columns]
+        self._rows: list[tuple] = rows
+        self._position: int = 0
+
+    def execute(self, query: str, params: tuple = ()):
+        self._position = 0
+
+    def fetchall(self) -> list[tuple]:
+        rows: list[tuple] = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def fetchmany(self, size: int) -> list[tuple]:
+        rows: list[tuple] = self._rows[self._position:self._position + size]
+        self._position += len(rows)
+        return rows
+
+
+def _create_cursor(player_count: int) -> _StandInCursor:
+    rnd: random.Random = random.Random(player_count)
+    columns: list[str] = list(_PLAYER_FIELDS) + [
+        f'Rd{rd:0>2}{suffix}' for rd, suffix in product(range(1, ROUNDS + 1), ['Cl', 'Adv', 'Res'])]
+    rows: list[tuple] = []
+    for ref in range(1, player_count + 2):
+        row: list[Any] = [
+            ref, f'NOM{ref}', f'Prénom{ref}', rnd.choice(('M', 'F', '')), rnd.choice(('', 'f', 'm', 'g')),
+            0, True, rnd.randint(1000, 2600), 1499, 1499, 'F', 'E', 'N',
+        ]
+        for _ in range(ROUNDS):
+            row += [rnd.choice(('B', 'N', 'R', 'F')), rnd.randint(2, player_count + 1), rnd.randint(0, 6)]
+        rows.append(tuple(row))
+    return _StandInCursor(columns, rows)
+
+
+def _former_read_players(
+        database: PapiDatabase, tournament_rating: TournamentRating, rounds: int) -> dict[int, Player]:
+    players: dict[int, Player] = {}
+    pairing_table: PairingTable = PairingTable(rounds)
+    player_fields: list[str] = [
+        'Ref', 'Nom', 'Prenom', 'Sexe', 'FideTitre', 'Fixe',
+        'Elo', 'Rapide', 'Blitz', 'Fide', 'RapideFide', 'BlitzFide',
+        'Pointe'
+    ]
+    for rd, suffix in product(range(1, rounds + 1), ['Cl', 'Adv', 'Res']):
+        player_fields.append(f'Rd{rd:0>2}{suffix}')
+    query: str = f'SELECT {", ".join(player_fields)} FROM joueur ORDER BY Ref'
+    database._execute(query)
+    for row in database._fetchall():
+        colors: list[Color | str] = []
+        for round_ in range(1, rounds + 1):
+            color: str = row[f'Rd{round_:0>2}Cl']
+            with suppress(ValueError):
+                color = Color.from_papi_value(color)
+            colors.append(color)
+        players[row['Ref']] = Player(
+            row['Ref'], row['Nom'] or '', row['Prenom'] or '',
+            PlayerGender.from_papi_value(row['Sexe']),
+            PlayerTitle.from_papi_value(row['FideTitre']),
+            row[tournament_rating.papi_value_field],
+            row[tournament_rating.papi_type_field],
+            row['Fixe'],
+            row['Pointe'],
+            pairing_table.add_player(
+                row['Ref'],
+                colors,
+                [row[f'Rd{round_:0>2}Adv'] for round_ in range(1, rounds + 1)],
+                [Result.from_papi_value(row[f'Rd{round_:0>2}Res']) for round_ in range(1, rounds + 1)]))
+    return players
+
+
+def _read_players(database: PapiDatabase, tournament_rating: TournamentRating, rounds: int) -> dict[int, Player]:
+    return database.read_players(tournament_rating, rounds)[0]
+
+
+def _time(function, *args) -> tuple[float, dict[int, Player]]:
+    players: dict[int, Player] = {}
+    start: float = time.perf_counter()
+    for _ in range(REPEAT):
+        players = function(*args)
+    return (time.perf_counter() - start) / REPEAT * 1000, players
+
+
+def _describe(players: dict[int, Player]) -> list[tuple]:
+    return [
+        (player.id, player.last_name, player.first_name, player.gender, player.title, player.rating,
+         player.rating_type, player.fixed, player.check_in, list(player.pairings.values()))
+        for player in players.values()
+    ]
+
+
+def main():
+    print(f'{"players":>8} {"former (ms)":>12} {"read_players (ms)":>18}')
+    for player_count in PLAYER_COUNTS:
+        database: PapiDatabase = PapiDatabase.__new__(PapiDatabase)
+        database.cursor = _create_cursor(player_count)
+        former_time, former_players = _time(_former_read_players, database, TournamentRating.STANDARD, ROUNDS)
+        new_time, new_players = _time(_read_players, database, TournamentRating.STANDARD, ROUNDS)
+        assert _describe(new_players) == _describe(former_players), 'the players read are not the same'
+        print(f'{player_count:>8} {former_time:>12.3f} {new_time:>18.3f}')
+
+
+if __name__ == '__main__':
+    main()
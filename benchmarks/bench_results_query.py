@@ -0,0 +1,84 @@
+"""Benchmark of the query of the results screens, run with: python -m benchmarks.bench_results_query
+
+Compares the former query (a JOIN with an OR-chain on the tournament uniq_ids, without index) with
+EventDatabase.get_results() (resolved tournament ids, IN (...) and the index result_date)."""
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+import database.sqlite
+from database.sqlite import EventDatabase
+
+TOURNAMENTS: int = 10
+RESULT_COUNTS: tuple[int, ...] = (1_000, 10_000, 50_000, )
+LIMIT: int = 20
+REPEAT: int = 100
+
+LEGACY_QUERY: str = (
+    'SELECT '
+    '    `tournament`.`uniq_id` as `tournament_uniq_id`, '
+    '    `result`.`round`, `result`.`board_id`, '
+    '    `result`.`white_player_id`, `result`.`black_player_id`, '
+    '    `result`.`date`, `result`.`value` '
+    'FROM `result` '
+    'JOIN `tournament` ON `result`.`tournament_id` = `tournament`.`id` '
+    'WHERE `tournament`.`uniq_id` = ? OR `tournament`.`uniq_id` = ? '
+    'ORDER BY `date` DESC LIMIT ?')
+
+
+def _fill(event_uniq_id: str, results: int):
+    rnd: random.Random = random.Random(results)
+    with EventDatabase(event_uniq_id, 'w') as event_database:
+        tournament_ids: list[int] = [
+            event_database.get_stored_tournament(uniq_id=f't{index}', create_if_absent=True).id
+            for index in range(TOURNAMENTS)
+        ]
+        now: float = time.time()
+        event_database.cursor.executemany(
+            'INSERT INTO `result`(`tournament_id`, `round`, `board_id`, `white_player_id`, `black_player_id`, '
+            '`value`, `date`) VALUES(?, ?, ?, ?, ?, ?, ?)',
+            [
+                (rnd.choice(tournament_ids), rnd.randint(1, 9), rnd.randint(1, 200), rnd.randint(2, 400),
+                 rnd.randint(2, 400), rnd.randint(1, 3), now - rnd.random() * 86400 * 2)
+                for _ in range(results)
+            ])
+        event_database.commit()
+
+
+def _time(function) -> float:
+    start: float = time.perf_counter()
+    for _ in range(REPEAT):
+        function()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+
+def main():
+    db_path: Path = Path(tempfile.mkdtemp())
+    database.sqlite.DB_PATH = db_path
+    try:
+        print(f'{"results":>8} {"former (ms)":>12} {"get_results (ms)":>17}')
+        for results in RESULT_COUNTS:
+            event_uniq_id: str = f'bench-{results}'
+            _fill(event_uniq_id, results)
+            with EventDatabase(event_uniq_id, 'w') as event_database:
+                event_database._execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            # the former schema had no index on the result table
+            legacy_file: Path = db_path / f'legacy-{results}.db'
+            shutil.copy(db_path / f'{event_uniq_id}.db', legacy_file)
+            legacy_database: sqlite3.Connection = sqlite3.connect(legacy_file)
+            for index in ('result_date', 'result_tournament_round_board', ):
+                legacy_database.execute(f'DROP INDEX IF EXISTS `{index}`')
+            legacy_time: float = _time(lambda: legacy_database.execute(LEGACY_QUERY, ('t1', 't2', LIMIT)).fetchall())
+            legacy_database.close()
+            with EventDatabase(event_uniq_id, 'r') as event_database:
+                new_time: float = _time(lambda: list(event_database.get_results(LIMIT, 't1', 't2')))
+            print(f'{results:>8} {legacy_time:>12.3f} {new_time:>17.3f}')
+    finally:
+        shutil.rmtree(db_path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -15,6 +15,7 @@ from common.singleton import singleton
 from data.chessevent_tournament import ChessEventTournament
 from data.event import Event
 from data.tournament import Tournament
+from database.access import close_access_connections
 from database.papi_template import create_empty_papi_database, PAPI_VERSIONS
 from ffe.ffe_session import FFESession
 
@@ -142,6 +143,7 @@ class ActionSelector:
                             if chessevent_tournament.error:
                                 continue
                             chessevent_timeout = chessevent_timeout_min
+                            close_access_connections(tournament.file)
                             tournament.file.unlink(missing_ok=True)
                             create_empty_papi_database(tournament.file, papi_version)
                             players_number: int = tournament.write_chessevent_info_to_database(chessevent_tournament)
@@ -15,6 +15,9 @@ TMP_DIR: Path = Path('tmp')
 
 EVENTS_PATH: Path = Path('events')
 
+# the modification times of the configuration files when last read by this process
+_ini_file_read_times: dict[Path, float] = {}
+
 
 # https://docs.python.org/3/library/configparser.html
 class ConfigReader(ConfigParser):
@@ -43,7 +46,7 @@ class ConfigReader(ConfigParser):
         'tournaments',
     )
 
-    def __init__(self, ini_file: Path, ini_marker_file: Path, silent: bool):
+    def __init__(self, ini_file: Path, silent: bool):
         super().__init__(interpolation=None, empty_lines_in_values=False)
         self.__ini_file: Path = ini_file
         self.__infos: list[str] = []
@@ -56,15 +59,15 @@ class ConfigReader(ConfigParser):
         if not self.ini_file.is_file():
             self.add_error(f'{self.ini_file} n\'est pas un fichier')
             return
+        ini_file_time: float = self.ini_file.lstat().st_mtime
         if silent:
-            try:
-                if ini_marker_file.lstat().st_mtime > self.ini_file.lstat().st_mtime:
-                    self.__silent = True
-                else:
-                    logger.info('le fichier de configuration [%s] a été modifié, rechargement...',
-                                self.ini_file)
-            except FileNotFoundError:
+            if (read_time := _ini_file_read_times.get(self.ini_file)) is None:
                 logger.info('nouveau fichier de configuration [%s], chargement...', self.ini_file)
+            elif read_time == ini_file_time:
+                self.__silent = True
+            else:
+                logger.info('le fichier de configuration [%s] a été modifié, rechargement...',
+                            self.ini_file)
         try:
             files_read: list[str] = []
             encoding: str = 'utf-8-sig'
@@ -85,8 +88,7 @@ class ConfigReader(ConfigParser):
             if str(self.__ini_file) not in files_read:
                 self.add_error(f'impossible de lire {self.__ini_file}')
                 return
-            ini_marker_file.parents[0].mkdir(parents=True, exist_ok=True)
-            ini_marker_file.touch()
+            _ini_file_read_times[self.ini_file] = ini_file_time
         except DuplicateSectionError as dse:
             self.__silent = False
             self.add_error(f'rubrique dupliquée à la ligne {dse.lineno}', dse.section)
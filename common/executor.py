@@ -0,0 +1,67 @@
+"""The bounded thread pool running the blocking work (ODBC and SQLite accesses, file reads and writes) of the web
+handlers, so that a slow Papi file does not stall the event loop.
+
+The number of threads accessing the same database file at the same time is also limited, so that a burst of requests
+on one tournament does not take all the threads of the pool."""
+import asyncio
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import copy_context
+from functools import partial
+from pathlib import Path
+from threading import BoundedSemaphore, Lock, local
+from typing import Any, TypeVar
+
+# the number of threads of the pool
+EXECUTOR_MAX_WORKERS: int = 8
+# the number of threads accessing the same database file at the same time
+EXECUTOR_MAX_WORKERS_PER_FILE: int = 2
+
+T = TypeVar('T')
+
+_executor: ThreadPoolExecutor = ThreadPoolExecutor(max_workers=EXECUTOR_MAX_WORKERS, thread_name_prefix='papi-web')
+
+
+async def run_in_executor(function: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Runs a blocking function in the thread pool and waits for its result without blocking the event loop (in the
+    context of the caller, e.g. a read-only request)."""
+    return await asyncio.get_running_loop().run_in_executor(
+        _executor, copy_context().run, partial(function, *args, **kwargs))
+
+
+class _FileSlots:
+    def __init__(self, slots_per_file: int):
+        self._slots_per_file: int = slots_per_file
+        self._lock: Lock = Lock()
+        self._semaphores: dict[Path, BoundedSemaphore] = {}
+        # the slots already held by the current thread, by file, for the nested accesses
+        self._held: local = local()
+
+    @contextmanager
+    def slot(self, file: Path) -> Iterator[None]:
+        file = file.resolve()
+        held: dict[Path, int] = self._held.__dict__.setdefault('files', {})
+        if held.get(file, 0):
+            held[file] += 1
+            try:
+                yield
+            finally:
+                held[file] -= 1
+            return
+        with self._lock:
+            semaphore: BoundedSemaphore = self._semaphores.setdefault(file, BoundedSemaphore(self._slots_per_file))
+        with semaphore:
+            held[file] = 1
+            try:
+                yield
+            finally:
+                held[file] = 0
+
+
+_file_slots: _FileSlots = _FileSlots(EXECUTOR_MAX_WORKERS_PER_FILE)
+
+
+def file_slot(file: Path):
+    """A context manager waiting for one of the slots of the file, re-entrant for the current thread."""
+    return _file_slots.slot(file)
@@ -0,0 +1,59 @@
+"""The files the events, the screens and the screen sets depend on, read by the update endpoints on each poll.
+
+The dependencies are held in memory and written to a JSON file only when they change (except in the display requests,
+which never write), the JSON files are read once (e.g. after a restart, when the clients poll before the events are
+built again)."""
+import json
+from logging import Logger
+from pathlib import Path
+from threading import Lock
+
+from common.file_watcher import file_watcher
+from common.logger import get_logger
+from common.read_only import writes_allowed
+
+logger: Logger = get_logger()
+
+
+class FileDependencyRegistry:
+    def __init__(self):
+        self._lock: Lock = Lock()
+        # the dependencies by JSON file, an empty list when the JSON file does not exist
+        self._dependencies: dict[Path, list[Path]] = {}
+        # the JSON files not written yet
+        self._unsaved_files: set[Path] = set()
+
+    def get(self, dependencies_file: Path) -> list[Path]:
+        """Returns the files stored in the JSON file (an empty list if not set)."""
+        files: list[Path] | None = self._dependencies.get(dependencies_file)
+        if files is None:
+            try:
+                with open(dependencies_file, 'r', encoding='utf-8') as f:
+                    files = [Path(file) for file in json.load(f)]
+            except FileNotFoundError:
+                files = []
+            with self._lock:
+                files = self._dependencies.setdefault(dependencies_file, files)
+        # a copy, the callers add the dependencies of the screen sets to the dependencies of the screens
+        return list(files)
+
+    def set(self, dependencies_file: Path, files: list[Path]):
+        """Stores the files, the JSON file is written only if they changed."""
+        file_watcher.watch(files)
+        if self.get(dependencies_file) != files:
+            with self._lock:
+                self._dependencies[dependencies_file] = list(files)
+                self._unsaved_files.add(dependencies_file)
+        if dependencies_file not in self._unsaved_files or not writes_allowed():
+            # the display requests never write, the JSON file is written by the next build outside them
+            return
+        self._unsaved_files.discard(dependencies_file)
+        try:
+            dependencies_file.parents[0].mkdir(parents=True, exist_ok=True)
+            with open(dependencies_file, 'w', encoding='utf-8') as f:
+                f.write(json.dumps([str(file) for file in files]))
+        except OSError as e:
+            logger.warning('Les dépendances n\'ont pas pu être écrites dans le fichier [%s] : %s', dependencies_file, e)
+
+
+file_dependencies: FileDependencyRegistry = FileDependencyRegistry()
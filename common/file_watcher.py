@@ -0,0 +1,263 @@
+"""A service watching the files Papi-web depends on (Papi files, configuration files, markers).
+
+Each watched file has a version number in memory, taken from a counter increased each time a change is detected, so
+that the changes can be checked without any system call. The changes are detected with inotify on Linux, and by
+polling the files in a background thread elsewhere (or when inotify is not available)."""
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import secrets
+import struct
+import sys
+import time
+from collections.abc import Callable, Iterable
+from contextlib import suppress
+from itertools import count
+from logging import Logger
+from pathlib import Path
+from threading import Lock, Thread
+
+from common.logger import get_logger
+
+logger: Logger = get_logger()
+
+# the delay between two checks of the polled files
+FILE_WATCHER_POLL_DELAY: float = 1.0
+# the delay waited after an inotify event before checking the files, writes usually come in bursts
+FILE_WATCHER_SETTLE_DELAY: float = 0.1
+
+# inotify events, see inotify(7)
+_IN_MODIFY: int = 0x00000002
+_IN_ATTRIB: int = 0x00000004
+_IN_CLOSE_WRITE: int = 0x00000008
+_IN_MOVED_FROM: int = 0x00000040
+_IN_MOVED_TO: int = 0x00000080
+_IN_CREATE: int = 0x00000100
+_IN_DELETE: int = 0x00000200
+_IN_DELETE_SELF: int = 0x00000400
+_IN_MOVE_SELF: int = 0x00000800
+_IN_IGNORED: int = 0x00008000
+_IN_WATCH_MASK: int = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE
+                       | _IN_DELETE | _IN_DELETE_SELF | _IN_MOVE_SELF)
+_IN_EVENT_HEADER: struct.Struct = struct.Struct('iIII')
+
+
+def get_file_version(file: Path) -> tuple[int, int, int, int] | None:
+    """Returns the identity (device and inode), the modification time and the size of the file, to detect the changes
+    and the replacements of the file, None if the file does not exist."""
+    try:
+        stat: os.stat_result = file.stat()
+        return stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size
+    except OSError:
+        return None
+
+
+class _Inotify:
+    """A minimal ctypes binding of inotify, watching directories."""
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._add_watch.restype = ctypes.c_int
+        self._fd: int = libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1')
+
+    def add_watch(self, directory: Path) -> int:
+        wd: int = self._add_watch(self._fd, os.fsencode(directory), _IN_WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f'inotify_add_watch({directory})')
+        return wd
+
+    def read_events(self) -> Iterable[tuple[int, int, str]]:
+        """Blocks until events are available, yields (watch descriptor, mask, name) tuples."""
+        buffer: bytes = os.read(self._fd, 64 * 1024)
+        offset: int = 0
+        while offset < len(buffer):
+            wd, mask, _, length = _IN_EVENT_HEADER.unpack_from(buffer, offset)
+            offset += _IN_EVENT_HEADER.size
+            name: str = os.fsdecode(buffer[offset:offset + length].rstrip(b'\0'))
+            offset += length
+            yield wd, mask, name
+
+
+class FileWatcher:
+    def __init__(self):
+        # the versions are only meaningful within the same process, this identifier tells the processes apart
+        self.uniq_id: str = secrets.token_hex(4)
+        self._lock: Lock = Lock()
+        self._counter = count(1)
+        self._current_version: int = 0
+        self._versions: dict[Path, int] = {}
+        self._stat_versions: dict[Path, tuple[int, int, int, int] | None] = {}
+        self._listeners: list[Callable[[Path], None]] = []
+        # the functions waking up the coroutines waiting for a change, by file
+        self._waiters: dict[Path, set[Callable[[], None]]] = {}
+        self._inotify: _Inotify | None = None
+        if sys.platform == 'linux':
+            try:
+                self._inotify = _Inotify()
+            except (OSError, AttributeError, TypeError) as e:
+                logger.debug('inotify indisponible, les fichiers seront scrutés (%s)', e)
+        # the files watched by inotify, by watch descriptor and name in the directory
+        self._inotify_files: dict[tuple[int, str], list[Path]] = {}
+        self._inotify_directories: dict[str, int] = {}
+        self._polled_files: set[Path] = set()
+        self._threads_started: bool = False
+
+    @property
+    def current_version(self) -> int:
+        """The version of the last change detected, to be compared later with version()."""
+        return self._current_version
+
+    def version(self, files: Iterable[Path]) -> int:
+        """Returns the version of the last change of the files (0 if no change was detected since they are watched).
+        The files are expected to be watched."""
+        return max((self._versions.get(file, 0) for file in files), default=0)
+
+    def versions(self, files: Iterable[Path]) -> tuple[int, ...]:
+        return tuple(self._versions.get(file, 0) for file in files)
+
+    def add_listener(self, listener: Callable[[Path], None]):
+        """Adds a function called with the file changed, before the version of the file is increased."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    async def wait_for_change(self, files: list[Path], version: int, timeout: float) -> int:
+        """Waits until one of the files changes after the given version or the timeout expires, returns the version
+        of the files. The files are expected to be watched."""
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        changed: asyncio.Event = asyncio.Event()
+
+        def wake_up():
+            with suppress(RuntimeError):  # the loop is closed
+                loop.call_soon_threadsafe(changed.set)
+
+        with self._lock:
+            for file in files:
+                self._waiters.setdefault(file, set()).add(wake_up)
+        try:
+            while (files_version := self.version(files)) <= version:
+                try:
+                    await asyncio.wait_for(changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    return files_version
+                changed.clear()
+            return files_version
+        finally:
+            with self._lock:
+                for file in files:
+                    self._waiters[file].discard(wake_up)
+
+    def watch(self, files: Iterable[Path]):
+        """Starts watching the files (if not already watched)."""
+        new_files: list[Path] = [file for file in files if file not in self._versions]
+        if not new_files:
+            return
+        with self._lock:
+            for file in new_files:
+                if file in self._versions:
+                    continue
+                self._versions[file] = 0
+                self._stat_versions[file] = get_file_version(file)
+                if not self._watch_with_inotify(file):
+                    self._polled_files.add(file)
+            self._start_threads()
+
+    def _watch_with_inotify(self, file: Path) -> bool:
+        if self._inotify is None:
+            return False
+        directory: str = os.path.abspath(file.parent)
+        try:
+            wd: int = self._inotify_directories.get(directory) or self._inotify.add_watch(Path(directory))
+        except OSError as e:
+            # the directory does not exist yet
+            logger.debug('Le répertoire [%s] ne peut pas être surveillé, scrutation de [%s] (%s)', directory, file, e)
+            return False
+        self._inotify_directories[directory] = wd
+        self._inotify_files.setdefault((wd, file.name), []).append(file)
+        return True
+
+    def notify(self, file: Path):
+        """Signals a change of the file made by Papi-web, without waiting for the change to be detected."""
+        if file in self._versions:
+            self._check(file)
+
+    def _check(self, file: Path):
+        # the file can be checked by several threads at the same time (inotify, polling, notify()), the comparison
+        # and the update of the stat version are atomic so that only one of them bumps the version
+        with self._lock:
+            stat_version: tuple[int, int, int, int] | None = get_file_version(file)
+            if stat_version == self._stat_versions.get(file):
+                return
+            self._stat_versions[file] = stat_version
+            listeners: list[Callable[[Path], None]] = list(self._listeners)
+        # the listeners are called without the lock, they may watch other files
+        for listener in listeners:
+            try:
+                listener(file)
+            except Exception as e:
+                logger.warning('Erreur à la prise en compte de la modification de [%s] : %s', file, e)
+        # the version is increased after the listeners are called, so that a client getting the new version also
+        # gets the data they updated
+        with self._lock:
+            version: int = next(self._counter)
+            self._versions[file] = version
+            self._current_version = version
+            waiters: list[Callable[[], None]] = list(self._waiters.get(file, ()))
+        for wake_up in waiters:
+            wake_up()
+
+    def _start_threads(self):
+        if self._threads_started:
+            return
+        self._threads_started = True
+        Thread(target=self._poll, name='file-watcher-poll', daemon=True).start()
+        if self._inotify is not None:
+            Thread(target=self._read_inotify, name='file-watcher-inotify', daemon=True).start()
+
+    def _poll(self):
+        while True:
+            time.sleep(FILE_WATCHER_POLL_DELAY)
+            with self._lock:
+                files: list[Path] = list(self._polled_files)
+            for file in files:
+                self._check(file)
+
+    def _read_inotify(self):
+        while True:
+            try:
+                events: list[tuple[int, int, str]] = list(self._inotify.read_events())
+            except OSError as e:
+                logger.warning('Lecture des évènements inotify impossible, scrutation des fichiers (%s)', e)
+                with self._lock:
+                    for files in self._inotify_files.values():
+                        self._polled_files.update(files)
+                    self._inotify_files.clear()
+                    self._inotify_directories.clear()
+                    self._inotify = None
+                return
+            changed_files: list[Path] = []
+            with self._lock:
+                for wd, mask, name in events:
+                    if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                        # the directory itself disappeared, its files are now polled
+                        for key, files in list(self._inotify_files.items()):
+                            if key[0] == wd:
+                                self._polled_files.update(files)
+                                changed_files += files
+                                del self._inotify_files[key]
+                        for directory, directory_wd in list(self._inotify_directories.items()):
+                            if directory_wd == wd:
+                                del self._inotify_directories[directory]
+                        continue
+                    changed_files += self._inotify_files.get((wd, name), [])
+            if changed_files:
+                time.sleep(FILE_WATCHER_SETTLE_DELAY)
+            for file in dict.fromkeys(changed_files):
+                self._check(file)
+
+
+file_watcher: FileWatcher = FileWatcher()
@@ -1,5 +1,4 @@
 import logging
-import os
 import re
 import socket
 from pathlib import Path
@@ -12,7 +11,7 @@ import uvicorn
 from packaging.version import Version
 
 from common.singleton import singleton
-from common.config_reader import ConfigReader, TMP_DIR
+from common.config_reader import ConfigReader
 from common.logger import get_logger, configure_logger
 
 logger: Logger = get_logger()
@@ -42,7 +41,7 @@ MIN_FFE_UPLOAD_DELAY: int = 60
 @singleton
 class PapiWebConfig:
     def __init__(self):
-        self.reader = ConfigReader(CONFIG_FILE, TMP_DIR / 'config' / f'papi-web.ini.{os.getpid()}.read', silent=False)
+        self.reader = ConfigReader(CONFIG_FILE, silent=False)
         self.__log_level: int | None = None
         self.__web_host: str | None = None
         self.__web_port: int | None = None
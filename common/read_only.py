@@ -0,0 +1,91 @@
+"""The display requests never write to the disk.
+
+The display requests (the GET and HEAD requests of the event and screen pages) are run in a read-only context: the
+event databases are created and upgraded and the configurations compiled at server start or by the other requests,
+and these writes are skipped in a read-only context (see writes_allowed()).
+
+When the environment variable PAPI_WEB_READ_ONLY_CHECK is set (test mode), a file or an SQLite database opened for
+writing in a read-only context raises a ReadOnlyError."""
+import os
+import sys
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import Logger
+from pathlib import Path
+
+from common.exception import PapiWebException
+from common.logger import get_logger
+
+logger: Logger = get_logger()
+
+READ_ONLY_CHECK_ENV: str = 'PAPI_WEB_READ_ONLY_CHECK'
+
+# the flags of the files opened for writing
+_WRITE_FLAGS: int = os.O_WRONLY | os.O_RDWR | os.O_APPEND | os.O_CREAT | os.O_TRUNC
+# the audit events of the other writes (os.replace() raises os.rename, Path.touch() raises open or os.utime)
+_WRITE_AUDIT_EVENTS: frozenset[str] = frozenset((
+    'os.mkdir', 'os.remove', 'os.rename', 'os.rmdir', 'os.truncate', 'os.utime', 'shutil.copyfile', 'shutil.rmtree',
+))
+
+_read_only: ContextVar[bool] = ContextVar('read_only', default=False)
+_check_enabled: bool = False
+
+
+class ReadOnlyError(PapiWebException):
+    pass
+
+
+@contextmanager
+def read_only() -> Iterator[None]:
+    """Runs the code in a read-only context (propagated to the thread pool by run_in_executor())."""
+    token = _read_only.set(True)
+    try:
+        yield
+    finally:
+        _read_only.reset(token)
+
+
+def writes_allowed() -> bool:
+    return not _read_only.get()
+
+
+def check_write(file: Path | str):
+    """To be called before writing a file that should not be written in a read-only context (the write is only
+    logged, except in test mode)."""
+    if _read_only.get():
+        if _check_enabled:
+            raise ReadOnlyError(f'écriture du fichier [{file}] pendant une requête d\'affichage')
+        logger.warning('Écriture du fichier [%s] pendant une requête d\'affichage', file)
+
+
+def _audit(event: str, args: tuple):
+    if not _read_only.get():
+        return
+    if event == 'open':
+        # (path, mode, flags), the flags are set for the files opened by open() and os.open()
+        file, _, flags = args
+        if flags is not None and flags & _WRITE_FLAGS:
+            raise ReadOnlyError(f'fichier [{file}] ouvert en écriture pendant une requête d\'affichage')
+    elif event == 'sqlite3.connect':
+        # (database, ), the SQLite databases are opened in read-only mode (URI file:...?mode=ro)
+        database: str = str(args[0])
+        if not database.startswith('file:') or 'mode=ro' not in database.partition('?')[2].split('&'):
+            raise ReadOnlyError(f'base de données [{database}] ouverte en écriture pendant une requête d\'affichage')
+    elif event in _WRITE_AUDIT_EVENTS:
+        raise ReadOnlyError(f'{event}{args} pendant une requête d\'affichage')
+
+
+def enable_read_only_check():
+    """Enables the test mode, the files opened for writing in a read-only context raise a ReadOnlyError (the audit
+    hook can not be removed)."""
+    global _check_enabled
+    if _check_enabled:
+        return
+    sys.addaudithook(_audit)
+    _check_enabled = True
+    logger.warning('Mode test : les écritures pendant les requêtes d\'affichage provoquent une erreur')
+
+
+if os.environ.get(READ_ONLY_CHECK_ENV):
+    enable_read_only_check()
@@ -10,7 +10,7 @@ from data.player import Player
 logger: Logger = get_logger()
 
 
-@dataclass
+@dataclass(slots=True)
 @total_ordering
 class Board:
     """The Board class, represented by its index in the board order and its
@@ -21,6 +21,8 @@ class Board:
     white_player: Player | None = None
     black_player: Player | None = None
     result: Result | None = None
+    # the result was entered but is not yet written to the Papi file
+    result_pending: bool = False
 
     @property
     def id(self) -> int | None:
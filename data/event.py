@@ -1,12 +1,19 @@
-import json
 import os
+import pickle
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from functools import total_ordering
 from logging import Logger
 from pathlib import Path
-from typing import Iterator
+from threading import Lock
+from typing import Iterator, Any
 
 from common.config_reader import ConfigReader, TMP_DIR, EVENTS_PATH
+from common.file_dependencies import file_dependencies
+from common.file_watcher import file_watcher, get_file_version
+from common.read_only import writes_allowed
 from common.logger import get_logger
+from common.papi_web_config import PAPI_WEB_VERSION
 from data.chessevent import ChessEvent, ChessEventBuilder
 from data.family import FamilyBuilder
 from data.rotator import Rotator, RotatorBuilder
@@ -14,78 +21,135 @@ from data.screen import AScreen, ScreenBuilder
 from data.template import Template, TemplateBuilder
 from data.timer import Timer, TimerBuilder
 from data.tournament import Tournament, TournamentBuilder
+from data.tournament_snapshot import TournamentSnapshotKey, retain_tournament_snapshots, warm_tournament_snapshots
 from data.util import DEFAULT_RECORD_ILLEGAL_MOVES_NUMBER, DEFAULT_RECORD_ILLEGAL_MOVES_ENABLE
-from database.sqlite import EventDatabase
+from database.sqlite import EventDatabase, event_database_files
 
 logger: Logger = get_logger()
 
 silent_event_uniq_ids: list[str] = []
 
+# the maximum number of built events kept in memory by get_event()
+EVENT_CACHE_SIZE: int = 64
+
+# the compiled configurations of a previous format are ignored
+COMPILED_CONFIGURATION_FORMAT: int = 2
+
 
 @total_ordering
 class Event:
-    def __init__(self, event_uniq_id: str, load_screens: bool):
+    # the attributes stored in the compiled configuration
+    _compiled_attributes: tuple[str, ...] = (
+        'name', 'path', 'css', 'update_password', 'record_illegal_moves', 'check_in_players', 'allow_deletion',
+        'chessevents', 'tournaments', 'templates', 'screens_by_family_id', 'screens', 'rotators', 'timer',
+        'infos', 'warnings', 'errors',
+    )
+
+    def __init__(
+            self, event_uniq_id: str, load_screens: bool, screen_id: str | None = None, rotator_id: str | None = None):
+        """Builds the event from its configuration file.
+        When screen_id or rotator_id is set, only the screens needed to render the screen or the rotator are built
+        (the screen or the screens of the rotator, and the screens of their menus)."""
         self.uniq_id: str = event_uniq_id
-        self.reader = ConfigReader(
-            EVENTS_PATH / f'{self.uniq_id}.ini',
-            TMP_DIR / 'events' / event_uniq_id / 'config' / f'{event_uniq_id}.ini.{os.getpid()}.read',
-            silent=self.uniq_id in silent_event_uniq_ids)
-        with EventDatabase(self.uniq_id, 'r') as self.database:
-            self.name: str = self.uniq_id
-            self.path: Path = Path('papi')
-            self.css: str | None = None
-            self.update_password: str | None = None
-            self.record_illegal_moves: int = 0
-            self.check_in_players: bool = False
-            self.allow_deletion: bool = False
-            self.chessevents: dict[str, ChessEvent] = {}
-            self.tournaments: dict[str, Tournament] = {}
-            self.templates: dict[str, Template] = {}
-            self.screens_by_family_id: dict[str, list[AScreen]] = {}
-            self.screens: dict[str, AScreen] = {}
-            self.rotators: dict[str, Rotator] = {}
-            self.timer: Timer | None = None
+        self.ini_file: Path = EVENTS_PATH / f'{self.uniq_id}.ini'
+        self.reader: ConfigReader | None = None
+        self.database: EventDatabase | None = None
+        self.name: str = self.uniq_id
+        self.path: Path = Path('papi')
+        self.css: str | None = None
+        self.update_password: str | None = None
+        self.record_illegal_moves: int = 0
+        self.check_in_players: bool = False
+        self.allow_deletion: bool = False
+        self.chessevents: dict[str, ChessEvent] = {}
+        self.tournaments: dict[str, Tournament] = {}
+        self.templates: dict[str, Template] = {}
+        self.screens_by_family_id: dict[str, list[AScreen]] = {}
+        self.screens: dict[str, AScreen] = {}
+        self.rotators: dict[str, Rotator] = {}
+        self.timer: Timer | None = None
+        self.infos: list[str] = []
+        self.warnings: list[str] = []
+        self.errors: list[str] = []
+        if self._load_compiled_configuration():
+            retain_tournament_snapshots(
+                self.uniq_id, [tournament.snapshot_key for tournament in self.tournaments.values()])
+            return
+        ini_file_version: tuple[int, int, int, int] | None = get_file_version(self.ini_file)
+        self.reader = ConfigReader(self.ini_file, silent=self.uniq_id in silent_event_uniq_ids)
+        self.infos, self.warnings, self.errors = self.reader.infos, self.reader.warnings, self.reader.errors
+        # the tournaments are stored when the event is built at server start or by the other requests (the display
+        # requests never write)
+        with EventDatabase(self.uniq_id, 'w' if writes_allowed() else 'r') as self.database:
+            built: bool = self._build(load_screens, screen_id, rotator_id)
+            if not self.database.read_only:
+                self.database.commit()
+        # the snapshots of the tournaments removed or whose configuration changed are not rebuilt any more
+        retain_tournament_snapshots(self.uniq_id, [tournament.snapshot_key for tournament in self.tournaments.values()])
+        if built and load_screens and screen_id is None and rotator_id is None and writes_allowed():
+            # the display requests never write, the configuration is compiled at server start or by the other requests
+            self._store_compiled_configuration(ini_file_version)
+
+    def _build(self, load_screens: bool, screen_id: str | None, rotator_id: str | None) -> bool:
+        """Builds the event from the configuration file, returns True if the event was built up to the end."""
+        if self.reader.errors:
+            return False
+        self._build_root()
+        if self.reader.errors:
+            return False
+        self.chessevents = ChessEventBuilder(
+            self.reader
+        ).chessevents
+        if self.reader.errors:
+            return False
+        self.tournaments = TournamentBuilder(
+            self.reader, self.database, self.uniq_id, self.path, self.chessevents, self.record_illegal_moves
+        ).tournaments
+        if self.reader.errors:
+            return False
+        if load_screens:
+            self.templates = TemplateBuilder(self.reader).templates
             if self.reader.errors:
-                return
-            self._build_root()
+                return False
+            only_family_ids: list[str] | None = None
+            if screen_id is not None:
+                only_family_ids = self._get_screens_family_ids([screen_id, ])
+            elif rotator_id is not None:
+                only_family_ids = self._get_rotator_family_ids(rotator_id)
+            FamilyBuilder(self.reader, self.tournaments, self.templates, only_family_ids)
             if self.reader.errors:
-                return
-            self.chessevents = ChessEventBuilder(
-                self.reader
-            ).chessevents
+                return False
+            only_screen_ids: list[str] | None = None
+            only_rotator_ids: list[str] | None = None
+            if screen_id is not None:
+                only_screen_ids = [screen_id, ]
+                only_rotator_ids = []
+            elif rotator_id is not None:
+                only_screen_ids = self._get_rotator_screen_ids(rotator_id)
+                only_rotator_ids = [rotator_id, ]
+            self.screens = ScreenBuilder(
+                self.reader, self.uniq_id, self.tournaments, self.templates, self.screens_by_family_id,
+                only_screen_ids
+            ).screens
             if self.reader.errors:
-                return
-            self.tournaments = TournamentBuilder(
-                self.reader, self.database, self.uniq_id, self.path, self.chessevents, self.record_illegal_moves
-            ).tournaments
+                return False
+            self.rotators = RotatorBuilder(
+                self.reader, self.screens, self.screens_by_family_id, only_rotator_ids
+            ).rotators
             if self.reader.errors:
-                return
-            if load_screens:
-                self.templates = TemplateBuilder(self.reader).templates
-                if self.reader.errors:
-                    return
-                FamilyBuilder(self.reader, self.tournaments, self.templates)
-                if self.reader.errors:
-                    return
-                self.screens = ScreenBuilder(
-                    self.reader, self.uniq_id, self.tournaments, self.templates, self.screens_by_family_id
-                ).screens
-                if self.reader.errors:
-                    return
-                self.rotators = RotatorBuilder(self.reader, self.screens, self.screens_by_family_id).rotators
-                if self.reader.errors:
-                    return
-                self.timer = TimerBuilder(self.reader).timer
-                if not self.timer:
-                    screen_ids: list[str] = []
-                    for screen_id in self.screens:
-                        if self.screens[screen_id].show_timer:
-                            screen_ids.append(screen_id)
-                    if screen_ids:
-                        self.reader.add_warning(
-                            'le chronomètre ([timer.hour.*]) n\'est pas défini',
-                            section_key=f'screen.{",".join(screen_ids)}',
-                            key='show_timer')
+                return False
+            self.timer = TimerBuilder(self.reader).timer
+            if not self.timer:
+                screen_ids: list[str] = []
+                for screen_id in self.screens:
+                    if self.screens[screen_id].show_timer:
+                        screen_ids.append(screen_id)
+                if screen_ids:
+                    self.reader.add_warning(
+                        'le chronomètre ([timer.hour.*]) n\'est pas défini',
+                        section_key=f'screen.{",".join(screen_ids)}',
+                        key='show_timer')
+            if only_screen_ids is None:
                 event_file_dependencies = [self.ini_file, ]
                 for screen in self.screens.values():
                     event_file_dependencies += [
@@ -93,7 +157,8 @@ class Event:
                         for screen_set in screen.sets
                     ]
                 self.set_file_dependencies(event_file_dependencies)
-            silent_event_uniq_ids.append(self.uniq_id)
+        silent_event_uniq_ids.append(self.uniq_id)
+        return True
 
     @classmethod
     def __get_event_file_dependencies_file(cls, event_uniq_id: str) -> Path:
@@ -101,25 +166,16 @@ class Event:
 
     @classmethod
     def get_event_file_dependencies(cls, event_uniq_id: str) -> list[Path]:
-        file_dependencies_file = cls.__get_event_file_dependencies_file(event_uniq_id)
-        try:
-            with open(file_dependencies_file, 'r', encoding='utf-8') as f:
-                return [Path(file) for file in json.load(f)]
-        except FileNotFoundError:
-            return []
+        return file_dependencies.get(cls.__get_event_file_dependencies_file(event_uniq_id))
 
     def set_file_dependencies(self, files: list[Path]):
-        file_dependencies_file = self.__get_event_file_dependencies_file(self.uniq_id)
-        try:
-            file_dependencies_file.parents[0].mkdir(parents=True, exist_ok=True)
-            with open(file_dependencies_file, 'w', encoding='utf-8') as f:
-                return f.write(json.dumps([str(file) for file in files]))
-        except FileNotFoundError:
-            return []
+        file_dependencies.set(self.__get_event_file_dependencies_file(self.uniq_id), files)
 
     @property
-    def ini_file(self) -> Path:
-        return self.reader.ini_file
+    def version_files(self) -> list[Path]:
+        """The files the event is built from, used to detect that a cached event is out of date (the event database is
+        not one of them, the data of the tournaments is read from their latest snapshot)."""
+        return [self.ini_file, ] + [tournament.file for tournament in self.tournaments.values()]
 
     @property
     def download_allowed(self) -> bool:
@@ -129,16 +185,68 @@ class Event:
         return False
 
     @property
-    def errors(self) -> list[str]:
-        return self.reader.errors
+    def _compiled_configuration_file(self) -> Path:
+        return TMP_DIR / 'events' / self.uniq_id / 'config' / f'{self.uniq_id}.ini.compiled'
 
-    @property
-    def warnings(self) -> list[str]:
-        return self.reader.warnings
+    def _store_compiled_configuration(self, ini_file_version: tuple[int, int, int, int] | None):
+        """Stores the event built from the configuration file, to be loaded by _load_compiled_configuration()."""
+        file_versions: dict[str, tuple[int, int, int, int] | None] = {str(self.ini_file): ini_file_version, }
+        file_existences: dict[str, bool] = {str(self.path): self.path.exists(), }
+        for tournament in self.tournaments.values():
+            if tournament.file:
+                file_existences[str(tournament.file)] = tournament.file.exists()
+                if tournament.database_read:
+                    # the data of the tournament was needed to build the screens (families, fixed boards)
+                    file_versions[str(tournament.file)] = get_file_version(tournament.file)
+        compiled_configuration: dict[str, Any] = {
+            'format': COMPILED_CONFIGURATION_FORMAT,
+            'papi_web_version': str(PAPI_WEB_VERSION),
+            'file_versions': file_versions,
+            'file_existences': file_existences,
+            'attributes': {attribute: getattr(self, attribute) for attribute in self._compiled_attributes},
+        }
+        compiled_configuration_file: Path = self._compiled_configuration_file
+        tmp_file: Path = compiled_configuration_file.with_suffix(f'.{os.getpid()}.tmp')
+        try:
+            compiled_configuration_file.parents[0].mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                pickle.dump(compiled_configuration, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, compiled_configuration_file)
+        except (OSError, pickle.PicklingError) as e:
+            logger.warning('La configuration compilée de l\'évènement [%s] n\'a pas pu être écrite : %s',
+                           self.uniq_id, e)
 
-    @property
-    def infos(self) -> list[str]:
-        return self.reader.infos
+    def _load_compiled_configuration(self) -> bool:
+        """Loads the event from its compiled configuration if it is up to date, returns True on success."""
+        try:
+            with open(self._compiled_configuration_file, 'rb') as f:
+                compiled_configuration: dict[str, Any] = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError) as e:
+            logger.debug('La configuration compilée de l\'évènement [%s] est illisible : %s', self.uniq_id, e)
+            return False
+        if compiled_configuration.get('format') != COMPILED_CONFIGURATION_FORMAT \
+                or compiled_configuration.get('papi_web_version') != str(PAPI_WEB_VERSION):
+            return False
+        for file, version in compiled_configuration['file_versions'].items():
+            if get_file_version(Path(file)) != version:
+                return False
+        for file, exists in compiled_configuration['file_existences'].items():
+            if Path(file).exists() != exists:
+                return False
+        for attribute, value in compiled_configuration['attributes'].items():
+            setattr(self, attribute, value)
+        if self.uniq_id not in silent_event_uniq_ids:
+            # log the messages as when reading the configuration file
+            for error in self.errors:
+                logger.error(error)
+            for warning in self.warnings:
+                logger.warning(warning)
+            for info in self.infos:
+                logger.info(info)
+            silent_event_uniq_ids.append(self.uniq_id)
+        return True
 
     def _build_root(self):
         section_key: str = 'event'
@@ -273,6 +381,117 @@ class Event:
             if key not in section_keys:
                 self.reader.add_warning('option inconnue', section_key, key)
 
+    @staticmethod
+    def _get_screen_family_id(screen_id: str, family_ids: list[str]) -> str | None:
+        """Returns the family that generates a screen (screen ids of families are <family_id>-<index>)."""
+        screen_family_ids: list[str] = [
+            family_id for family_id in family_ids if screen_id.startswith(f'{family_id}-')
+        ]
+        return max(screen_family_ids, key=len) if screen_family_ids else None
+
+    def _get_family_template(self, family_id: str) -> Template | None:
+        template_id: str | None = self.reader[f'family.{family_id}'].get('template')
+        if template_id is None:
+            if family_id in self.templates:
+                template_id = family_id
+            elif len(self.templates) == 1:
+                template_id = list(self.templates.keys())[0]
+        return self.templates.get(template_id)
+
+    def _get_menu_family_ids(self, menu: str | None, family_ids: list[str]) -> set[str] | None:
+        """Returns the families needed to build the screens of a menu, None if all the families are needed."""
+        menu_family_ids: set[str] = set()
+        if menu is None:
+            return menu_family_ids
+        for menu_part in map(str.strip, menu.split(',')):
+            if menu_part in ['', '@none', 'none', '@family', 'family', ]:
+                # the family of the screen is built anyway
+                continue
+            if menu_part.startswith('@') or menu_part in ['view', 'update', ] or '*' in menu_part or '?' in menu_part:
+                return None
+            if f'screen.{menu_part}' not in self.reader:
+                if family_id := self._get_screen_family_id(menu_part, family_ids):
+                    menu_family_ids.add(family_id)
+        return menu_family_ids
+
+    def _get_screens_family_ids(self, screen_ids: list[str]) -> list[str] | None:
+        """Returns the families needed to build the screens and their menus, None if all the families are needed."""
+        family_ids: list[str] = self.reader.get_subsection_keys_with_prefix('family')
+        if not family_ids:
+            return []
+        if not self.reader.get_subsection_keys_with_prefix('screen'):
+            # default screens are added when no screen is found after building the families
+            return None
+        needed_family_ids: set[str] = set()
+        for screen_id in screen_ids:
+            template: Template | None
+            menu: str | None
+            screen_section_key: str = f'screen.{screen_id}'
+            if screen_section_key in self.reader:
+                template = self.templates.get(self.reader[screen_section_key].get('template'))
+                menu = self.reader[screen_section_key].get('menu')
+            elif family_id := self._get_screen_family_id(screen_id, family_ids):
+                needed_family_ids.add(family_id)
+                template = self._get_family_template(family_id)
+                menu = None
+            else:
+                continue
+            if menu is None and template is not None:
+                menu = template.data[None].get('menu')
+            menu_family_ids: set[str] | None = self._get_menu_family_ids(menu, family_ids)
+            if menu_family_ids is None:
+                return None
+            needed_family_ids |= menu_family_ids
+        return [family_id for family_id in family_ids if family_id in needed_family_ids]
+
+    def _get_rotator_option_ids(self, rotator_id: str, key: str) -> list[str]:
+        option_ids: str = str(self.reader[f'rotator.{rotator_id}'].get(key, ''))
+        return [option_id for option_id in option_ids.replace(' ', '').split(',') if option_id]
+
+    def _get_rotator_family_ids(self, rotator_id: str) -> list[str] | None:
+        """Returns the families needed to build the screens of a rotator and their menus,
+        None if all the families are needed."""
+        if not self.reader.get_subsection_keys_with_prefix('screen'):
+            # the default screens and rotators are added when no screen is declared
+            return None
+        rotator_section_key: str = f'rotator.{rotator_id}'
+        if rotator_section_key not in self.reader:
+            return []
+        if 'screens' not in self.reader[rotator_section_key] and 'families' not in self.reader[rotator_section_key]:
+            # the default family of the rotator is known only when all the families are built
+            return None
+        needed_family_ids: list[str] | None = self._get_screens_family_ids(
+            self._get_rotator_option_ids(rotator_id, 'screens'))
+        if needed_family_ids is None:
+            return None
+        family_ids: list[str] = self.reader.get_subsection_keys_with_prefix('family')
+        for family_id in self._get_rotator_option_ids(rotator_id, 'families'):
+            if family_id in family_ids:
+                needed_family_ids.append(family_id)
+                template: Template | None = self._get_family_template(family_id)
+                menu_family_ids: set[str] | None = self._get_menu_family_ids(
+                    template.data[None].get('menu') if template is not None else None, family_ids)
+                if menu_family_ids is None:
+                    return None
+                needed_family_ids += list(menu_family_ids)
+        return [family_id for family_id in family_ids if family_id in needed_family_ids]
+
+    def _get_rotator_screen_ids(self, rotator_id: str) -> list[str] | None:
+        """Returns the screens of a rotator once the families are built, None if all the screens are needed."""
+        if not self.reader.get_subsection_keys_with_prefix('screen'):
+            # the default screens and rotators are added when no screen is declared
+            return None
+        rotator_section_key: str = f'rotator.{rotator_id}'
+        if rotator_section_key not in self.reader:
+            return []
+        if 'screens' not in self.reader[rotator_section_key] and 'families' not in self.reader[rotator_section_key]:
+            return None
+        family_ids: list[str] = self._get_rotator_option_ids(rotator_id, 'families')
+        return self._get_rotator_option_ids(rotator_id, 'screens') + [
+            screen_id for screen_id in self.reader.get_subsection_keys_with_prefix('screen')
+            if self.reader[f'screen.{screen_id}'].get('__family__') in family_ids
+        ]
+
     def __lt__(self, other: 'Event'):
         # p1 < p2 calls p1.__lt__(p2)
         return self.uniq_id > other.uniq_id
@@ -289,7 +508,7 @@ def __get_events(load_screens: bool, with_tournaments_only: bool = False) -> dic
     events: dict[str, Event] = {}
     for event_file in event_files:
         event_uniq_id: str = event_file.stem
-        event: Event = Event(event_uniq_id, load_screens)
+        event: Event = get_event(event_uniq_id, load_screens)
         if not with_tournaments_only or event.tournaments:
             events[event.uniq_id] = event
     return events
@@ -303,3 +522,202 @@ def get_events_sorted_by_name(load_screens: bool, with_tournaments_only: bool =
 
 def get_events_by_uniq_id(load_screens: bool, with_tournaments_only: bool = False) -> dict[str, Event]:
     return __get_events(load_screens, with_tournaments_only=with_tournaments_only)
+
+
+def _watch_event_files(event_uniq_id: str) -> tuple[list[Path], int]:
+    """Watches the files an event was built from last time, returns them with the version of the file watcher, to be
+    called before building the event so that the changes made during the build are detected next time."""
+    files: list[Path] = [EVENTS_PATH / f'{event_uniq_id}.ini', ] + Event.get_event_file_dependencies(event_uniq_id)
+    file_watcher.watch(files)
+    return files, file_watcher.current_version
+
+
+def _get_built_event_files(event: Event, files: list[Path]) -> list[Path]:
+    """Returns the files watched before building the event and the files of the event built (the tournaments may have
+    changed)."""
+    built_files: list[Path] = [file for file in event.version_files if file not in files]
+    file_watcher.watch(built_files)
+    return files + built_files
+
+
+class _EventCache:
+    """A bounded LRU cache of the built events, shared by the whole process.
+    An event is served from the cache as long as no change of its INI file and the Papi files of its tournaments was
+    detected by the file watcher since it was built (the data of the tournaments is read from their latest
+    snapshot)."""
+
+    def __init__(self, size: int):
+        self._size: int = size
+        self._lock: Lock = Lock()
+        # the events with their files and the version of the file watcher before they were built
+        self._entries: OrderedDict[tuple, tuple[Event, list[Path], int]] = OrderedDict()
+
+    def _get_valid_entry(self, key: tuple) -> Event | None:
+        with self._lock:
+            entry: tuple[Event, list[Path], int] | None = self._entries.get(key)
+        if entry is None:
+            return None
+        event, files, version = entry
+        if file_watcher.version(files) > version:
+            logger.debug('L\'évènement [%s] a été modifié, rechargement', event.uniq_id)
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return event
+
+    def get(
+            self, event_uniq_id: str, load_screens: bool, screen_id: str | None = None, rotator_id: str | None = None
+    ) -> Event:
+        key: tuple = (event_uniq_id, load_screens, screen_id, rotator_id)
+        if event := self._get_valid_entry(key):
+            return event
+        if screen_id is not None or rotator_id is not None:
+            # a fully loaded event holds all the screens and rotators
+            if event := self._get_valid_entry((event_uniq_id, load_screens, None, None)):
+                return event
+        files, version = _watch_event_files(event_uniq_id)
+        event = Event(event_uniq_id, load_screens, screen_id, rotator_id)
+        files = _get_built_event_files(event, files)
+        with self._lock:
+            self._entries[key] = (event, files, version)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+        return event
+
+
+_event_cache: _EventCache = _EventCache(EVENT_CACHE_SIZE)
+
+
+def get_event(
+        event_uniq_id: str, load_screens: bool, screen_id: str | None = None, rotator_id: str | None = None
+) -> Event:
+    """Returns the event, from the cache if none of its files changed since it was built.
+    If screen_id or rotator_id is set, the returned event may hold only the screens needed to render them."""
+    return _event_cache.get(event_uniq_id, load_screens, screen_id, rotator_id)
+
+
+@dataclass
+class EventSummary:
+    """The few data of an event needed to list the events, check their ids and log in, without keeping the event
+    in memory."""
+    uniq_id: str
+    name: str
+    path: Path
+    css: str | None
+    update_password: str | None
+    record_illegal_moves: int
+    allow_deletion: bool
+    tournament_uniq_ids: list[str] = field(default_factory=list)
+    screens_number: int = 0
+    rotators_number: int = 0
+    timer_hours_number: int = 0
+    errors_number: int = 0
+    warnings_number: int = 0
+    infos_number: int = 0
+
+    @property
+    def tournaments_number(self) -> int:
+        return len(self.tournament_uniq_ids)
+
+    @property
+    def messages_number(self) -> int:
+        return self.errors_number + self.warnings_number + self.infos_number
+
+    @classmethod
+    def from_event(cls, event: Event) -> 'EventSummary':
+        return cls(
+            uniq_id=event.uniq_id,
+            name=event.name,
+            path=event.path,
+            css=event.css,
+            update_password=event.update_password,
+            record_illegal_moves=event.record_illegal_moves,
+            allow_deletion=event.allow_deletion,
+            tournament_uniq_ids=list(event.tournaments.keys()),
+            screens_number=len(event.screens),
+            rotators_number=len(event.rotators),
+            timer_hours_number=len(event.timer.hours) if event.timer else 0,
+            errors_number=len(event.errors),
+            warnings_number=len(event.warnings),
+            infos_number=len(event.infos),
+        )
+
+
+class _EventCatalog:
+    """The summaries of all the events, updated when the INI file or the database of an event change or when an event
+    is added or removed (the summaries do not depend on the Papi files)."""
+
+    def __init__(self):
+        self._lock: Lock = Lock()
+        self._entries: dict[str, tuple[EventSummary, list[Path], int]] = {}
+
+    def _get_summary(self, event_uniq_id: str) -> EventSummary:
+        with self._lock:
+            entry: tuple[EventSummary, list[Path], int] | None = self._entries.get(event_uniq_id)
+        if entry is not None:
+            summary, files, version = entry
+            if file_watcher.version(files) <= version:
+                return summary
+        files: list[Path] = [EVENTS_PATH / f'{event_uniq_id}.ini', ] + event_database_files(event_uniq_id)
+        file_watcher.watch(files)
+        # the version is taken before the build so that the changes made during the build are detected next time
+        version: int = file_watcher.current_version
+        # the event is built (or loaded from its compiled configuration) out of the lock and not kept in memory
+        summary = EventSummary.from_event(Event(event_uniq_id, True))
+        with self._lock:
+            entry = self._entries.get(event_uniq_id)
+            if entry is None or entry[2] <= version:
+                self._entries[event_uniq_id] = (summary, files, version)
+        return summary
+
+    def get_summaries(self) -> dict[str, EventSummary]:
+        event_uniq_ids: list[str] = [event_file.stem for event_file in EVENTS_PATH.glob('*.ini')]
+        with self._lock:
+            for event_uniq_id in list(self._entries.keys()):
+                if event_uniq_id not in event_uniq_ids:
+                    del self._entries[event_uniq_id]
+                    # the tournaments of the events deleted are not rebuilt any more
+                    retain_tournament_snapshots(event_uniq_id, [])
+        return {event_uniq_id: self._get_summary(event_uniq_id) for event_uniq_id in event_uniq_ids}
+
+    def get_summary(self, event_uniq_id: str) -> EventSummary | None:
+        if not (EVENTS_PATH / f'{event_uniq_id}.ini').exists():
+            return None
+        return self._get_summary(event_uniq_id)
+
+
+_event_catalog: _EventCatalog = _EventCatalog()
+
+
+def get_event_summaries_by_uniq_id() -> dict[str, EventSummary]:
+    return _event_catalog.get_summaries()
+
+
+def get_event_summaries_sorted_by_name() -> list[EventSummary]:
+    return sorted(_event_catalog.get_summaries().values(), key=lambda summary: summary.name)
+
+
+def prepare_events():
+    """Prepares all the events at server start (their databases are created and upgraded, their tournaments stored
+    and their configurations compiled), before the display requests, which never write. The tournaments are then read
+    in the background."""
+    for event_file in EVENTS_PATH.glob('*.ini'):
+        # the database is checked when entered in write mode (not when the event is loaded from its compiled
+        # configuration)
+        with EventDatabase(event_file.stem, 'w'):
+            pass
+    snapshot_keys: list[TournamentSnapshotKey] = []
+    for event_uniq_id in _event_catalog.get_summaries():
+        snapshot_keys += [
+            tournament.snapshot_key
+            for tournament in get_event(event_uniq_id, False).tournaments.values()
+            if tournament.file and tournament.file.exists()
+        ]
+    warm_tournament_snapshots(snapshot_keys)
+
+
+def get_event_summary(event_uniq_id: str) -> EventSummary | None:
+    """Returns the summary of the event, or None if the event does not exist."""
+    return _event_catalog.get_summary(event_uniq_id)
@@ -9,7 +9,10 @@ from data.util import ScreenType
 
 
 class FamilyBuilder:
-    def __init__(self, config_reader: ConfigReader, tournaments: dict[str, Tournament], templates: dict[str, Template]):
+    def __init__(
+            self, config_reader: ConfigReader, tournaments: dict[str, Tournament], templates: dict[str, Template],
+            only_family_ids: list[str] | None = None):
+        """Expands the families into screens, only the families of only_family_ids if set."""
         self._config_reader: ConfigReader = config_reader
         self._tournaments: dict[str, Tournament] = tournaments
         self._templates: dict[str, Template] = templates
@@ -18,7 +21,8 @@ class FamilyBuilder:
             self._config_reader.add_debug('aucune famille déclarée', 'family.*')
             return
         for family_id in family_ids:
-            self._build_family(family_id)
+            if only_family_ids is None or family_id in only_family_ids:
+                self._build_family(family_id)
 
     def _read_family_ids(self) -> list[str]:
         return self._config_reader.get_subsection_keys_with_prefix('family')
@@ -6,7 +6,7 @@ from data.util import Result
 logger: Logger = get_logger()
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Pairing:
     """A pairing (from the point of view of the `Player` class)"""
     color: str | None = None
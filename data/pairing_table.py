@@ -0,0 +1,197 @@
+"""The pairings of the players of a tournament, stored by column.
+
+A tournament of 1000 players and 24 rounds would otherwise be loaded as 24000 Pairing objects. The table stores one
+array of colors, opponents and results per round (the arrays of the standard library are used, NumPy is not a
+dependency of Papi-web), the pairings of a player are read through a PlayerPairings view and the current round and the
+points are computed column by column."""
+import operator
+from array import array
+from copy import copy
+from collections.abc import Iterable, Iterator, Mapping
+from itertools import compress, repeat
+
+from data.pairing import Pairing
+from data.util import Color, Result
+
+# the color codes, other values (read as is from the Papi file) are stored apart
+_NO_COLOR: int = 0
+_WHITE: int = 1
+_BLACK: int = 2
+_OTHER_COLOR: int = 4
+# the bits of the colors of the players paired
+_PAIRED_COLORS: int = _WHITE | _BLACK
+_COLOR_CODES: dict[Color, int] = {Color.WHITE: _WHITE, Color.BLACK: _BLACK, }
+_COLORS: tuple[Color | None, ...] = (None, Color.WHITE, Color.BLACK, )
+# the opponent of the players not paired
+_NO_OPPONENT: int = -1
+# the results and their point values, by value
+_RESULTS: tuple[Result, ...] = tuple(sorted(Result, key=operator.attrgetter('value')))
+_POINT_VALUES: tuple[float, ...] = tuple(result.point_value for result in _RESULTS)
+
+
+class PairingTable:
+    def __init__(self, rounds: int):
+        self.rounds: int = rounds
+        self.player_ids: array = array('i')
+        # the columns, one array per round
+        self._colors: list[array] = [array('b') for _ in range(rounds)]
+        self._opponent_ids: list[array] = [array('i') for _ in range(rounds)]
+        self._results: list[array] = [array('b') for _ in range(rounds)]
+        self._other_colors: dict[tuple[int, int], str] = {}
+        # 0 for the exempt player, not taken into account to find the current round
+        self._counted: array = array('b')
+
+    def add_player(
+            self, player_id: int, colors: Iterable[Color | str | None], opponent_ids: Iterable[int | None],
+            results: Iterable[Result]) -> 'PlayerPairings':
+        """Adds the pairings of a player (by round from round 1), returns the view of the pairings of the player."""
+        row: int = len(self.player_ids)
+        self.player_ids.append(player_id)
+        self._counted.append(player_id != 1)
+        for round_index, (color, opponent_id, result) in enumerate(zip(colors, opponent_ids, results)):
+            self._set(row, round_index, color, opponent_id, result)
+        return PlayerPairings(self, row)
+
+    def update_player(
+            self, row: int, first_round: int, colors: Iterable[Color | str | None], opponent_ids: Iterable[int | None],
+            results: Iterable[Result]) -> bool:
+        """Sets the pairings of a player from round first_round, returns True if they changed."""
+        round_indexes: range = range(first_round - 1, self.rounds)
+        previous_pairings: list[tuple] = self._get_raw_pairings(row, round_indexes)
+        for round_index, color, opponent_id, result in zip(round_indexes, colors, opponent_ids, results):
+            self._set(row, round_index, color, opponent_id, result)
+        return self._get_raw_pairings(row, round_indexes) != previous_pairings
+
+    def _get_raw_pairings(self, row: int, round_indexes: range) -> list[tuple]:
+        return [
+            (self._colors[round_index][row], self._other_colors.get((row, round_index)),
+             self._opponent_ids[round_index][row], self._results[round_index][row])
+            for round_index in round_indexes
+        ]
+
+    def _set(self, row: int, round_index: int, color: Color | str | None, opponent_id: int | None, result: Result):
+        color_code: int
+        if color is None:
+            color_code = _NO_COLOR
+        elif color in _COLOR_CODES:
+            color_code = _COLOR_CODES[color]
+        else:
+            color_code = _OTHER_COLOR
+            self._other_colors[row, round_index] = color
+        opponent_id = _NO_OPPONENT if opponent_id is None else opponent_id
+        if row == len(self._colors[round_index]):
+            self._colors[round_index].append(color_code)
+            self._opponent_ids[round_index].append(opponent_id)
+            self._results[round_index].append(result)
+        else:
+            self._colors[round_index][row] = color_code
+            self._opponent_ids[round_index][row] = opponent_id
+            self._results[round_index][row] = result
+            if color_code != _OTHER_COLOR:
+                self._other_colors.pop((row, round_index), None)
+
+    def get_pairing(self, row: int, round_: int) -> Pairing:
+        round_index: int = round_ - 1
+        color_code: int = self._colors[round_index][row]
+        opponent_id: int = self._opponent_ids[round_index][row]
+        return Pairing(
+            self._other_colors[row, round_index] if color_code == _OTHER_COLOR else _COLORS[color_code],
+            None if opponent_id == _NO_OPPONENT else opponent_id,
+            _RESULTS[self._results[round_index][row]])
+
+    def set_pairing(self, row: int, round_: int, pairing: Pairing):
+        self._set(row, round_ - 1, pairing.color, pairing.opponent_id, pairing.result)
+
+    def with_results(self, round_: int, results: Mapping[int, Result]) -> 'PairingTable':
+        """Returns a table with the results of round round_ changed (by row), sharing the other columns with this
+        table (the tables of the snapshots are never modified once built)."""
+        table: PairingTable = copy(self)
+        table._results = list(self._results)
+        column: array = self._results[round_ - 1][:]
+        for row, result in results.items():
+            column[row] = result
+        table._results[round_ - 1] = column
+        return table
+
+    def copy(self) -> 'PairingTable':
+        table: PairingTable = PairingTable(0)
+        table.rounds = self.rounds
+        table.player_ids = self.player_ids[:]
+        table._colors = [column[:] for column in self._colors]
+        table._opponent_ids = [column[:] for column in self._opponent_ids]
+        table._results = [column[:] for column in self._results]
+        table._other_colors = dict(self._other_colors)
+        table._counted = self._counted[:]
+        return table
+
+    def same_pairings(self, other: 'PairingTable', first_round: int, last_round: int, results: bool = True) -> bool:
+        """Returns True if both tables hold the same players with the same pairings from round first_round to round
+        last_round (included), with the same results if results is True."""
+        if self.rounds != other.rounds or self.player_ids != other.player_ids:
+            return False
+        round_indexes: range = range(max(first_round, 1) - 1, min(last_round, self.rounds))
+        for round_index in round_indexes:
+            if self._colors[round_index] != other._colors[round_index] \
+                    or self._opponent_ids[round_index] != other._opponent_ids[round_index] \
+                    or results and self._results[round_index] != other._results[round_index]:
+                return False
+        return all(
+            self._other_colors.get(cell) == other._other_colors.get(cell)
+            for cell in self._other_colors.keys() | other._other_colors.keys()
+            if cell[1] in round_indexes)
+
+    def current_round(self) -> int:
+        """Returns the first round with pairings and missing results, or the last round with pairings (0 if no round
+        is paired)."""
+        last_paired_round: int = 0
+        for round_index in range(self.rounds):
+            if not any(map(operator.and_, compress(self._colors[round_index], self._counted), repeat(_PAIRED_COLORS))):
+                continue
+            last_paired_round = round_index + 1
+            # the opponents of the players with no result (the players not paired have no opponent)
+            missing_result_selectors: Iterator[int] = map(
+                operator.and_, self._counted, map(operator.not_, self._results[round_index]))
+            if max(compress(self._opponent_ids[round_index], missing_result_selectors),
+                   default=_NO_OPPONENT) != _NO_OPPONENT:
+                return round_index + 1
+        return last_paired_round
+
+    def points(self, max_round: int) -> list[float]:
+        """Returns the points of the players (in the order they were added) from round 1 to round max_round
+        (excluded)."""
+        points: list[float] = [0] * len(self.player_ids)
+        for round_index in range(min(max_round - 1, self.rounds)):
+            points = list(map(operator.add, points, map(_POINT_VALUES.__getitem__, self._results[round_index])))
+        return points
+
+
+class PlayerPairings(Mapping[int, Pairing]):
+    """The pairings of a player by round, a view of a row of a PairingTable."""
+    __slots__ = ('_table', '_row', )
+
+    def __init__(self, table: PairingTable, row: int):
+        self._table: PairingTable = table
+        self._row: int = row
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def __getitem__(self, round_: int) -> Pairing:
+        if not isinstance(round_, int) or not 1 <= round_ <= self._table.rounds:
+            raise KeyError(round_)
+        return self._table.get_pairing(self._row, round_)
+
+    def __setitem__(self, round_: int, pairing: Pairing):
+        if not isinstance(round_, int) or not 1 <= round_ <= self._table.rounds:
+            raise KeyError(round_)
+        self._table.set_pairing(self._row, round_, pairing)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(1, self._table.rounds + 1))
+
+    def __len__(self) -> int:
+        return self._table.rounds
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({dict(self)})'
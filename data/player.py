@@ -1,6 +1,7 @@
 from functools import total_ordering
 from logging import Logger
 from dataclasses import dataclass, field
+from collections.abc import Mapping
 from contextlib import suppress
 import warnings
 
@@ -11,7 +12,7 @@ from data.util import PlayerGender, PlayerTitle, Color
 logger: Logger = get_logger()
 
 
-@dataclass
+@dataclass(slots=True)
 @total_ordering
 class Player:
     ref_id: int
@@ -23,7 +24,7 @@ class Player:
     rating_type: str
     fixed: int
     check_in: bool
-    pairings: dict[int, Pairing]
+    pairings: Mapping[int, Pairing]
     points: float | None = field(default=None, init=False)
     vpoints: float | None = field(default=None, init=False)
     board_id: int | None = field(default=None, init=False)
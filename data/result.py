@@ -9,7 +9,7 @@ from data.util import Result as UtilResult
 logger: Logger = get_logger()
 
 
-@dataclass
+@dataclass(slots=True)
 @total_ordering
 class Result:
     timestamp: float
@@ -19,6 +19,12 @@ class Result:
     white_player_id: int
     black_player_id: int
     result: UtilResult
+    # the players when the result was entered (None for the results entered before they were stored)
+    white_player_name: str | None = None
+    white_player_rating: int | None = None
+    black_player_name: str | None = None
+    black_player_rating: int | None = None
+    id: int | None = None
 
     @property
     def timestamp_str(self) -> str:
@@ -28,6 +34,21 @@ class Result:
     def result_str(self) -> str:
         return str(self.result) if self.result else ''
 
+    @staticmethod
+    def _player_str(player_id: int, name: str | None, rating: int | None) -> str:
+        if name is None:
+            # the players of the results entered before they were stored are stored when the tournament is read
+            return f'Joueur·euse n°{player_id}'
+        return f'{name} {rating}'
+
+    @property
+    def white_player_str(self) -> str:
+        return self._player_str(self.white_player_id, self.white_player_name, self.white_player_rating)
+
+    @property
+    def black_player_str(self) -> str:
+        return self._player_str(self.black_player_id, self.black_player_name, self.black_player_rating)
+
     def __lt__(self, other):
         # p1 < p2 calls p1.__lt__(p2)
         return self.timestamp < other.timestamp
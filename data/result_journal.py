@@ -0,0 +1,121 @@
+"""The writing of the results entered from Papi-web to the Papi files.
+
+The results are first stored in the journal of the event database, so that they are acknowledged without waiting for
+the Papi file (which may be locked by Papi or slow to open). A background thread then writes the results of the
+journal to the Papi file of each tournament, in the order they were entered and in a single transaction, and retries
+later if the Papi file can not be written."""
+import time
+from logging import Logger
+from threading import Condition, Thread
+
+from common.logger import get_logger
+from data.tournament_snapshot import TournamentSnapshotKey, TournamentSnapshot, get_tournament_snapshot, \
+    refresh_tournament_snapshot, add_tournament_snapshot_listener, result_journal_entry_matches
+from data.util import Result
+from database.papi import PapiDatabase
+from database.sqlite import EventDatabase
+from database.store import StoredResultJournalEntry
+
+logger: Logger = get_logger()
+
+# the delay before writing the results, to write the results entered at the same time in one transaction
+RESULT_JOURNAL_APPLY_DELAY: float = 0.5
+# the delays before the next attempts when the Papi file could not be written
+RESULT_JOURNAL_RETRY_DELAYS: tuple[float, ...] = (1.0, 2.0, 5.0, 10.0, 30.0, )
+
+
+class _ResultJournalApplier:
+    def __init__(self):
+        self._condition: Condition = Condition()
+        # the time the results of the tournaments should be written at
+        self._due_times: dict[TournamentSnapshotKey, float] = {}
+        self._failures: dict[TournamentSnapshotKey, int] = {}
+        self._thread: Thread | None = None
+        # the results left in the journal (e.g. when the server was stopped) are written when the tournament is read
+        add_tournament_snapshot_listener(self._on_snapshot_built)
+
+    def _on_snapshot_built(self, key: TournamentSnapshotKey, snapshot: TournamentSnapshot):
+        if snapshot.pending_results:
+            self.schedule(key)
+
+    def schedule(self, key: TournamentSnapshotKey, delay: float = RESULT_JOURNAL_APPLY_DELAY):
+        with self._condition:
+            if key in self._due_times:
+                # already scheduled (or waiting for a retry)
+                return
+            self._due_times[key] = time.monotonic() + delay
+            if self._thread is None:
+                self._thread = Thread(target=self._run, name='result-journal', daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    now: float = time.monotonic()
+                    keys: list[TournamentSnapshotKey] = [
+                        key for key, due_time in self._due_times.items() if due_time <= now]
+                    if keys:
+                        for key in keys:
+                            del self._due_times[key]
+                        break
+                    self._condition.wait(min(self._due_times.values()) - now if self._due_times else None)
+            for key in keys:
+                self._try_apply(key)
+
+    def _try_apply(self, key: TournamentSnapshotKey):
+        """Writes the results of the tournament, schedules a new attempt if the Papi file could not be written."""
+        try:
+            self._apply(key)
+            self._failures.pop(key, None)
+        except Exception as e:
+            failures: int = self._failures.get(key, 0)
+            self._failures[key] = failures + 1
+            delay: float = RESULT_JOURNAL_RETRY_DELAYS[min(failures, len(RESULT_JOURNAL_RETRY_DELAYS) - 1)]
+            logger.warning('Les résultats du tournoi [%s/%s] n\'ont pas pu être écrits dans le fichier '
+                           'Papi, nouvel essai dans %.0f secondes : %s',
+                           key.event_uniq_id, key.tournament_uniq_id, delay, e)
+            with self._condition:
+                self._due_times[key] = time.monotonic() + delay
+
+    @staticmethod
+    def _apply(key: TournamentSnapshotKey):
+        with EventDatabase(key.event_uniq_id, 'r') as event_database:
+            event_database: EventDatabase
+            entries: list[StoredResultJournalEntry] = event_database.get_result_journal_entries(
+                key.tournament_uniq_id)
+        if not entries:
+            return
+        if not key.file or not key.file.exists():
+            raise FileNotFoundError(f'Le fichier [{key.file}] n\'existe pas')
+        snapshot: TournamentSnapshot = get_tournament_snapshot(key)
+        written: int = 0
+        with PapiDatabase(key.event_uniq_id, key.tournament_uniq_id, key.file, 'w') as papi_database:
+            papi_database: PapiDatabase
+            for entry in entries:
+                if not result_journal_entry_matches(snapshot.players_by_id, entry):
+                    logger.warning('Les appariements du tournoi [%s/%s] ont changé, résultat %d.%d ignoré',
+                                   key.event_uniq_id, key.tournament_uniq_id, entry.round, entry.board_id)
+                    continue
+                papi_database.add_board_result(
+                    entry.white_player_id, entry.round, Result.from_papi_value(entry.white_value))
+                papi_database.add_board_result(
+                    entry.black_player_id, entry.round, Result.from_papi_value(entry.black_value))
+                written += 1
+            papi_database.commit()
+        with EventDatabase(key.event_uniq_id, 'w') as event_database:
+            event_database: EventDatabase
+            event_database.delete_result_journal_entries(entries[-1].tournament_id, entries[-1].id)
+            event_database.commit()
+        refresh_tournament_snapshot(key)
+        logger.info('%d résultat(s) écrit(s) dans le fichier Papi du tournoi [%s/%s]',
+                    written, key.event_uniq_id, key.tournament_uniq_id)
+
+
+_result_journal_applier: _ResultJournalApplier = _ResultJournalApplier()
+
+
+def schedule_result_journal(key: TournamentSnapshotKey):
+    """Schedules the writing of the results of the journal of the tournament to its Papi file."""
+    _result_journal_applier.schedule(key)
@@ -22,15 +22,18 @@ class RotatorBuilder:
     def __init__(
             self, config_reader: ConfigReader,
             screens: dict[str, AScreen],
-            screens_by_family_id: dict[str, list[AScreen]]):
+            screens_by_family_id: dict[str, list[AScreen]],
+            only_rotator_ids: list[str] | None = None):
+        """Builds the rotators, only the rotators of only_rotator_ids if set."""
         self._config_reader: ConfigReader = config_reader
         self._event_screens_by_family_id: dict[str, list[AScreen]] = screens_by_family_id
         self._event_screens: dict[str, AScreen] = screens
         self.rotators: dict[str, Rotator] = {}
         for rotator_id in self._read_rotator_ids():
-            if rotator := self._build_rotator(rotator_id):
-                self.rotators[rotator_id] = rotator
-        if not self.rotators:
+            if only_rotator_ids is None or rotator_id in only_rotator_ids:
+                if rotator := self._build_rotator(rotator_id):
+                    self.rotators[rotator_id] = rotator
+        if not self.rotators and only_rotator_ids is None:
             self._config_reader.add_debug('aucun écran rotatif défini')
 
     def _read_rotator_ids(self) -> list[str]:
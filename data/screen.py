@@ -1,4 +1,3 @@
-import json
 from typing import Self, Unpack
 import warnings
 from contextlib import suppress
@@ -10,6 +9,7 @@ from warnings import warn
 import fnmatch
 
 from common.config_reader import ConfigReader, TMP_DIR, EVENTS_PATH
+from common.file_dependencies import file_dependencies
 from common.logger import get_logger
 from data.result import Result
 from data.screen_set import ScreenSet, ScreenSetBuilder
@@ -81,23 +81,10 @@ class AScreen:
 
     @classmethod
     def get_screen_file_dependencies(cls, event_uniq_id: str, screen_id: str) -> list[Path]:
-        file_dependencies_file = cls.__get_screen_file_dependencies_file(event_uniq_id, screen_id)
-        try:
-            with open(file_dependencies_file, 'r', encoding='utf-8') as f:
-                return [Path(file) for file in json.load(f)]
-        except FileNotFoundError:
-            return []
+        return file_dependencies.get(cls.__get_screen_file_dependencies_file(event_uniq_id, screen_id))
 
     def set_file_dependencies(self, files: list[Path]):
-        file_dependencies_file = self.__get_screen_file_dependencies_file(
-            self.event_uniq_id, self.id)
-        try:
-            file_dependencies_file.parents[0].mkdir(
-                parents=True, exist_ok=True)
-            with open(file_dependencies_file, 'w', encoding='utf-8') as f:
-                return f.write(json.dumps([str(file) for file in files]))
-        except FileNotFoundError:
-            return []
+        file_dependencies.set(self.__get_screen_file_dependencies_file(self.event_uniq_id, self.id), files)
 
 
 @dataclass
@@ -231,11 +218,29 @@ class ResultsScreen(AScreen):
         for i in range(self.columns):
             yield results[i * column_size:(i + 1) * column_size]
 
+    @property
+    def results_feed(self) -> bool:
+        """True if only the new results are sent to the screen (when displayed on one column)."""
+        return self.columns == 1
+
+    def get_results_since(self, last_id: int) -> list[Result]:
+        with EventDatabase(self.event_uniq_id, 'r') as event_database:
+            event_database: EventDatabase
+            return list(event_database.get_results_since(last_id, self.limit, *self.tournament_uniq_ids))
+
+    def count_results(self, first_id: int, last_id: int) -> int:
+        with EventDatabase(self.event_uniq_id, 'r') as event_database:
+            event_database: EventDatabase
+            return event_database.count_results(first_id, last_id, *self.tournament_uniq_ids)
+
 
 class ScreenBuilder:
     def __init__(
             self, config_reader: ConfigReader, event_uniq_id: str, tournaments: dict[str, Tournament],
-            templates: dict[str, Template], screens_by_family_id: dict[str, list[AScreen]]):
+            templates: dict[str, Template], screens_by_family_id: dict[str, list[AScreen]],
+            only_screen_ids: list[str] | None = None):
+        """Builds the screens of the event.
+        If only_screen_ids is set, only these screens and the screens of their menus are built."""
         self._config_reader: ConfigReader = config_reader
         self.event_uniq_id: str = event_uniq_id
         self._tournaments: dict[str, Tournament] = tournaments
@@ -246,6 +251,9 @@ class ScreenBuilder:
         screen_ids: list[str] = self._read_screen_ids()
         if not screen_ids:
             self._add_default_screens(screen_ids)
+        if only_screen_ids is not None:
+            self._build_only_screens(screen_ids, only_screen_ids)
+            return
         for screen_id in screen_ids:
             if screen := self._build_screen(screen_id):
                 self.screens[screen.id] = screen
@@ -253,6 +261,51 @@ class ScreenBuilder:
             self._config_reader.add_warning("aucun écran n'a été initialisé")
         self._update_screens()
 
+    def _build_only_screens(self, screen_ids: list[str], only_screen_ids: list[str]):
+        screens: dict[str, AScreen] = {}
+        for screen_id in screen_ids:
+            if screen_id in only_screen_ids:
+                if screen := self._build_screen(screen_id):
+                    screens[screen.id] = screen
+        menu_screen_ids: set[str] = set()
+        for screen in screens.values():
+            menu_screen_ids.update(self._get_menu_screen_ids(screen, screen_ids))
+        for screen_id in screen_ids:
+            if screen_id in menu_screen_ids and screen_id not in screens:
+                if screen := self._build_screen(screen_id):
+                    screens[screen.id] = screen
+        # keep the order of the configuration file, as when building all the screens
+        self.screens = {screen_id: screens[screen_id] for screen_id in screen_ids if screen_id in screens}
+        screen_indexes: dict[str, int] = {screen_id: index for index, screen_id in enumerate(screen_ids)}
+        for family_screens in self._screens_by_family_id.values():
+            family_screens.sort(key=lambda family_screen: screen_indexes[family_screen.id])
+        self._update_screens([screen for screen in self.screens.values() if screen.id in only_screen_ids])
+
+    def _screen_has_menu_text(self, screen_id: str) -> bool:
+        screen_section = self._config_reader[f'screen.{screen_id}']
+        if 'menu_text' in screen_section:
+            return True
+        template: Template | None = self._templates.get(screen_section.get('template'))
+        return template is not None and 'menu_text' in template.data[None]
+
+    def _get_menu_screen_ids(self, screen: AScreen, screen_ids: list[str]) -> Iterator[str]:
+        """Yields the ids of the screens that can be referenced by the menu of a screen (before building them)."""
+        if screen.menu is None:
+            return
+        if screen.menu in ['@view', '@update', ]:
+            yield from filter(self._screen_has_menu_text, screen_ids)
+            return
+        for menu_part in map(str.strip, screen.menu.split(',')):
+            if menu_part.startswith('@family'):
+                yield from (
+                    screen_id for screen_id in screen_ids
+                    if self._config_reader[f'screen.{screen_id}'].get('__family__') == screen.family_id
+                )
+            elif '*' in menu_part:
+                yield from fnmatch.filter(screen_ids, menu_part)
+            elif menu_part:
+                yield menu_part
+
     def _read_screen_ids(self) -> list[str]:
         return self._config_reader.get_subsection_keys_with_prefix('screen')
 
@@ -545,13 +598,11 @@ class ScreenBuilder:
             if tournament_uniq_ids:
                 for tournament_uniq_id in tournament_uniq_ids:
                     screen_file_dependencies += [
-                        self._tournaments[tournament_uniq_id].file,
                         self._tournaments[tournament_uniq_id].results_marker,
                     ]
             else:
                 for tournament in self._tournaments.values():
                     screen_file_dependencies += [
-                        tournament.file,
                         tournament.results_marker,
                     ]
         screen.set_file_dependencies(screen_file_dependencies, )
@@ -587,7 +638,7 @@ class ScreenBuilder:
                         f"l'écran [{screen_id}] n'existe pas, ignoré",
                         f'screen.{screen_id}', 'menu')
 
-    def _update_screens(self):
+    def _update_screens(self, screens: list[AScreen] | None = None):
         view_menu: list[AScreen] = []
         update_menu: list[AScreen] = []
         for screen in self.screens.values():
@@ -597,7 +648,7 @@ class ScreenBuilder:
                 else:
                     view_menu.append(screen)
 
-        for screen in self.screens.values():
+        for screen in self.screens.values() if screens is None else screens:
             if screen.menu is None:
                 screen.menu_screens = []
                 continue
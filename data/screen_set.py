@@ -1,18 +1,20 @@
-import json
 import math
 from pathlib import Path
 from typing import Any, TYPE_CHECKING
 from logging import Logger
 from dataclasses import dataclass, field
-from itertools import chain, islice
+from itertools import chain
+from operator import attrgetter
 from collections.abc import Iterable
 
 from common.config_reader import ConfigReader, TMP_DIR
+from common.file_dependencies import file_dependencies
 from common.logger import get_logger
 from data.board import Board
 from data.player import Player
 from data.tournament import Tournament
-from data.util import ScreenType, batched
+from data.tournament_snapshot import TournamentSnapshot
+from data.util import ScreenType
 
 logger: Logger = get_logger()
 
@@ -35,6 +37,17 @@ class ScreenSet:
     first_item: Any | None = field(default=None, init=False)
     last_item: Any | None = field(default=None, init=False)
     items_lists: list[list[Any]] | None = field(default=None, init=False)
+    # the snapshot of the tournament the items were extracted from (they are extracted again from the newer snapshots)
+    items_snapshot: TournamentSnapshot | None = field(default=None, init=False)
+    # the name with the tournament, the first and the last items set
+    formatted_name: str | None = field(default=None, init=False)
+
+    def __getstate__(self) -> dict:
+        # the items are extracted again from the tournament when the compiled configuration is loaded
+        state: dict = self.__dict__.copy()
+        state['first_item'] = state['last_item'] = state['items_lists'] = None
+        state['items_snapshot'] = state['formatted_name'] = None
+        return state
 
     @property
     def name_for_boards(self) -> str | None:
@@ -42,12 +55,12 @@ class ScreenSet:
             self._extract_boards()
         else:
             self._extract_players_by_name()
-        return self.name
+        return self.formatted_name
 
     @property
     def name_for_players(self) -> str | None:
         self._extract_players_by_name()
-        return self.name
+        return self.formatted_name
 
     def _extract_data(self, items: list[Any]):
         if not items:
@@ -71,10 +84,10 @@ class ScreenSet:
         if self.fixed_boards:
             if TYPE_CHECKING:
                 assert all(isinstance(item, Board) for item in items)
-            selected_items = [
-                board for board in items
-                if board.number in self.fixed_boards
-            ]
+            boards_by_number: dict[int, list[Board]] = self.items_snapshot.indexes.boards_by_number
+            selected_items = sorted(
+                chain.from_iterable(boards_by_number.get(number, ()) for number in set(self.fixed_boards)),
+                key=attrgetter('id'))
         else:
             first = self.first - 1 if self.first is not None else 0
             last = self.last if self.last is not None else len(items)
@@ -91,18 +104,13 @@ class ScreenSet:
                 # NOTE(Amaras): this assumes that *self.part* is set,
                 # which must be the case if either *self.parts* or
                 # *self.number* is set.
-                try:
-                    selected_items = list(
-                        next(
-                            islice(
-                                batched(items[selected_slice], number),
-                                self.part - 1,
-                                self.part
-                            )))
-                except StopIteration:
+                # the indexes of the items of the part are computed without iterating over the items
+                part_range: range = range(len(items))[selected_slice][(self.part - 1) * number:self.part * number]
+                if not part_range:
                     self.first_item = self.last_item = None
                     self.items_lists = None
                     return
+                selected_items = items[part_range.start:part_range.stop]
             else:
                 selected_items = items[selected_slice]
             self.first_item = selected_items[0]
@@ -121,18 +129,22 @@ class ScreenSet:
             first_index = last_index
 
     def _extract_boards(self):
-        if self.items_lists is None:
-            self._extract_data(self.tournament.boards)
-            if self.name is None:
+        snapshot: TournamentSnapshot = self.tournament.snapshot
+        if self.items_lists is None or self.items_snapshot is not snapshot:
+            self.items_snapshot = snapshot
+            self._extract_data(snapshot.boards)
+            name: str | None = self.name
+            if name is None:
                 if self.first or self.last or self.part or self.number:
-                    self.name = 'Ech. %f à %l'
+                    name = 'Ech. %f à %l'
                 else:
-                    self.name = '%t'
-            self.name = self.name.replace('%t', str(self.tournament.name))
-            if r'%f' in self.name and self.first_item is not None:
-                self.name = self.name.replace(r'%f', str(self.first_board.id))
-            if r'%l' in self.name and self.last_item is not None:
-                self.name = self.name.replace(r'%l', str(self.last_board.id))
+                    name = '%t'
+            name = name.replace('%t', str(self.tournament.name))
+            if r'%f' in name and self.first_item is not None:
+                name = name.replace(r'%f', str(self.first_item.id))
+            if r'%l' in name and self.last_item is not None:
+                name = name.replace(r'%l', str(self.last_item.id))
+            self.formatted_name = name
 
     @property
     def boards_lists(self) -> list[list[Board]]:
@@ -163,21 +175,25 @@ class ScreenSet:
         return self.last_item
 
     def _extract_players_by_name(self):
-        if self.items_lists is None:
+        snapshot: TournamentSnapshot = self.tournament.snapshot
+        if self.items_lists is None or self.items_snapshot is not snapshot:
+            self.items_snapshot = snapshot
             if self.show_unpaired:
-                self._extract_data(self.tournament.players_by_name_with_unpaired)
+                self._extract_data(snapshot.indexes.players_by_name_with_unpaired)
             else:
-                self._extract_data(self.tournament.players_by_name_without_unpaired)
-            if self.name is None:
+                self._extract_data(snapshot.indexes.players_by_name_without_unpaired)
+            name: str | None = self.name
+            if name is None:
                 if self.first or self.last or self.part or self.number:
-                    self.name = '%f à %l'
+                    name = '%f à %l'
                 else:
-                    self.name = '%t'
-            self.name = self.name.replace('%t', str(self.tournament.name))
+                    name = '%t'
+            name = name.replace('%t', str(self.tournament.name))
             if self.first_item is not None:
-                self.name = self.name.replace('%f', self.first_player_by_name.last_name)
+                name = name.replace('%f', self.first_item.last_name)
             if self.last_item is not None:
-                self.name = self.name.replace('%l', self.last_player_by_name.last_name)
+                name = name.replace('%l', self.last_item.last_name)
+            self.formatted_name = name
 
     @property
     def players_by_name_lists(self) -> list[list[Player]]:
@@ -234,22 +250,12 @@ class ScreenSet:
 
     @classmethod
     def get_screen_set_file_dependencies(cls, event_uniq_id: str, screen_id: str, screen_set_id: int) -> list[Path]:
-        file_dependencies_file = cls.__get_screen_set_file_dependencies_file(event_uniq_id, screen_id, screen_set_id)
-        try:
-            with open(file_dependencies_file, 'r', encoding='utf-8') as f:
-                return [Path(file) for file in json.load(f)]
-        except FileNotFoundError:
-            return []
+        return file_dependencies.get(
+            cls.__get_screen_set_file_dependencies_file(event_uniq_id, screen_id, screen_set_id))
 
     def set_file_dependencies(self, files: list[Path]):
-        file_dependencies_file = self.__get_screen_set_file_dependencies_file(
-            self.event_uniq_id, self.screen_id, self.id)
-        try:
-            file_dependencies_file.parents[0].mkdir(parents=True, exist_ok=True)
-            with open(file_dependencies_file, 'w', encoding='utf-8') as f:
-                return f.write(json.dumps([str(file) for file in files]))
-        except FileNotFoundError:
-            return []
+        file_dependencies.set(
+            self.__get_screen_set_file_dependencies_file(self.event_uniq_id, self.screen_id, self.id), files)
 
     def __str__(self):
         if self.fixed_boards:
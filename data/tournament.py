@@ -1,27 +1,62 @@
 import re
 import time
-from collections import Counter
+from collections.abc import Callable
 from logging import Logger
-from operator import attrgetter
 from pathlib import Path
 from typing import NamedTuple
 
 from common.config_reader import TMP_DIR, ConfigReader
+from common.file_watcher import file_watcher
 from common.logger import get_logger
+from common.read_only import writes_allowed
 from data.board import Board
 from data.chessevent import ChessEvent
 from data.chessevent_tournament import ChessEventTournament
 from data.player import Player
-from data.util import Color, NeedsUpload, TournamentRating
+from data.result_journal import schedule_result_journal
+from data.tournament_snapshot import TournamentSnapshot, TournamentSnapshotKey, get_tournament_snapshot, \
+    refresh_tournament_snapshot, add_tournament_snapshot_listener, update_tournament_snapshot
+from data.util import NeedsUpload
 from data.util import TournamentPairing, Result
 from database.papi import PapiDatabase
 from data.util import DEFAULT_RECORD_ILLEGAL_MOVES_NUMBER
-from database.sqlite import EventDatabase
+from database.sqlite import EventDatabase, event_database_files
 from database.store import StoredTournament
 
 logger: Logger = get_logger()
 
 
+def _store_result_players(key: TournamentSnapshotKey, snapshot: TournamentSnapshot):
+    """Stores the players in the results entered before the players were stored with the results, so that the results
+    screens do not need to read the Papi files."""
+    if not writes_allowed():
+        # the snapshot was built by a display request, the players will be stored by the next build
+        return
+    with EventDatabase(key.event_uniq_id, 'r') as event_database:
+        event_database: EventDatabase
+        results: list[tuple[int, int, int]] = event_database.get_results_without_players(key.tournament_uniq_id)
+    result_players: list[tuple[int, str, int, str, int]] = []
+    for result_id, white_player_id, black_player_id in results:
+        white_player: Player | None = snapshot.players_by_id.get(white_player_id)
+        black_player: Player | None = snapshot.players_by_id.get(black_player_id)
+        if white_player is not None and black_player is not None:
+            result_players.append((
+                result_id,
+                f'{white_player.last_name} {white_player.first_name}', white_player.rating,
+                f'{black_player.last_name} {black_player.first_name}', black_player.rating,
+            ))
+    if result_players:
+        with EventDatabase(key.event_uniq_id, 'w') as event_database:
+            event_database: EventDatabase
+            event_database.set_result_players(result_players)
+            event_database.commit()
+        logger.info('Joueurs de %d résultat(s) du tournoi [%s/%s] enregistrés',
+                    len(result_players), key.event_uniq_id, key.tournament_uniq_id)
+
+
+add_tournament_snapshot_listener(_store_result_players)
+
+
 class Tournament:
     def __init__(self, event_uniq_id: str, tournament_uniq_id: str, name: str, file: Path, ffe_id: int | None,
                  ffe_password: str | None, handicap_initial_time: int | None, handicap_increment: int | None,
@@ -42,20 +77,51 @@ class Tournament:
         self.chessevent: ChessEvent | None = chessevent
         self.chessevent_tournament_name: str | None = chessevent_tournament_name
         self.record_illegal_moves: int = record_illegal_moves
-        self._rounds: int = 0
-        self._pairing: TournamentPairing = TournamentPairing.STANDARD
-        self._rating: TournamentRating | None = None
-        self._players_by_id: dict[int, Player] = {}
-        self._current_round: int = 0
-        self._rating_limit1: int = 0
-        self._rating_limit2: int = 0
-        self._boards: list[Board] | None = None
-        self._unpaired_players: list[Player] | None = None
-        self._database_read = False
-        self._players_by_name: list[Player] | None = None
+        self._clear_database_data()
         self.last_illegal_move_update: float = 0.0
         self.last_result_update: float = 0.0
 
+    def _clear_database_data(self):
+        self._database_read: bool = False
+        self._snapshot_key: TournamentSnapshotKey | None = None
+
+    def __getstate__(self) -> dict:
+        # the data read from the Papi database is not stored in the compiled configuration of the event
+        state: dict = self.__dict__.copy()
+        state.pop('_database_read', None)
+        state.pop('_snapshot_key', None)
+        return state
+
+    def __setstate__(self, state: dict):
+        self.__dict__.update(state)
+        self._clear_database_data()
+
+    @property
+    def database_read(self) -> bool:
+        """True if the data of the tournament was read since the tournament was built."""
+        return self._database_read
+
+    @property
+    def snapshot_key(self) -> TournamentSnapshotKey:
+        if self._snapshot_key is None:
+            self._snapshot_key = TournamentSnapshotKey(
+                self.event_uniq_id, self.uniq_id, self.file, self.handicap_initial_time, self.handicap_increment,
+                self.handicap_penalty_step, self.handicap_penalty_value, self.handicap_min_time)
+        return self._snapshot_key
+
+    @property
+    def snapshot(self) -> TournamentSnapshot:
+        """The latest data read from the Papi database (the tournament does not keep it, so that the events built
+        stay up to date when the tournament is read again)."""
+        self._database_read = True
+        return get_tournament_snapshot(self.snapshot_key)
+
+    def _update_snapshot(
+            self, written_files: list[Path], update: Callable[[TournamentSnapshot], TournamentSnapshot | None]):
+        """Applies a change written by Papi-web to the snapshot in memory (the tournament is read again if the change
+        can not be applied)."""
+        update_tournament_snapshot(self.snapshot_key, written_files, update)
+
     @property
     def download_allowed(self) -> bool:
         return self.file.exists()
@@ -74,201 +140,64 @@ class Tournament:
 
     @property
     def rounds(self) -> int:
-        self.read_database()
-        return self._rounds
+        return self.snapshot.rounds
 
     @property
     def pairing(self) -> TournamentPairing:
-        self.read_database()
-        return self._pairing
+        return self.snapshot.pairing
 
     @property
     def rating(self) -> int:
-        self.read_database()
-        return self._rating
+        return self.snapshot.rating
 
     @property
     def rating_limit1(self) -> int:
-        self.read_database()
-        return self._rating_limit1
+        return self.snapshot.rating_limit1
 
     @property
     def rating_limit2(self) -> int:
-        self.read_database()
-        return self._rating_limit2
+        return self.snapshot.rating_limit2
 
     @property
     def players_by_id(self) -> dict[int, Player]:
-        self.read_database()
-        return self._players_by_id
+        return self.snapshot.players_by_id
 
     @property
     def players_by_name_with_unpaired(self) -> list[Player]:
-        if self._players_by_name is None:
-            players: list[Player] = list(self.players_by_id.values())[1:]
-            self._players_by_name = sorted(
-                players, key=lambda player: (player.last_name, player.first_name))
-        return self._players_by_name
+        return self.snapshot.indexes.players_by_name_with_unpaired
 
     @property
     def players_by_name_without_unpaired(self) -> list[Player]:
-        if self._players_by_name is None:
-            players: list[Player] = []
-            for player in list(self.players_by_id.values())[1:]:
-                if not self.current_round or player.board_id:
-                    players.append(player)
-            self._players_by_name = sorted(
-                players, key=lambda p: (p.last_name, p.first_name))
-        return self._players_by_name
+        return self.snapshot.indexes.players_by_name_without_unpaired
+
+    @property
+    def boards_by_number(self) -> dict[int, list[Board]]:
+        return self.snapshot.indexes.boards_by_number
 
     @property
     def current_round(self) -> int | None:
-        self.read_database()
-        return self._current_round
+        return self.snapshot.current_round
 
     @property
     def boards(self) -> list[Board] | None:
-        self.read_database()
-        return self._boards
+        return self.snapshot.boards
 
     @property
     def unpaired_players(self) -> list[Player] | None:
-        self.read_database()
-        return self._unpaired_players
+        return self.snapshot.unpaired_players
 
     @property
     def print_real_points(self) -> bool:
-        match self._pairing:
-            case _ if self._current_round is None:
+        match self.pairing:
+            case _ if self.current_round is None:
                 return False
             case TournamentPairing.HALEY | TournamentPairing.HALEY_SOFT:
-                return self._current_round <= 2
-            case TournamentPairing.SAD if self._rounds is not None:
-                return self._current_round <= self._rounds - 2
+                return self.current_round <= 2
+            case TournamentPairing.SAD if self.rounds is not None:
+                return self.current_round <= self.rounds - 2
             case _:
                 return False
 
-    def read_database(self):
-        if self._database_read:
-            return
-        if self.file and self.file.exists():
-            with PapiDatabase(self.event_uniq_id, self.uniq_id, self.file, 'r') as papi_database:
-                papi_database: PapiDatabase
-                (
-                    self._rounds,
-                    self._pairing,
-                    self._rating,
-                    self._rating_limit1,
-                    self._rating_limit2
-                ) = papi_database.read_info()
-                self._players_by_id = papi_database.read_players(self._rating, self._rounds)
-        self._database_read = True
-        self._calculate_current_round()
-        self._set_players_illegal_moves()  # load illegal moves for the current round
-        self._calculate_points()
-        self._build_boards()
-
-    def _calculate_current_round(self):
-        round_infos: dict[int, dict[str, bool]] = {}
-        paired_rounds: list[int] = []
-        for round_ in range(1, self._rounds + 1):
-            round_infos[round_] = {
-                'pairings_found': False,
-                'results_missing': False,
-            }
-            for player in self._players_by_id.values():
-                if player.id != 1:
-                    color, opponent_id, result = player.pairings[round_]
-                    if color in ['W', 'B', ]:
-                        round_infos[round_]['pairings_found'] = True
-                        paired_rounds.append(round_)
-                    # NOTE(Amaras) Why is it called RESULT_NOT_PAIRED if it also
-                    # represents a missing result?
-                    if result == Result.NOT_PAIRED and opponent_id is not None:
-                        round_infos[round_]['results_missing'] = True
-                    if round_infos[round_]['pairings_found'] and round_infos[round_]['results_missing']:
-                        break
-        # the current round is the first one with pairings and no missing result
-        if paired_rounds:
-            for round_ in paired_rounds:
-                if round_infos[round_]['results_missing']:
-                    self._current_round = round_
-                    break
-            if self._current_round == 0:
-                self._current_round = paired_rounds[-1]
-
-    def _calculate_points(self):
-        for player in self._players_by_id.values():
-            if player.id == 1:
-                continue
-            # real points
-            player.compute_points(self._current_round)
-            # virtual points
-            player.vpoints = 0.0
-            if self._pairing == TournamentPairing.HALEY:
-                if self._current_round <= 2:
-                    if player.rating >= self._rating_limit1:
-                        player.add_vpoints(1.0)
-            elif self._pairing == TournamentPairing.HALEY_SOFT:
-                # Round 1: All players above rating_limit1 get 1 vpoint
-                # Round 2: All players above rating_limit1 get 1 vpoint
-                # Round 2: All other players get .5 vpoints
-                # bottom of page #138 on
-                # https://dna.ffechecs.fr/wp-content/uploads/sites/2/2023/10/Livre-arbitre-octobre-2023.pdf,
-                # please remove if OK
-                if self._current_round <= 2:
-                    if player.rating >= self.rating_limit1:
-                        player.add_vpoints(1.0)
-                    else:
-                        if self._current_round == 2:
-                            player.add_vpoints(0.5)
-            elif self._pairing == TournamentPairing.SAD:
-                # À l'appariement de l'avant-dernière ronde, les points
-                # fictifs sont retirés et le système devient un système
-                # Suisse intégral.
-                if self._current_round <= self._rounds - 2:
-                    # En début de tournoi, les joueurs du groupe A ont
-                    # deux points fictifs (PF = 2), ceux du groupe B un
-                    # point fictif (PF = 1), ceux du groupe C aucun point
-                    # fictif (PF = 0)
-                    if player.rating >= self._rating_limit1:
-                        player.add_vpoints(2.0)
-                    elif player.rating >= self._rating_limit2:
-                        player.add_vpoints(1.0)
-                    if player.rating < self._rating_limit1:
-                        # Lorsqu'un joueur des groupes B ou C marque
-                        # sur l'échiquier au moins 1,5 point, son capital
-                        # fictif augmente de 0,5 point.
-                        if player.points >= 1.5:
-                            player.add_vpoints(0.5)
-                        # Lorsque ce joueur marque sur l'échiquier son
-                        # troisième point, son capital fictif augmente une
-                        # nouvelle fois de 0,5 point.
-                        if player.points >= 3:
-                            player.add_vpoints(0.5)
-                        if player.rating < self._rating_limit2:
-                            # Lorsqu'un joueur du groupe C marque sur
-                            # l'échiquier au moins 4,5 points, son capital
-                            # fictif augmente pour la troisième fois de
-                            # 0,5 point.
-                            if player.points >= 4.5:
-                                player.add_vpoints(0.5)
-
-                            # Lorsqu'un joueur du groupe C marque sur
-                            # l'échiquier au moins 6 points, son capital
-                            # fictif augmente pour la dernière fois de
-                            # 0,5 points (maximum de 2 points fictifs)
-                            if player.points >= 6:
-                                player.add_vpoints(0.5)
-
-                        # Le capital fictif est automatiquement porté à 2
-                        # points si le joueur a marqué la moitié des points
-                        # possibles sur l'échiquier (il est sous-évalué par
-                        # le classement ELO)
-                        if player.points * 2 >= self._rounds:
-                            player.vpoints = 2
-            player.add_vpoints(player.points)
-
     @property
     def _illegal_moves_marker_dir(self) -> Path:
         return TMP_DIR / 'events' / self.event_uniq_id / 'illegal_moves'
@@ -280,12 +209,15 @@ class Tournament:
     def _touch_illegal_moves_marker(self):
         self._illegal_moves_marker_dir.mkdir(exist_ok=True)
         self.illegal_moves_marker.touch(exist_ok=True)
+        file_watcher.notify(self.illegal_moves_marker)
 
     def store_illegal_move(self, player: Player):
         with EventDatabase(self.event_uniq_id, 'w') as event_database:
             event_database: EventDatabase
             event_database.add_illegal_move(self.uniq_id, self.current_round, player.id)
             event_database.commit()
+        self._update_snapshot(
+            event_database_files(self.event_uniq_id), lambda snapshot: snapshot.with_illegal_moves(player.id, 1))
         self._touch_illegal_moves_marker()
         logger.info('le coup illégal a été enregistré')
     
@@ -294,6 +226,9 @@ class Tournament:
             event_database: EventDatabase
             deleted: bool = event_database.delete_illegal_move(self.uniq_id, self.current_round, player.id)
             event_database.commit()
+        if deleted:
+            self._update_snapshot(
+                event_database_files(self.event_uniq_id), lambda snapshot: snapshot.with_illegal_moves(player.id, -1))
         self._touch_illegal_moves_marker()
         if deleted:
             logger.info('un coup illégal a été supprimé pour le·la joueur·euse [%s]', player.id)
@@ -301,70 +236,6 @@ class Tournament:
             logger.info('aucun coup illégal n\'a été trouvé pour le·la joueur·euse [%s]', player.id)
         return deleted
 
-    def get_illegal_moves(self) -> Counter[int]:
-        with EventDatabase(self.event_uniq_id, 'r') as event_database:
-            event_database: EventDatabase
-            return event_database.get_illegal_moves(self.uniq_id, self.current_round)
-
-    def _set_players_illegal_moves(self):
-        illegal_moves: Counter[int] = self.get_illegal_moves()
-        for player in self._players_by_id.values():
-            if player.id == 1:
-                continue
-            player.illegal_moves = illegal_moves[player.id]
-
-    def _build_boards(self):
-        if not self._current_round:
-            return
-        self._boards: list[Board] = []
-        self._unpaired_players: list[Player] = []
-        for player in self._players_by_id.values():
-            opponent_id = player.pairings[self._current_round].opponent_id
-            if opponent_id in self._players_by_id:
-                player_board: Board | None = None
-                for board in self._boards:
-                    if board.white_player is not None and board.white_player.id == opponent_id:
-                        player_board = board
-                        player_board.black_player = player
-                        break
-                    elif board.black_player is not None and board.black_player.id == opponent_id:
-                        player_board = board
-                        player_board.white_player = player
-                        break
-                if player_board is None:
-                    if player.pairings[self._current_round].color == Color.WHITE:
-                        self._boards.append(Board(white_player=player))
-                    else:
-                        self._boards.append(Board(black_player=player))
-            else:
-                self._unpaired_players.append(player)
-        self._boards = sorted(self._boards, reverse=True)
-        for index, board in enumerate(self._boards, start=1):
-            board.id = index
-            number: int = board.white_player.fixed or board.black_player.fixed or index
-            board.number = number
-            board.white_player.set_board(index, number, Color.WHITE)
-            board.black_player.set_board(index, number, Color.BLACK)
-            board.result = board.white_player.pairings[self._current_round].result
-            if self.handicap:
-                strong_player: Player
-                weak_player: Player
-                strong_player, weak_player = sorted(
-                    (board.white_player, board.black_player),
-                    key=attrgetter('rating'),
-                    reverse=True
-                )
-                weak_time = self.handicap_initial_time
-                rating_diff = strong_player.rating - weak_player.rating
-                penalties = rating_diff // self.handicap_penalty_step
-                strong_time = max(
-                    weak_time - penalties * self.handicap_penalty_value,
-                    self.handicap_min_time
-                )
-                strong_player.set_handicap(
-                    strong_time, self.handicap_increment, penalties > 0)
-                weak_player.set_handicap(weak_time, self.handicap_increment, False)
-
     def ffe_upload_needed(self, ffe_upload_delay) -> NeedsUpload:
         try:
             marker_time = self.ffe_upload_marker.lstat().st_mtime
@@ -389,38 +260,43 @@ class Tournament:
     def _touch_results_marker(self):
         self._results_marker_dir.mkdir(exist_ok=True)
         self.results_marker.touch(exist_ok=True)
+        file_watcher.notify(self.results_marker)
 
     def add_result(self, board: Board, white_result: Result):
         black_result = white_result.opposite_result
-        with PapiDatabase(self.event_uniq_id, self.uniq_id, self.file, 'w') as papi_database:
-            papi_database: PapiDatabase
-            papi_database.add_board_result(board.white_player.id, self._current_round, white_result)
-            papi_database.add_board_result(board.black_player.id, self._current_round, black_result)
-            papi_database.commit()
+        # the result is written to the journal of the event database, the Papi file is written in the background
         with EventDatabase(self.event_uniq_id, 'w') as event_database:
             event_database: EventDatabase
             event_database.add_result(self.uniq_id, self.current_round, board, white_result)
+            event_database.add_result_journal_entry(self.uniq_id, self.current_round, board, white_result, black_result)
             event_database.commit()
+        # the snapshot is updated before the marker is touched, for the clients to get the new data
+        self._update_snapshot(
+            event_database_files(self.event_uniq_id),
+            lambda snapshot: snapshot.with_result(board.id, board.white_player.id, board.black_player.id, white_result))
         self._touch_results_marker()
+        schedule_result_journal(self.snapshot_key)
         logger.info('Added result: %s %s %d.%d %s %s %d %s %s %s %d',
-                    self.event_uniq_id, self.uniq_id, self._current_round, board.id, board.white_player.last_name,
+                    self.event_uniq_id, self.uniq_id, self.current_round, board.id, board.white_player.last_name,
                     board.white_player.first_name, board.white_player.rating, white_result,
                     board.black_player.last_name, board.black_player.first_name,
                     board.black_player.rating)
     
     def delete_result(self, board: Board):
-        with PapiDatabase(self.event_uniq_id, self.uniq_id, self.file, 'w') as papi_database:
-            papi_database: PapiDatabase
-            papi_database.remove_board_result(board.white_player.id, self._current_round)
-            papi_database.remove_board_result(board.black_player.id, self._current_round)
-            papi_database.commit()
         with EventDatabase(self.event_uniq_id, 'w') as event_database:
             event_database: EventDatabase
             event_database.delete_result(self.uniq_id, self.current_round, board.id)
+            event_database.add_result_journal_entry(
+                self.uniq_id, self.current_round, board, Result.NOT_PAIRED, Result.NOT_PAIRED)
             event_database.commit()
+        self._update_snapshot(
+            event_database_files(self.event_uniq_id),
+            lambda snapshot: snapshot.with_result(
+                board.id, board.white_player.id, board.black_player.id, Result.NOT_PAIRED))
         self._touch_results_marker()
+        schedule_result_journal(self.snapshot_key)
         logger.info('Removed result: %s %s %d.%d',
-                    self.event_uniq_id, self.uniq_id, self._current_round, board.id)
+                    self.event_uniq_id, self.uniq_id, self.current_round, board.id)
 
     def write_chessevent_info_to_database(self, chessevent_tournament: ChessEventTournament) -> int:
         with PapiDatabase(self.event_uniq_id, self.uniq_id, self.file, 'w') as papi_database:
@@ -434,6 +310,7 @@ class Tournament:
                 papi_database.add_chessevent_player(
                     player_id, chessevent_player, chessevent_tournament.check_in_started)
             papi_database.commit()
+        refresh_tournament_snapshot(self.snapshot_key)
         return player_id - 1
 
     def check_in_player(self, player: Player, check_in: bool):
@@ -441,6 +318,7 @@ class Tournament:
             papi_database: PapiDatabase
             papi_database.check_in_player(player.id, check_in)
             papi_database.commit()
+        self._update_snapshot([self.file, ], lambda snapshot: snapshot.with_check_in(player.id, check_in))
 
 
 class HandicapTournament(NamedTuple):
@@ -702,10 +580,12 @@ class TournamentBuilder:
         tournament: Tournament = Tournament(
             self._event_uniq_id, tournament_uniq_id, name, file, ffe_id, ffe_password, *handicap_values,
             chessevent, chessevent_tournament_name, record_illegal_moves)
-        stored_tournament: StoredTournament = self.event_database.get_stored_tournament(
-            uniq_id=tournament_uniq_id, create_if_absent=True)
-        tournament.last_illegal_move_update = stored_tournament.last_illegal_move_update
-        tournament.last_result_update = stored_tournament.last_result_update
+        # the tournament is stored when the event is built at server start or by the admin pages
+        stored_tournament: StoredTournament | None = self.event_database.get_stored_tournament(
+            uniq_id=tournament_uniq_id, create_if_absent=writes_allowed())
+        if stored_tournament is not None:
+            tournament.last_illegal_move_update = stored_tournament.last_illegal_move_update
+            tournament.last_result_update = stored_tournament.last_result_update
 
         self.tournaments[tournament_uniq_id] = tournament
 
@@ -0,0 +1,729 @@
+"""The data of the tournaments read from the Papi files and the event databases.
+
+The snapshots are built in the background at server start and rebuilt by the file watcher thread when the files
+change (the previous snapshot being served during the rebuild), so that the HTTP handlers only read the latest snapshot
+of a tournament and do not open the Papi files. Only the first read of a tournament not built at server start (e.g. of
+an event added later) reads the Papi file in the HTTP handler."""
+from collections import Counter
+from copy import copy
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, replace
+from logging import Logger
+from operator import attrgetter
+from pathlib import Path
+from threading import Lock, Thread
+from typing import Self
+
+from common.file_watcher import file_watcher, get_file_version
+from common.logger import get_logger
+from data.board import Board
+from data.pairing import Pairing
+from data.pairing_table import PairingTable, PlayerPairings
+from data.player import Player
+from data.util import Color, TournamentPairing, TournamentRating, Result
+from database.papi import PapiDatabase, PlayerIdentity, PlayerRounds, TournamentInfo
+from database.sqlite import EventDatabase, event_database_files
+from database.store import StoredResultJournalEntry
+
+logger: Logger = get_logger()
+
+
+@dataclass(frozen=True)
+class TournamentSnapshotKey:
+    """The configuration of a tournament needed to build its snapshots."""
+    event_uniq_id: str
+    tournament_uniq_id: str
+    file: Path | None
+    handicap_initial_time: int | None = None
+    handicap_increment: int | None = None
+    handicap_penalty_step: int | None = None
+    handicap_penalty_value: int | None = None
+    handicap_min_time: int | None = None
+
+    @property
+    def handicap(self) -> bool:
+        return self.handicap_initial_time is not None
+
+    @property
+    def version_files(self) -> list[Path]:
+        """The files the snapshot is built from (the Papi file and the event database for illegal moves)."""
+        files: list[Path] = event_database_files(self.event_uniq_id)
+        if self.file:
+            files.append(self.file)
+        return files
+
+
+@dataclass(frozen=True)
+class TournamentIndexes:
+    """The orderings of the players and the boards of a snapshot, built once for all the screens of the event.
+
+    Only the orderings displayed by the screens are built (no screen orders the players by rating or by check-in).
+    The screen sets select their items (first, last, part, number) by computing the bounds of a slice of these lists,
+    and their fixed boards from boards_by_number."""
+    players_by_name_with_unpaired: list[Player]
+    players_by_name_without_unpaired: list[Player]
+    # the boards by number (several boards may have the same number when the fixed boards collide)
+    boards_by_number: dict[int, list[Board]]
+
+    @classmethod
+    def build(cls, players_by_id: dict[int, Player], current_round: int, boards: list[Board] | None) -> Self:
+        boards_by_number: dict[int, list[Board]] = {}
+        for board in boards or ():
+            boards_by_number.setdefault(board.number, []).append(board)
+        players_by_name: list[Player] = sorted(
+            (player for player in players_by_id.values() if player.id != 1),
+            key=attrgetter('last_name', 'first_name'))
+        return cls(
+            players_by_name_with_unpaired=players_by_name,
+            players_by_name_without_unpaired=[
+                player for player in players_by_name if not current_round or player.board_id],
+            boards_by_number=boards_by_number,
+        )
+
+    def with_players(self, players_by_id: dict[int, Player], boards: list[Board] | None) -> Self:
+        """Returns the indexes of the same players and boards (some of them being replaced by copies with the same
+        names and boards), without sorting them again."""
+        boards_by_number: dict[int, list[Board]] = {}
+        for board in boards or ():
+            boards_by_number.setdefault(board.number, []).append(board)
+        return replace(
+            self,
+            players_by_name_with_unpaired=[
+                players_by_id[player.id] for player in self.players_by_name_with_unpaired],
+            players_by_name_without_unpaired=[
+                players_by_id[player.id] for player in self.players_by_name_without_unpaired],
+            boards_by_number=boards_by_number,
+        )
+
+
+@dataclass(frozen=True)
+class TournamentSnapshot:
+    """The data of a tournament at a given time, never modified once built (the with_*() methods apply the changes
+    made from Papi-web to a new snapshot, sharing the players and the boards not changed)."""
+    rounds: int
+    pairing: TournamentPairing
+    rating: TournamentRating | None
+    rating_limit1: int
+    rating_limit2: int
+    players_by_id: dict[int, Player]
+    current_round: int
+    boards: list[Board] | None
+    unpaired_players: list[Player] | None
+    files_version: tuple
+    # the number of results entered but not yet written to the Papi file
+    pending_results: int = 0
+    # the pairings of the players, with and without the results not yet written to the Papi file
+    pairing_table: PairingTable | None = None
+    papi_pairing_table: PairingTable | None = None
+    indexes: TournamentIndexes | None = None
+
+    def _get_board(self, board_id: int, white_player_id: int, black_player_id: int) -> Board | None:
+        """Returns the board of the current round if its players did not change."""
+        if not self.boards or not 1 <= board_id <= len(self.boards):
+            return None
+        board: Board = self.boards[board_id - 1]
+        if board.white_player.id != white_player_id or board.black_player.id != black_player_id:
+            return None
+        return board
+
+    def with_result(
+            self, board_id: int, white_player_id: int, black_player_id: int, white_result: Result
+    ) -> Self | None:
+        """Sets the result of a board (Result.NOT_PAIRED to delete it), entered but not yet written to the Papi file.
+        Returns None if the snapshot must be built again from the files."""
+        board: Board | None = self._get_board(board_id, white_player_id, black_player_id)
+        if board is None:
+            return None
+        pairing_table: PairingTable = self.pairing_table.with_results(self.current_round, {
+            board.white_player.pairings.row: white_result,
+            board.black_player.pairings.row: white_result.opposite_result,
+        })
+        if pairing_table.current_round() != self.current_round:
+            # the last result of the round was entered while the next round was already paired
+            return None
+        white_player: Player = copy(board.white_player)
+        white_player.pairings = PlayerPairings(pairing_table, board.white_player.pairings.row)
+        black_player: Player = copy(board.black_player)
+        black_player.pairings = PlayerPairings(pairing_table, board.black_player.pairings.row)
+        return self._with_players(
+            [white_player, black_player, ],
+            [replace(board, white_player=white_player, black_player=black_player, result=white_result,
+                     result_pending=True), ],
+            pairing_table=pairing_table, pending_results=self.pending_results + 1)
+
+    def with_illegal_moves(self, player_id: int, added_illegal_moves: int) -> Self | None:
+        """Adds illegal moves to a player for the current round (removes them if added_illegal_moves is negative)."""
+        player: Player | None = self.players_by_id.get(player_id)
+        if player is None:
+            return None
+        player = copy(player)
+        player.illegal_moves += added_illegal_moves
+        return self._with_players([player, ])
+
+    def with_check_in(self, player_id: int, check_in: bool) -> Self | None:
+        """Sets the check-in of a player (before the first round)."""
+        player: Player | None = self.players_by_id.get(player_id)
+        if player is None or self.current_round:
+            return None
+        player = copy(player)
+        player.check_in = check_in
+        return self._with_players([player, ])
+
+    def _with_players(self, players: list[Player], boards: list[Board] | None = None, **changes) -> Self:
+        """Returns a new snapshot where the given players and boards (copies of the ones of this snapshot) replace the
+        players and the boards with the same ids, the others being shared with this snapshot."""
+        players_by_id: dict[int, Player] = self.players_by_id | {player.id: player for player in players}
+        new_boards: list[Board] | None = self.boards
+        if new_boards is not None:
+            new_boards = list(new_boards)
+            for board in boards or ():
+                new_boards[board.id - 1] = board
+            replaced_board_ids: set[int] = {board.id for board in boards or ()}
+            for player in players:
+                if player.board_id and player.board_id not in replaced_board_ids:
+                    player_board: Board = new_boards[player.board_id - 1]
+                    new_boards[player.board_id - 1] = replace(
+                        player_board, white_player=players_by_id[player_board.white_player.id],
+                        black_player=players_by_id[player_board.black_player.id])
+        unpaired_players: list[Player] | None = self.unpaired_players
+        if unpaired_players is not None:
+            unpaired_players = [players_by_id[player.id] for player in unpaired_players]
+        return replace(
+            self, players_by_id=players_by_id, boards=new_boards, unpaired_players=unpaired_players,
+            indexes=self.indexes.with_players(players_by_id, new_boards), **changes)
+
+
+def result_journal_entry_matches(players_by_id: dict[int, Player], entry: StoredResultJournalEntry) -> bool:
+    """Returns True if the players of the journal entry are still paired together in the Papi file."""
+    white_player: Player | None = players_by_id.get(entry.white_player_id)
+    black_player: Player | None = players_by_id.get(entry.black_player_id)
+    if white_player is None or black_player is None:
+        return False
+    white_pairing: Pairing | None = white_player.pairings.get(entry.round)
+    black_pairing: Pairing | None = black_player.pairings.get(entry.round)
+    return (white_pairing is not None and white_pairing.opponent_id == entry.black_player_id
+            and black_pairing is not None and black_pairing.opponent_id == entry.white_player_id)
+
+
+class TournamentSnapshotBuilder:
+    def __init__(self, key: TournamentSnapshotKey, previous: TournamentSnapshot | None = None):
+        """Builds the snapshot of a tournament from its Papi file and the event database. When the previous snapshot
+        is given, only the current and next rounds are read from the Papi file and the boards are kept if the
+        pairings did not change (the Papi file is fully read again if the tournament or the current round changed)."""
+        self._key: TournamentSnapshotKey = key
+        # the version is computed before reading so that a change during the build is detected next time
+        files_version: tuple = tuple(get_file_version(file) for file in key.version_files)
+        self._rounds: int = 0
+        self._pairing: TournamentPairing = TournamentPairing.STANDARD
+        self._rating: TournamentRating | None = None
+        self._rating_limit1: int = 0
+        self._rating_limit2: int = 0
+        self._players_by_id: dict[int, Player] = {}
+        self._pairing_table: PairingTable = PairingTable(0)
+        # the pairings as read from the Papi file (without the results not yet written)
+        self._papi_pairing_table: PairingTable = PairingTable(0)
+        self._current_round: int = 0
+        self._boards: list[Board] | None = None
+        self._unpaired_players: list[Player] | None = None
+        self._pending_results: int = 0
+        # the players of the results not yet written to the Papi file, by round
+        self._pending_player_ids: dict[int, set[int]] = {}
+        # True if the names, ratings, titles... of players were changed in Papi (the boards are then sorted again)
+        self._identities_changed: bool = False
+        incremental: bool = False
+        if key.file and key.file.exists():
+            if previous is not None and previous.papi_pairing_table is not None:
+                incremental = self._read_papi_database_rounds(previous, files_version[-1])
+            if not incremental:
+                self._read_papi_database()
+        self._papi_pairing_table = self._pairing_table.copy()
+        self._apply_result_journal()
+        self._calculate_current_round()
+        if incremental and self._current_round != previous.current_round:
+            # the results of the previous rounds may have been modified in Papi before pairing the new round
+            incremental = False
+            self._pending_player_ids = {}
+            self._read_papi_database()
+            self._papi_pairing_table = self._pairing_table.copy()
+            self._apply_result_journal()
+            self._calculate_current_round()
+        self._set_players_illegal_moves()  # load illegal moves for the current round
+        if incremental and not self._identities_changed \
+                and self._pairing_table.same_pairings(previous.pairing_table, 1, self._current_round - 1):
+            # the points of the players did not change
+            if not self._pairing_table.same_pairings(
+                    previous.pairing_table, self._current_round, self._current_round, results=False) \
+                    or not self._update_boards(previous):
+                self._clear_players_boards()
+                self._build_boards()
+        else:
+            if incremental:
+                self._clear_players_boards()
+            self._calculate_points()
+            self._build_boards()
+        self.snapshot: TournamentSnapshot = TournamentSnapshot(
+            rounds=self._rounds,
+            pairing=self._pairing,
+            rating=self._rating,
+            rating_limit1=self._rating_limit1,
+            rating_limit2=self._rating_limit2,
+            players_by_id=self._players_by_id,
+            current_round=self._current_round,
+            boards=self._boards,
+            unpaired_players=self._unpaired_players,
+            files_version=files_version,
+            pending_results=self._pending_results,
+            pairing_table=self._pairing_table,
+            papi_pairing_table=self._papi_pairing_table,
+            indexes=TournamentIndexes.build(self._players_by_id, self._current_round, self._boards),
+        )
+
+    def _read_papi_database(self):
+        with PapiDatabase(
+                self._key.event_uniq_id, self._key.tournament_uniq_id, self._key.file, 'r') as papi_database:
+            papi_database: PapiDatabase
+            (
+                self._rounds,
+                self._pairing,
+                self._rating,
+                self._rating_limit1,
+                self._rating_limit2
+            ) = papi_database.read_info()
+            self._players_by_id, self._pairing_table = papi_database.read_players(self._rating, self._rounds)
+
+    def _read_papi_database_rounds(self, previous: TournamentSnapshot, papi_file_version: tuple | None) -> bool:
+        """Reads the identities of the players and the pairings of the current and next rounds from the Papi file
+        (nothing if the file did not change) into a copy of the players of the previous snapshot, returns False if the
+        Papi file must be fully read."""
+        info: TournamentInfo = TournamentInfo(
+            previous.rounds, previous.pairing, previous.rating, previous.rating_limit1, previous.rating_limit2)
+        players_rounds: list[PlayerRounds] = []
+        first_round: int = max(previous.current_round, 1)
+        if papi_file_version != previous.files_version[-1]:
+            with PapiDatabase(
+                    self._key.event_uniq_id, self._key.tournament_uniq_id, self._key.file, 'r') as papi_database:
+                papi_database: PapiDatabase
+                if papi_database.read_info() != info:
+                    return False
+                players_rounds = list(papi_database.read_players_rounds(info.rating, first_round, info.rounds))
+            if [player_rounds.ref for player_rounds in players_rounds] != list(previous.papi_pairing_table.player_ids):
+                return False
+        (
+            self._rounds,
+            self._pairing,
+            self._rating,
+            self._rating_limit1,
+            self._rating_limit2
+        ) = info
+        self._pairing_table = previous.papi_pairing_table.copy()
+        for row, player in enumerate(previous.players_by_id.values()):
+            player = copy(player)
+            player.pairings = PlayerPairings(self._pairing_table, row)
+            self._players_by_id[player.id] = player
+        updated_players: int = 0
+        for row, player_rounds in enumerate(players_rounds):
+            player: Player = self._players_by_id[player_rounds.ref]
+            if player_rounds.identity != PlayerIdentity(*(getattr(player, field) for field in PlayerIdentity._fields)):
+                for field, value in zip(PlayerIdentity._fields, player_rounds.identity):
+                    setattr(player, field, value)
+                self._identities_changed = True
+            player.check_in = player_rounds.check_in
+            if self._pairing_table.update_player(
+                    row, first_round, player_rounds.colors, player_rounds.opponent_ids, player_rounds.results):
+                updated_players += 1
+        logger.debug('Tournoi [%s/%s] : rondes %d à %d relues, %d joueur(s) modifié(s)',
+                     self._key.event_uniq_id, self._key.tournament_uniq_id, first_round, info.rounds,
+                     updated_players)
+        return True
+
+    def _apply_result_journal(self):
+        """Applies the results entered but not yet written to the Papi file, in the order they were entered."""
+        with EventDatabase(self._key.event_uniq_id, 'r') as event_database:
+            event_database: EventDatabase
+            entries: list[StoredResultJournalEntry] = event_database.get_result_journal_entries(
+                self._key.tournament_uniq_id)
+        for entry in entries:
+            if not result_journal_entry_matches(self._players_by_id, entry):
+                # the pairings were changed in Papi, the entry will be discarded by the applier
+                continue
+            for player_id, value in (
+                    (entry.white_player_id, entry.white_value), (entry.black_player_id, entry.black_value),
+            ):
+                player: Player = self._players_by_id[player_id]
+                player.pairings[entry.round] = replace(
+                    player.pairings[entry.round], result=Result.from_papi_value(value))
+                self._pending_player_ids.setdefault(entry.round, set()).add(player_id)
+        self._pending_results = len(entries)
+
+    def _calculate_current_round(self):
+        # the current round is the first one with pairings and missing results (or the last one with pairings)
+        self._current_round = self._pairing_table.current_round()
+
+    def _calculate_points(self):
+        """Computes the real and virtual points of the players, column by column."""
+        points: list[float] = self._pairing_table.points(self._current_round)
+        players: list[Player] = []
+        players_points: list[float] = []
+        for player_id, player_points in zip(self._pairing_table.player_ids, points):
+            if player_id != 1:
+                players.append(self._players_by_id[player_id])
+                players_points.append(player_points)
+        vpoints: Iterator[float] = map(
+            self._get_vpoints_function(), [player.rating for player in players], players_points)
+        for player, player_points, player_vpoints in zip(players, players_points, vpoints):
+            player.points = player_points
+            player.vpoints = player_vpoints + player_points
+
+    def _get_vpoints_function(self) -> Callable[[int, float], float]:
+        """Returns the function giving the virtual points of a player (without the real points) from their rating and
+        their real points."""
+        if self._pairing == TournamentPairing.HALEY:
+            if self._current_round <= 2:
+                return lambda rating, points: 1.0 if rating >= self._rating_limit1 else 0.0
+        elif self._pairing == TournamentPairing.HALEY_SOFT:
+            # Round 1: All players above rating_limit1 get 1 vpoint
+            # Round 2: All players above rating_limit1 get 1 vpoint
+            # Round 2: All other players get .5 vpoints
+            # bottom of page #138 on
+            # https://dna.ffechecs.fr/wp-content/uploads/sites/2/2023/10/Livre-arbitre-octobre-2023.pdf,
+            # please remove if OK
+            if self._current_round <= 2:
+                other_vpoints: float = 0.5 if self._current_round == 2 else 0.0
+                return lambda rating, points: 1.0 if rating >= self._rating_limit1 else other_vpoints
+        elif self._pairing == TournamentPairing.SAD:
+            # À l'appariement de l'avant-dernière ronde, les points
+            # fictifs sont retirés et le système devient un système
+            # Suisse intégral.
+            if self._current_round <= self._rounds - 2:
+                return self._get_sad_vpoints
+        return lambda rating, points: 0.0
+
+    def _get_sad_vpoints(self, rating: int, points: float) -> float:
+        vpoints: float = 0.0
+        # En début de tournoi, les joueurs du groupe A ont
+        # deux points fictifs (PF = 2), ceux du groupe B un
+        # point fictif (PF = 1), ceux du groupe C aucun point
+        # fictif (PF = 0)
+        if rating >= self._rating_limit1:
+            vpoints += 2.0
+        elif rating >= self._rating_limit2:
+            vpoints += 1.0
+        if rating < self._rating_limit1:
+            # Lorsqu'un joueur des groupes B ou C marque
+            # sur l'échiquier au moins 1,5 point, son capital
+            # fictif augmente de 0,5 point.
+            if points >= 1.5:
+                vpoints += 0.5
+            # Lorsque ce joueur marque sur l'échiquier son
+            # troisième point, son capital fictif augmente une
+            # nouvelle fois de 0,5 point.
+            if points >= 3:
+                vpoints += 0.5
+            if rating < self._rating_limit2:
+                # Lorsqu'un joueur du groupe C marque sur
+                # l'échiquier au moins 4,5 points, son capital
+                # fictif augmente pour la troisième fois de
+                # 0,5 point.
+                if points >= 4.5:
+                    vpoints += 0.5
+
+                # Lorsqu'un joueur du groupe C marque sur
+                # l'échiquier au moins 6 points, son capital
+                # fictif augmente pour la dernière fois de
+                # 0,5 points (maximum de 2 points fictifs)
+                if points >= 6:
+                    vpoints += 0.5
+
+            # Le capital fictif est automatiquement porté à 2
+            # points si le joueur a marqué la moitié des points
+            # possibles sur l'échiquier (il est sous-évalué par
+            # le classement ELO)
+            if points * 2 >= self._rounds:
+                vpoints = 2
+        return vpoints
+
+    def _set_players_illegal_moves(self):
+        with EventDatabase(self._key.event_uniq_id, 'r') as event_database:
+            event_database: EventDatabase
+            illegal_moves: Counter[int] = event_database.get_illegal_moves(
+                self._key.tournament_uniq_id, self._current_round)
+        for player in self._players_by_id.values():
+            if player.id == 1:
+                continue
+            player.illegal_moves = illegal_moves[player.id]
+
+    def _update_boards(self, previous: TournamentSnapshot) -> bool:
+        """Builds the boards in the order of the previous snapshot with the current results (the pairings and the
+        points of the players did not change), returns False if the boards must be built again."""
+        if previous.boards is None:
+            return False
+        self._boards = []
+        for previous_board in previous.boards:
+            white_player: Player = self._players_by_id[previous_board.white_player.id]
+            black_player: Player = self._players_by_id[previous_board.black_player.id]
+            self._boards.append(Board(
+                previous_board.id, previous_board.number, white_player, black_player,
+                white_player.pairings[self._current_round].result,
+                white_player.id in self._pending_player_ids.get(self._current_round, ())))
+        self._unpaired_players = [self._players_by_id[player.id] for player in previous.unpaired_players]
+        return True
+
+    def _clear_players_boards(self):
+        """Clears the boards and the handicaps copied from the players of the previous snapshot."""
+        for player in self._players_by_id.values():
+            player.board_id = player.board_number = player.color = None
+            player.handicap_initial_time = player.handicap_increment = player.handicap_time_modified = None
+
+    def _build_boards(self):
+        if not self._current_round:
+            return
+        self._boards: list[Board] = []
+        self._unpaired_players: list[Player] = []
+        # the boards by id of their players, to find the board of the opponent of each player in one pass
+        boards_by_player_id: dict[int, Board] = {}
+        for player in self._players_by_id.values():
+            opponent_id = player.pairings[self._current_round].opponent_id
+            if opponent_id in self._players_by_id:
+                player_board: Board | None = boards_by_player_id.get(opponent_id)
+                if player_board is not None:
+                    if player_board.white_player is not None and player_board.white_player.id == opponent_id:
+                        player_board.black_player = player
+                    else:
+                        player_board.white_player = player
+                else:
+                    if player.pairings[self._current_round].color == Color.WHITE:
+                        player_board = Board(white_player=player)
+                    else:
+                        player_board = Board(black_player=player)
+                    self._boards.append(player_board)
+                boards_by_player_id[player.id] = player_board
+            else:
+                self._unpaired_players.append(player)
+        self._boards.sort(key=self._get_board_sort_keys(), reverse=True)
+        for index, board in enumerate(self._boards, start=1):
+            board.id = index
+            number: int = board.white_player.fixed or board.black_player.fixed or index
+            board.number = number
+            board.white_player.set_board(index, number, Color.WHITE)
+            board.black_player.set_board(index, number, Color.BLACK)
+            board.result = board.white_player.pairings[self._current_round].result
+            board.result_pending = board.white_player.id in self._pending_player_ids.get(self._current_round, ())
+            if self._key.handicap:
+                strong_player: Player
+                weak_player: Player
+                strong_player, weak_player = sorted(
+                    (board.white_player, board.black_player),
+                    key=attrgetter('rating'),
+                    reverse=True
+                )
+                weak_time = self._key.handicap_initial_time
+                rating_diff = strong_player.rating - weak_player.rating
+                penalties = rating_diff // self._key.handicap_penalty_step
+                strong_time = max(
+                    weak_time - penalties * self._key.handicap_penalty_value,
+                    self._key.handicap_min_time
+                )
+                strong_player.set_handicap(
+                    strong_time, self._key.handicap_increment, penalties > 0)
+                weak_player.set_handicap(weak_time, self._key.handicap_increment, False)
+
+    def _get_board_sort_keys(self) -> Callable[[Board], tuple]:
+        """Returns the function giving the sort key of the boards, the order of Board.__lt__ (and Player.__lt__)
+        without the comparisons of the players on each call."""
+        # the players are ordered by names descending, the ranks of the names are computed once
+        name_ranks: dict[int, int] = {}
+        rank: int = 0
+        previous_name: tuple[str, str] | None = None
+        for player in sorted(self._players_by_id.values(), key=attrgetter('last_name', 'first_name')):
+            name: tuple[str, str] = (player.last_name, player.first_name)
+            if name != previous_name:
+                rank += 1
+                previous_name = name
+            name_ranks[player.id] = rank
+        player_keys: dict[int, tuple] = {
+            player.id: (player.vpoints, player.rating, player.title, -name_ranks[player.id])
+            for player in self._players_by_id.values()
+            if player.id != 1
+        }
+
+        def board_sort_key(board: Board) -> tuple:
+            if board.white_player.id == 1 or board.black_player.id == 1:
+                # the boards of the exempt player come last
+                return 0,
+            white_key: tuple = player_keys[board.white_player.id]
+            black_key: tuple = player_keys[board.black_player.id]
+            strong_key, weak_key = (black_key, white_key) if white_key < black_key else (white_key, black_key)
+            return 1, strong_key[0], weak_key[0], strong_key, weak_key
+
+        return board_sort_key
+
+
+class _TournamentSnapshotStore:
+    """The latest snapshots of the tournaments, rebuilt when the file watcher detects a change of their files."""
+
+    def __init__(self):
+        self._lock: Lock = Lock()
+        self._snapshots: dict[TournamentSnapshotKey, TournamentSnapshot] = {}
+        self._build_locks: dict[TournamentSnapshotKey, Lock] = {}
+        self._keys_by_file: dict[Path, set[TournamentSnapshotKey]] = {}
+        self._listeners: list[Callable[[TournamentSnapshotKey, TournamentSnapshot], None]] = []
+        file_watcher.add_listener(self._on_file_changed)
+
+    def add_listener(self, listener: Callable[[TournamentSnapshotKey, TournamentSnapshot], None]):
+        with self._lock:
+            self._listeners.append(listener)
+
+    def _build_lock(self, key: TournamentSnapshotKey) -> Lock:
+        with self._lock:
+            return self._build_locks.setdefault(key, Lock())
+
+    def _build(self, key: TournamentSnapshotKey) -> TournamentSnapshot:
+        snapshot: TournamentSnapshot = TournamentSnapshotBuilder(key, self._snapshots.get(key)).snapshot
+        with self._lock:
+            self._snapshots[key] = snapshot
+            listeners: list[Callable[[TournamentSnapshotKey, TournamentSnapshot], None]] = list(self._listeners)
+        for listener in listeners:
+            try:
+                listener(key, snapshot)
+            except Exception as e:
+                logger.warning('Erreur à la prise en compte du tournoi [%s/%s] : %s',
+                               key.event_uniq_id, key.tournament_uniq_id, e)
+        return snapshot
+
+    def get(self, key: TournamentSnapshotKey) -> TournamentSnapshot:
+        if snapshot := self._snapshots.get(key):
+            return snapshot
+        # first read of a tournament not built at server start, the snapshot is built synchronously (or by the warming
+        # thread, which holds the build lock)
+        with self._build_lock(key):
+            if snapshot := self._snapshots.get(key):
+                return snapshot
+            snapshot = self._build(key)
+        with self._lock:
+            for file in key.version_files:
+                self._keys_by_file.setdefault(file, set()).add(key)
+        file_watcher.watch(key.version_files)
+        return snapshot
+
+    def warm(self, keys: list[TournamentSnapshotKey]):
+        for key in keys:
+            try:
+                self.get(key)
+            except Exception as e:
+                # the snapshot will be built on the first read
+                logger.warning('Le tournoi [%s/%s] n\'a pas pu être lu : %s',
+                               key.event_uniq_id, key.tournament_uniq_id, e)
+        logger.debug('%d tournoi(s) lu(s)', len(keys))
+
+    def refresh(self, key: TournamentSnapshotKey) -> TournamentSnapshot:
+        with self._build_lock(key):
+            snapshot: TournamentSnapshot = self._build(key)
+        for file in key.version_files:
+            file_watcher.notify(file)
+        return snapshot
+
+    def update(
+            self, key: TournamentSnapshotKey, written_files: list[Path],
+            update: Callable[[TournamentSnapshot], TournamentSnapshot | None]
+    ) -> TournamentSnapshot:
+        """Applies a change written to the files by Papi-web to the latest snapshot, instead of building it again from
+        the files (the snapshot is built again if other files changed or if update() returns None)."""
+        with self._build_lock(key):
+            previous: TournamentSnapshot | None = self._snapshots.get(key)
+            files_version: tuple = tuple(get_file_version(file) for file in key.version_files)
+            if previous is not None and files_version == previous.files_version:
+                # already rebuilt by the file watcher
+                return previous
+            snapshot: TournamentSnapshot | None = None
+            if previous is not None and all(
+                    version == previous_version
+                    for file, version, previous_version in zip(key.version_files, files_version, previous.files_version)
+                    if file not in written_files):
+                snapshot = update(previous)
+            if snapshot is None:
+                snapshot = self._build(key)
+            else:
+                snapshot = replace(snapshot, files_version=files_version)
+                with self._lock:
+                    self._snapshots[key] = snapshot
+        for file in written_files:
+            file_watcher.notify(file)
+        return snapshot
+
+    def retain(self, event_uniq_id: str, keys: Iterable[TournamentSnapshotKey]):
+        """Forgets the snapshots of the event built from other keys than the given ones (the tournaments removed from
+        the event or whose configuration changed), so that they are not rebuilt any more when their files change."""
+        retained_keys: set[TournamentSnapshotKey] = set(keys)
+        with self._lock:
+            for key in [
+                key for key in self._snapshots.keys() | self._build_locks.keys()
+                if key.event_uniq_id == event_uniq_id and key not in retained_keys
+            ]:
+                self._snapshots.pop(key, None)
+                self._build_locks.pop(key, None)
+                for file in key.version_files:
+                    if file_keys := self._keys_by_file.get(file):
+                        file_keys.discard(key)
+                        if not file_keys:
+                            del self._keys_by_file[file]
+
+    def _on_file_changed(self, file: Path):
+        with self._lock:
+            keys: list[TournamentSnapshotKey] = list(self._keys_by_file.get(file, ()))
+        for key in keys:
+            files_version: tuple = tuple(get_file_version(file) for file in key.version_files)
+            with self._build_lock(key):
+                previous: TournamentSnapshot | None = self._snapshots.get(key)
+                if previous is None:
+                    # forgotten in the meantime (see retain())
+                    continue
+                if files_version == previous.files_version:
+                    # already rebuilt by refresh()
+                    continue
+                try:
+                    self._build(key)
+                    logger.debug('Tournoi [%s/%s] relu', key.event_uniq_id, key.tournament_uniq_id)
+                except Exception as e:
+                    # the previous snapshot is kept until the file can be read
+                    logger.warning('Le tournoi [%s/%s] n\'a pas pu être relu : %s',
+                                   key.event_uniq_id, key.tournament_uniq_id, e)
+
+
+_tournament_snapshot_store: _TournamentSnapshotStore = _TournamentSnapshotStore()
+
+
+def get_tournament_snapshot(key: TournamentSnapshotKey) -> TournamentSnapshot:
+    """Returns the latest snapshot of the tournament, built synchronously only on the first call if the snapshot was
+    not built at server start (see warm_tournament_snapshots())."""
+    return _tournament_snapshot_store.get(key)
+
+
+def warm_tournament_snapshots(keys: list[TournamentSnapshotKey]):
+    """Builds the snapshots of the tournaments in a background thread, for the first display requests not to read the
+    Papi files."""
+    Thread(target=_tournament_snapshot_store.warm, args=(keys, ), name='tournament-snapshots', daemon=True).start()
+
+
+def add_tournament_snapshot_listener(listener: Callable[[TournamentSnapshotKey, TournamentSnapshot], None]):
+    """Adds a function called with each snapshot built, in the thread building it."""
+    _tournament_snapshot_store.add_listener(listener)
+
+
+def retain_tournament_snapshots(event_uniq_id: str, keys: Iterable[TournamentSnapshotKey]):
+    """Forgets the snapshots of the tournaments of the event not built from the given keys, to be called with the keys
+    of the tournaments of the event built."""
+    _tournament_snapshot_store.retain(event_uniq_id, keys)
+
+
+def refresh_tournament_snapshot(key: TournamentSnapshotKey) -> TournamentSnapshot:
+    """Rebuilds the snapshot of the tournament now, to be called after the files of the tournament were written."""
+    return _tournament_snapshot_store.refresh(key)
+
+
+def update_tournament_snapshot(
+        key: TournamentSnapshotKey, written_files: list[Path],
+        update: Callable[[TournamentSnapshot], TournamentSnapshot | None]
+) -> TournamentSnapshot:
+    """Applies a change written to the files by Papi-web to the latest snapshot of the tournament, to be called after
+    the files were written (written_files) instead of refresh_tournament_snapshot()."""
+    return _tournament_snapshot_store.update(key, written_files, update)
@@ -1,5 +1,7 @@
 import time
 from pathlib import Path
+from contextlib import AbstractContextManager
+from threading import Lock, Thread
 from typing import Any, Self
 from logging import Logger
 from dataclasses import dataclass, field
@@ -7,13 +9,168 @@ from collections.abc import Iterator
 import pyodbc
 
 from common.exception import PapiWebException
+from common.executor import file_slot
+from common.file_watcher import get_file_version
 from common.logger import get_logger
+from common.read_only import check_write
 
 logger: Logger = get_logger()
 
+# the connections are pooled by Papi-web (see _AccessConnectionPool), not by the ODBC driver manager
 pyodbc.pooling = False
 logger.info('Pooling ODBC : %s', f"{'des' if not pyodbc.pooling else ''}activé")
 
+# the delay after which the idle connections are closed: an open connection locks the file, Papi can not save the
+# tournament while Papi-web holds a connection to it, so the delay is kept short (the connections are mostly reused by
+# the bursts of requests, a request coming after the delay opens a new connection)
+ACCESS_CONNECTION_IDLE_TIMEOUT: float = 2.0
+# the number of idle connections kept for each file
+ACCESS_MAX_IDLE_CONNECTIONS_PER_FILE: int = 2
+# the delays between the connection attempts, before giving up
+ACCESS_CONNECTION_RETRY_DELAYS: tuple[float, ...] = (0.1, 0.5, 1.0, 2.0, 5.0, )
+# the number of rows fetched at once by _fetchmany()
+ACCESS_FETCH_SIZE: int = 500
+
+
+@dataclass
+class _PooledConnection:
+    file: Path
+    read_only: bool
+    connection: pyodbc.Connection
+    file_version: tuple[int, int, int, int] | None = None
+    last_used: float = 0.0
+
+
+class _AccessConnectionPool:
+    """The connections to the Access files, kept open for a while to be reused.
+
+    An idle connection is reused only if the file was not changed since the connection was released, so that the
+    changes made by other programs (Papi) or the replacement of the file are always seen. A connection opened for
+    writing can be reused for reading, not the other way round. The other idle connections to a file are closed
+    before it is written."""
+
+    def __init__(self):
+        self._lock: Lock = Lock()
+        self._idle_connections: dict[Path, list[_PooledConnection]] = {}
+        self._cleaner: Thread | None = None
+        self._driver_checked: bool = False
+
+    def _check_driver(self):
+        if self._driver_checked:
+            return
+        needed_driver: str = access_driver()
+        if needed_driver not in pyodbc.drivers():
+            logger.error('Les pilotes ODBC installés sont les suivants :')
+            for driver in odbc_drivers():
+                logger.error(' - %s', driver)
+            logger.error('Pilote nécessaire : %s', needed_driver)
+            install_url: str = 'https://www.microsoft.com/en-us/download/details.aspx?id=54920'
+            logger.error('Installer le pilote (cf %s) et relancer.', install_url)
+            logger.error('Note : pour une compatibilité 32bits et 64bits, '
+                         'utiliser la commande suivante à l\'installation :')
+            logger.error('accessdatabaseengine_X64.exe /passive')
+            raise PapiWebException('Pilote Microsoft Access introuvable')
+        self._driver_checked = True
+
+    @staticmethod
+    def _close(pooled_connection: _PooledConnection):
+        try:
+            pooled_connection.connection.close()
+        except pyodbc.Error as e:
+            logger.debug('La fermeture de la connexion au fichier %s a échoué : %s', pooled_connection.file, e.args)
+
+    def _connect(self, file: Path, read_only: bool) -> _PooledConnection:
+        self._check_driver()
+        db_url: str = f'DRIVER={{{access_driver()}}};DBQ={file};'
+        for attempt, delay in enumerate((*ACCESS_CONNECTION_RETRY_DELAYS, None), start=1):
+            try:
+                return _PooledConnection(file, read_only, pyodbc.connect(db_url, readonly=read_only))
+            except pyodbc.Error as e:
+                # the driver sometimes fails with pyodbc.Error: ('HY000', 'The driver did not supply an error!')
+                if delay is None:
+                    raise PapiWebException(
+                        f'La connexion au fichier {file} a échoué après {attempt} tentatives : {e.args}') from e
+                logger.warning('La connexion au fichier %s a échoué (tentative %d) : %s', file, attempt, e.args)
+                time.sleep(delay)
+
+    def acquire(self, file: Path, read_only: bool) -> _PooledConnection:
+        file = file.resolve()
+        # the changes made by other programs and the replacements of the file are detected by its version (Access caches the
+        # pages read, an idle connection would not see the changes)
+        file_version: tuple[int, int, int, int] | None = get_file_version(file)
+        stale_connections: list[_PooledConnection] = []
+        pooled_connection: _PooledConnection | None = None
+        with self._lock:
+            idle_connections: list[_PooledConnection] = self._idle_connections.get(file, [])
+            for idle_connection in list(idle_connections):
+                if idle_connection.file_version != file_version:
+                    # the file was changed or replaced by another program
+                    idle_connections.remove(idle_connection)
+                    stale_connections.append(idle_connection)
+                elif pooled_connection is None and (read_only or not idle_connection.read_only):
+                    idle_connections.remove(idle_connection)
+                    pooled_connection = idle_connection
+                elif not read_only:
+                    # the file is about to be written, only the connection writing it is kept open
+                    idle_connections.remove(idle_connection)
+                    stale_connections.append(idle_connection)
+        for stale_connection in stale_connections:
+            self._close(stale_connection)
+        return pooled_connection or self._connect(file, read_only)
+
+    def release(self, pooled_connection: _PooledConnection, discard: bool = False):
+        if not discard and not pooled_connection.read_only:
+            # the changes not committed are never seen by the next user of the connection
+            try:
+                pooled_connection.connection.rollback()
+            except pyodbc.Error:
+                discard = True
+        if discard:
+            self._close(pooled_connection)
+            return
+        pooled_connection.file_version = get_file_version(pooled_connection.file)
+        pooled_connection.last_used = time.monotonic()
+        exceeding_connections: list[_PooledConnection] = []
+        with self._lock:
+            idle_connections: list[_PooledConnection] = self._idle_connections.setdefault(pooled_connection.file, [])
+            idle_connections.append(pooled_connection)
+            while len(idle_connections) > ACCESS_MAX_IDLE_CONNECTIONS_PER_FILE:
+                exceeding_connections.append(idle_connections.pop(0))
+            if self._cleaner is None:
+                self._cleaner = Thread(target=self._clean, name='access-connection-pool', daemon=True)
+                self._cleaner.start()
+        for exceeding_connection in exceeding_connections:
+            self._close(exceeding_connection)
+
+    def _clean(self):
+        while True:
+            time.sleep(ACCESS_CONNECTION_IDLE_TIMEOUT / 2)
+            expiration: float = time.monotonic() - ACCESS_CONNECTION_IDLE_TIMEOUT
+            expired_connections: list[_PooledConnection] = []
+            with self._lock:
+                for idle_connections in self._idle_connections.values():
+                    for idle_connection in list(idle_connections):
+                        if idle_connection.last_used < expiration:
+                            idle_connections.remove(idle_connection)
+                            expired_connections.append(idle_connection)
+            for expired_connection in expired_connections:
+                self._close(expired_connection)
+
+    def close_all(self, file: Path):
+        """Closes the idle connections to the file (before the file is deleted or replaced by Papi-web)."""
+        with self._lock:
+            idle_connections: list[_PooledConnection] = self._idle_connections.pop(file.resolve(), [])
+        for idle_connection in idle_connections:
+            self._close(idle_connection)
+
+
+_access_connection_pool: _AccessConnectionPool = _AccessConnectionPool()
+
+
+def close_access_connections(file: Path):
+    """Closes the idle connections to the file, to be called before the file is deleted or replaced."""
+    _access_connection_pool.close_all(file)
+
 
 @dataclass
 class AccessDatabase:
@@ -23,6 +180,8 @@ class AccessDatabase:
     read_only: bool = field(init=False, default=True)
     database: pyodbc.Connection | None = field(init=False, default=None)
     cursor: pyodbc.Cursor | None = field(init=False, default=None)
+    _file_slot: AbstractContextManager | None = field(init=False, default=None)
+    _pooled_connection: _PooledConnection | None = field(init=False, default=None)
 
     def __post_init__(self):
         match self.method:
@@ -30,6 +189,7 @@ class AccessDatabase:
                 self.read_only = True
             case 'w':
                 self.read_only = False
+                check_write(self.file)
             case _:
                 raise ValueError
 
@@ -38,40 +198,36 @@ class AccessDatabase:
     # This function is responsible for opening the ressource and giving a way
     # to access it.
     def __enter__(self) -> Self:
-        needed_driver: str = access_driver()
-        if needed_driver not in pyodbc.drivers():
-            logger.error('Les pilotes ODBC installés sont les suivants :')
-            for driver in odbc_drivers():
-                logger.error(' - %s', driver)
-            logger.error('Pilote nécessaire : %s', needed_driver)
-            install_url: str = 'https://www.microsoft.com/en-us/download/details.aspx?id=54920'
-            logger.error('Installer le pilote (cf %s) et relancer.', install_url)
-            logger.error('Note : pour une compatibilité 32bits et 64bits, '
-                         'utiliser la commande suivante à l\'installation :')
-            logger.error('accessdatabaseengine_X64.exe /passive')
-            raise PapiWebException('Pilote Microsoft Access introuvable')
-        db_url: str = f'DRIVER={{{needed_driver}}};DBQ={self.file.resolve()};'
-        # Get rid of unresolved pyodbc.Error: ('HY000', 'The driver did not supply an error!')
-        while self.database is None:
-            try:
-                self.database = pyodbc.connect(db_url, readonly=self.read_only)
-            except pyodbc.Error as e:
-                logger.error('La connection au fichier %s a échoué: %s', self.file, e.args)
-                time.sleep(1)
-        self.cursor = self.database.cursor()
+        self._file_slot = file_slot(self.file)
+        self._file_slot.__enter__()
+        try:
+            self._pooled_connection = _access_connection_pool.acquire(self.file, self.read_only)
+            self.database = self._pooled_connection.connection
+            self.cursor = self.database.cursor()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
         return self
 
     # NOTE(Amaras) Context manager infrastructure: this dunder method is
     # supposed to close the ressource and handle exceptions (by catching or
     # passing them through, DO NOT re-raise exceptions here).
     def __exit__(self, exc_type, exc_value, tb):
-        if self.database is not None:
-            self.cursor.close()
-            del self.cursor
+        discard: bool = exc_type is not None and issubclass(exc_type, pyodbc.Error)
+        if self.cursor is not None:
+            try:
+                self.cursor.close()
+            except pyodbc.Error:
+                discard = True
             self.cursor = None
-            self.database.close()
-            del self.database
-            self.database = None
+        self.database = None
+        if self._pooled_connection is not None:
+            # the connection is given back to the pool instead of being closed
+            _access_connection_pool.release(self._pooled_connection, discard)
+            self._pooled_connection = None
+        if self._file_slot is not None:
+            self._file_slot.__exit__(exc_type, exc_value, tb)
+            self._file_slot = None
 
     def _execute(self, query: str, params: tuple = ()):
         self.cursor.execute(query, params)
@@ -81,6 +237,11 @@ class AccessDatabase:
         for row in self.cursor.fetchall():
             yield dict(zip(columns, row))
 
+    def _fetchmany(self, size: int = ACCESS_FETCH_SIZE) -> Iterator[pyodbc.Row]:
+        """Yields the rows of the last query (accessed by index), fetched by batches of size rows."""
+        while rows := self.cursor.fetchmany(size):
+            yield from rows
+
     def _fetchone(self) -> dict[str, Any]:
         columns = [column[0] for column in self.cursor.description]
         return dict(zip(columns, self.cursor.fetchone()))
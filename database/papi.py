@@ -2,15 +2,16 @@ import re
 from datetime import datetime, timedelta
 from pathlib import Path
 from logging import Logger
+from functools import cache
 from itertools import product
 from typing import NamedTuple, Self
-from contextlib import suppress
+from collections.abc import Iterator, Sequence
 
 from common.config_reader import TMP_DIR
 from data.chessevent_player import ChessEventPlayer
 from data.chessevent_tournament import ChessEventTournament
 from database.access import AccessDatabase
-from data.pairing import Pairing
+from data.pairing_table import PairingTable, PlayerPairings
 from data.player import Player
 from common.logger import get_logger
 
@@ -27,6 +28,62 @@ class TournamentInfo(NamedTuple):
     rating_limit2: int
 
 
+class PlayerIdentity(NamedTuple):
+    """The fields of a player that Papi lets change during the tournament, other than the check-in and the
+    pairings."""
+    last_name: str
+    first_name: str
+    gender: PlayerGender
+    title: PlayerTitle
+    rating: int
+    rating_type: str
+    fixed: int
+
+
+class PlayerRounds(NamedTuple):
+    """The identity, the check-in and the pairings of a player from a given round."""
+    ref: int
+    identity: PlayerIdentity
+    check_in: bool
+    colors: list[Color | str | None]
+    opponent_ids: Sequence[int | None]
+    results: Iterator[Result]
+
+
+# the fields of the players read by PapiDatabase.read_players() and PapiDatabase.read_players_rounds() (the first
+# ones are accessed by index), followed by the color, the opponent and the result of each round
+_PLAYER_FIELDS: tuple[str, ...] = (
+    'Ref', 'Nom', 'Prenom', 'Sexe', 'FideTitre', 'Fixe', 'Pointe',
+    'Elo', 'Rapide', 'Blitz', 'Fide', 'RapideFide', 'BlitzFide',
+)
+# the colors and results by Papi value (the unknown colors are kept as they are read)
+_PAPI_COLORS: dict[str, Color] = {color.to_papi_value: color for color in Color}
+_PAPI_RESULTS: dict[int, Result] = {result.to_papi_value: result for result in Result}
+
+
+class _PlayersProjection(NamedTuple):
+    query: str
+    # the slices of the rows holding the colors, the opponents and the results of the rounds
+    colors: slice
+    opponent_ids: slice
+    results: slice
+
+
+@cache
+def _get_players_projection(player_fields: tuple[str, ...], first_round: int, rounds: int) -> _PlayersProjection:
+    """Returns the query and the slices of the rows used to read the players of a tournament from round first_round,
+    built once for each set of fields and rounds."""
+    fields: list[str] = list(player_fields)
+    for rd, suffix in product(range(first_round, rounds + 1), ['Cl', 'Adv', 'Res']):
+        fields.append(f'Rd{rd:0>2}{suffix}')
+    end: int = len(fields)
+    return _PlayersProjection(
+        f'SELECT {", ".join(fields)} FROM joueur ORDER BY Ref',
+        slice(len(player_fields), end, 3),
+        slice(len(player_fields) + 1, end, 3),
+        slice(len(player_fields) + 2, end, 3))
+
+
 class PapiDatabase(AccessDatabase):
     """The database class, using the Papi format of the French Chess Federation
     Tournament manager."""
@@ -62,39 +119,53 @@ class PapiDatabase(AccessDatabase):
         rating_limit2: int = int(self._read_var('EloBase2'))
         return TournamentInfo(rounds, pairing, rating, rating_limit1, rating_limit2)
 
-    def read_players(self, tournament_rating: TournamentRating, rounds: int) -> dict[int, Player]:
+    @staticmethod
+    def _get_player_identity(row: Sequence, rating_index: int, rating_type_index: int) -> PlayerIdentity:
+        return PlayerIdentity(
+            row[1] or '', row[2] or '',
+            PlayerGender.from_papi_value(row[3]),
+            PlayerTitle.from_papi_value(row[4]),
+            row[rating_index],
+            row[rating_type_index],
+            row[5])
+
+    def read_players(self, tournament_rating: TournamentRating, rounds: int) -> tuple[dict[int, Player], PairingTable]:
         """Reads the database and fetches the Player identification, pairings
-        and results."""
+        and results (the pairings are stored in the returned table, the players are views of its rows)."""
         players: dict[int, Player] = {}
-        player_fields: list[str] = [
-            'Ref', 'Nom', 'Prenom', 'Sexe', 'FideTitre', 'Fixe',
-            'Elo', 'Rapide', 'Blitz', 'Fide', 'RapideFide', 'BlitzFide',
-            'Pointe'
-        ]
-        for rd, suffix in product(range(1, rounds + 1), ['Cl', 'Adv', 'Res']):
-            player_fields.append(f'Rd{rd:0>2}{suffix}')
-        query: str = f'SELECT {", ".join(player_fields)} FROM joueur ORDER BY Ref'
-        self._execute(query)
-        for row in self._fetchall():
-            pairings: dict[int, Pairing] = {}
-            for round_ in range(1, rounds + 1):
-                round_str = f'Rd{round_:0>2}'
-                color: str = row[f'{round_str}Cl']
-                with suppress(ValueError):
-                    color = Color.from_papi_value(color)
-                pairings[round_] = Pairing(
-                    color, row[f'{round_str}Adv'],
-                    Result.from_papi_value(row[f'{round_str}Res']))
-            players[row['Ref']] = Player(
-                row['Ref'], row['Nom'] or '', row['Prenom'] or '',
-                PlayerGender.from_papi_value(row['Sexe']),
-                PlayerTitle.from_papi_value(row['FideTitre']),
-                row[tournament_rating.papi_value_field],
-                row[tournament_rating.papi_type_field],
-                row['Fixe'],
-                row['Pointe'],
-                pairings)
-        return players
+        pairing_table: PairingTable = PairingTable(rounds)
+        projection: _PlayersProjection = _get_players_projection(_PLAYER_FIELDS, 1, rounds)
+        rating_index: int = _PLAYER_FIELDS.index(tournament_rating.papi_value_field)
+        rating_type_index: int = _PLAYER_FIELDS.index(tournament_rating.papi_type_field)
+        self._execute(projection.query)
+        for row in self._fetchmany():
+            ref: int = row[0]
+            pairings: PlayerPairings = pairing_table.add_player(
+                ref,
+                [_PAPI_COLORS.get(color, color) for color in row[projection.colors]],
+                row[projection.opponent_ids],
+                map(_PAPI_RESULTS.__getitem__, row[projection.results]))
+            players[ref] = Player(
+                ref, *self._get_player_identity(row, rating_index, rating_type_index), row[6], pairings)
+        return players, pairing_table
+
+    def read_players_rounds(
+            self, tournament_rating: TournamentRating, first_round: int, rounds: int
+    ) -> Iterator[PlayerRounds]:
+        """Reads the identity, the check-in and the pairings of the players from round first_round only (to refresh
+        the players already read)."""
+        projection: _PlayersProjection = _get_players_projection(_PLAYER_FIELDS, first_round, rounds)
+        rating_index: int = _PLAYER_FIELDS.index(tournament_rating.papi_value_field)
+        rating_type_index: int = _PLAYER_FIELDS.index(tournament_rating.papi_type_field)
+        self._execute(projection.query)
+        for row in self._fetchmany():
+            yield PlayerRounds(
+                row[0],
+                self._get_player_identity(row, rating_index, rating_type_index),
+                row[6],
+                [_PAPI_COLORS.get(color, color) for color in row[projection.colors]],
+                row[projection.opponent_ids],
+                map(_PAPI_RESULTS.__getitem__, row[projection.results]))
 
     def add_board_result(self, player_id: int, round_: int, result: Result):
         """Writes the given result to the database."""
@@ -4,6 +4,7 @@ DROP TABLE IF EXISTS `chessevent`;
 DROP TABLE IF EXISTS `tournament`;
 DROP TABLE IF EXISTS `illegal_move`;
 DROP TABLE IF EXISTS `result`;
+DROP TABLE IF EXISTS `result_journal`;
 
 CREATE TABLE `info` (
     `version` TEXT NOT NULL,
@@ -93,6 +94,8 @@ CREATE TABLE `illegal_move` (
     FOREIGN KEY (`tournament_id`) REFERENCES `tournament`(`id`)
 );
 
+CREATE INDEX `illegal_move_tournament_round_player` ON `illegal_move`(`tournament_id`, `round`, `player_id`);
+
 CREATE TABLE `result` (
     `id` INTEGER NOT NULL,
     `tournament_id` INTEGER NOT NULL,
@@ -102,6 +105,31 @@ CREATE TABLE `result` (
     `black_player_id` INTEGER NOT NULL,
     `date` REAL NOT NULL,
     `value` INTEGER NOT NULL,
+    `white_player_name` TEXT,
+    `white_player_rating` INTEGER,
+    `black_player_name` TEXT,
+    `black_player_rating` INTEGER,
+    PRIMARY KEY(`id` AUTOINCREMENT),
+    FOREIGN KEY (`tournament_id`) REFERENCES `tournament`(`id`)
+);
+
+/* index of the results screens (the latest results of some tournaments, filtered by tournament in the index) */
+CREATE INDEX `result_date` ON `result`(
+    `date`, `tournament_id`, `round`, `board_id`, `white_player_id`, `black_player_id`, `value`);
+CREATE INDEX `result_tournament_round_board` ON `result`(`tournament_id`, `round`, `board_id`);
+/* the results entered before the players were stored with them */
+CREATE INDEX `result_without_players` ON `result`(`tournament_id`) WHERE `white_player_name` IS NULL;
+
+CREATE TABLE `result_journal` (
+    `id` INTEGER NOT NULL,
+    `tournament_id` INTEGER NOT NULL,
+    `round` INTEGER NOT NULL,
+    `board_id` INTEGER NOT NULL,
+    `white_player_id` INTEGER NOT NULL,
+    `black_player_id` INTEGER NOT NULL,
+    `white_value` INTEGER NOT NULL,
+    `black_value` INTEGER NOT NULL,
+    `date` REAL NOT NULL,
     PRIMARY KEY(`id` AUTOINCREMENT),
     FOREIGN KEY (`tournament_id`) REFERENCES `tournament`(`id`)
 );
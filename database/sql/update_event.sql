@@ -0,0 +1,25 @@
+/* Statements run on the existing event databases once per process, they must be idempotent. */
+CREATE TABLE IF NOT EXISTS `result_journal` (
+    `id` INTEGER NOT NULL,
+    `tournament_id` INTEGER NOT NULL,
+    `round` INTEGER NOT NULL,
+    `board_id` INTEGER NOT NULL,
+    `white_player_id` INTEGER NOT NULL,
+    `black_player_id` INTEGER NOT NULL,
+    `white_value` INTEGER NOT NULL,
+    `black_value` INTEGER NOT NULL,
+    `date` REAL NOT NULL,
+    PRIMARY KEY(`id` AUTOINCREMENT),
+    FOREIGN KEY (`tournament_id`) REFERENCES `tournament`(`id`)
+);
+
+CREATE INDEX IF NOT EXISTS `illegal_move_tournament_round_player` ON `illegal_move`(
+    `tournament_id`, `round`, `player_id`);
+
+CREATE INDEX IF NOT EXISTS `result_date` ON `result`(
+    `date`, `tournament_id`, `round`, `board_id`, `white_player_id`, `black_player_id`, `value`);
+
+CREATE INDEX IF NOT EXISTS `result_tournament_round_board` ON `result`(`tournament_id`, `round`, `board_id`);
+
+/* the columns of the players of the result table are added by EventDatabase._add_result_players_columns() */
+CREATE INDEX IF NOT EXISTS `result_without_players` ON `result`(`tournament_id`) WHERE `white_player_name` IS NULL;
@@ -7,25 +7,115 @@ from collections.abc import Iterator
 from dataclasses import dataclass, field
 from logging import Logger
 from pathlib import Path
-from sqlite3 import Connection, Cursor, connect, OperationalError
+from contextlib import AbstractContextManager
+from sqlite3 import Connection, Cursor, connect, OperationalError, Error
+from threading import Lock, RLock
 from typing import Self, Any, Unpack
 
 from packaging.version import Version
 
 from common.exception import PapiWebException
+from common.executor import file_slot
+from common.read_only import ReadOnlyError, check_write, writes_allowed
 from data.util import Result as UtilResult, ScreenType
 from data.result import Result as DataResult
 from common.logger import get_logger
 from common.papi_web_config import PAPI_WEB_VERSION
 from data.board import Board
 from database.store import StoredTournament, StoredEvent, StoredChessEvent, StoredTimer, StoredTimerHour, \
-    StoredFamily, StoredIllegalMove, StoredResult, StoredRotator, StoredScreenSet, StoredScreen
+    StoredFamily, StoredIllegalMove, StoredResult, StoredRotator, StoredScreenSet, StoredScreen, \
+    StoredResultJournalEntry
 
 logger: Logger = get_logger()
 
 DB_PATH: Path = Path('.') / 'db'
 SQL_PATH: Path = Path(__file__).resolve().parent / 'sql'
 
+# the number of idle connections kept for each database
+SQLITE_MAX_IDLE_CONNECTIONS_PER_FILE: int = 4
+# the number of prepared statements cached by each connection
+SQLITE_CACHED_STATEMENTS: int = 256
+
+
+def event_database_files(event_uniq_id: str) -> list[Path]:
+    """The files changed when the database of the event is written (the changes are written to the write-ahead log
+    before being copied to the database)."""
+    file: Path = DB_PATH / f'{event_uniq_id}.db'
+    return [file, file.with_name(f'{file.name}-wal'), ]
+
+
+@dataclass
+class _PooledSQLiteConnection:
+    connection: Connection
+    read_only: bool
+    opened_read_only: bool = False
+
+
+class _SQLiteConnectionPool:
+    """The connections to the SQLite databases, kept open to be reused.
+
+    The databases are in WAL mode so that the readers never block the writer. The connections are opened in
+    read-write mode to be reused by the writers, the read-only connections are protected by PRAGMA query_only. In a
+    read-only context (the display requests), the connections are opened in read-only mode and never used to write.
+    Each connection caches its prepared statements."""
+
+    def __init__(self):
+        self._lock: Lock = Lock()
+        self._idle_connections: dict[Path, list[_PooledSQLiteConnection]] = {}
+
+    @staticmethod
+    def _connect(file: Path, read_only: bool) -> Connection:
+        connection: Connection = connect(
+            f'file:{file}?mode={"ro" if read_only else "rw"}', detect_types=1, uri=True, check_same_thread=False,
+            cached_statements=SQLITE_CACHED_STATEMENTS)
+        if not read_only:
+            try:
+                connection.execute('PRAGMA journal_mode=WAL')
+            except OperationalError as e:
+                logger.debug('Le mode WAL n\'a pas pu être activé pour la base de données %s : %s', file, e.args)
+        return connection
+
+    def acquire(self, file: Path, read_only: bool) -> _PooledSQLiteConnection:
+        # the connections of a read-only context never write, even if a write was requested
+        read_only = read_only or not writes_allowed()
+        pooled_connection: _PooledSQLiteConnection | None = None
+        with self._lock:
+            idle_connections: list[_PooledSQLiteConnection] = self._idle_connections.get(file, [])
+            for index in range(len(idle_connections) - 1, -1, -1):
+                if read_only or not idle_connections[index].opened_read_only:
+                    pooled_connection = idle_connections.pop(index)
+                    break
+        if pooled_connection is None:
+            opened_read_only: bool = not writes_allowed()
+            pooled_connection = _PooledSQLiteConnection(
+                self._connect(file, opened_read_only), opened_read_only, opened_read_only)
+        if pooled_connection.read_only != read_only:
+            pooled_connection.connection.execute(f'PRAGMA query_only={int(read_only)}')
+            pooled_connection.read_only = read_only
+        return pooled_connection
+
+    def release(self, file: Path, pooled_connection: _PooledSQLiteConnection):
+        try:
+            if pooled_connection.connection.in_transaction:
+                # the changes not committed are never seen by the next user of the connection
+                pooled_connection.connection.rollback()
+        except Error:
+            pooled_connection.connection.close()
+            return
+        with self._lock:
+            idle_connections: list[_PooledSQLiteConnection] = self._idle_connections.setdefault(file, [])
+            if len(idle_connections) < SQLITE_MAX_IDLE_CONNECTIONS_PER_FILE:
+                idle_connections.append(pooled_connection)
+                return
+        pooled_connection.connection.close()
+
+
+_sqlite_connection_pool: _SQLiteConnectionPool = _SQLiteConnectionPool()
+
+# the event databases already checked (version and schema) in this process
+_checked_files: set[Path] = set()
+_checked_files_lock: RLock = RLock()
+
 
 @dataclass
 class SQLiteDatabase:
@@ -39,6 +129,8 @@ class SQLiteDatabase:
     read_only: bool = field(init=False, default=True)
     database: Connection | None = field(init=False, default=None)
     cursor: Cursor | None = field(init=False, default=None)
+    _file_slot: AbstractContextManager | None = field(init=False, default=None)
+    _pooled_connection: _PooledSQLiteConnection | None = field(init=False, default=None)
 
     def __post_init__(self):
         match self.method:
@@ -46,23 +138,34 @@ class SQLiteDatabase:
                 self.read_only = True
             case 'w':
                 self.read_only = False
+                check_write(self.file)
             case _:
                 raise ValueError
 
     def __enter__(self) -> Self:
-        db_url: str = f'file:{self.file}?mode={"ro" if self.read_only else "rw"}'
-        self.database = connect(db_url, detect_types=1, uri=True)
-        self.cursor = self.database.cursor()
+        self._file_slot = file_slot(self.file)
+        self._file_slot.__enter__()
+        try:
+            self._pooled_connection = _sqlite_connection_pool.acquire(self.file, self.read_only)
+            self.database = self._pooled_connection.connection
+            self.cursor = self.database.cursor()
+        except BaseException:
+            self.__exit__(None, None, None)
+            raise
         return self
 
     def __exit__(self, exc_type, exc_value, tb):
-        if self.database is not None:
+        if self.cursor is not None:
             self.cursor.close()
-            del self.cursor
             self.cursor = None
-            self.database.close()
-            del self.database
-            self.database = None
+        self.database = None
+        if self._pooled_connection is not None:
+            # the connection is given back to the pool instead of being closed
+            _sqlite_connection_pool.release(self.file, self._pooled_connection)
+            self._pooled_connection = None
+        if self._file_slot is not None:
+            self._file_slot.__exit__(exc_type, exc_value, tb)
+            self._file_slot = None
 
     def _execute(self, query: str, params: tuple = ()):
         self.cursor.execute(query, params)
@@ -92,8 +195,11 @@ class EventDatabase(SQLiteDatabase):
 
     def __post_init__(self):
         super().__post_init__()
-        DB_PATH.mkdir(parents=True, exist_ok=True)
         if not self.file.is_file():
+            # the databases are created at server start or by the admin pages, never by the display requests
+            if not writes_allowed():
+                raise ReadOnlyError(f'la base de données [{self.file}] n\'existe pas')
+            DB_PATH.mkdir(parents=True, exist_ok=True)
             database: Connection | None = None
             cursor: Cursor | None = None
             try:
@@ -115,15 +221,48 @@ class EventDatabase(SQLiteDatabase):
 
     def __enter__(self) -> Self:
         super().__enter__()
-        if self.version != Version(f'{PAPI_WEB_VERSION.major}.{PAPI_WEB_VERSION.minor}.{PAPI_WEB_VERSION.micro}'):
-            if self.read_only:
-                with EventDatabase(self.event_uniq_id, 'w') as event_database:
-                    event_database: EventDatabase
-                    event_database.upgrade()
-            else:
-                self.upgrade()
+        if self.file not in _checked_files and not self.read_only:
+            # the version and the schema are checked once per process, in write mode (at server start or on the first
+            # write, the databases entered in read mode before are used as they are)
+            try:
+                with _checked_files_lock:
+                    if self.file not in _checked_files:
+                        self._check()
+                        _checked_files.add(self.file)
+            except BaseException:
+                self.__exit__(None, None, None)
+                raise
         return self
 
+    def _check(self):
+        """Upgrades the database if needed (with a connection in write mode)."""
+        if self.version != Version(f'{PAPI_WEB_VERSION.major}.{PAPI_WEB_VERSION.minor}.{PAPI_WEB_VERSION.micro}'):
+            self.upgrade()
+        self._update_schema()
+
+    def _update_schema(self):
+        """Adds the tables created after the version of the database (without changing the version)."""
+        try:
+            self._add_result_players_columns()
+            with open(SQL_PATH / 'update_event.sql', encoding='utf-8') as f:
+                self.cursor.executescript(f.read())
+            self.commit()
+        except OperationalError as e:
+            logger.warning('La mise à jour de la base de données %s a échoué : %s', self.file, e.args)
+            raise e
+
+    def _add_result_players_columns(self):
+        """Adds the players to the result table (ALTER TABLE ... ADD COLUMN can not be written in update_event.sql,
+        where the statements must be idempotent)."""
+        self._execute('PRAGMA table_info(`result`)')
+        columns: set[str] = {row['name'] for row in self._fetchall()}
+        for column, column_type in (
+                ('white_player_name', 'TEXT'), ('white_player_rating', 'INTEGER'),
+                ('black_player_name', 'TEXT'), ('black_player_rating', 'INTEGER'),
+        ):
+            if column not in columns:
+                self._execute(f'ALTER TABLE `result` ADD COLUMN `{column}` {column_type}')
+
     """ 
     ---------------------------------------------------------------------------------
     StoredEvent 
@@ -484,15 +623,9 @@ class EventDatabase(SQLiteDatabase):
         if row := self._fetchone():
             return self._row_to_stored_tournament(row)
         if create_if_absent:
-            if self.read_only:
-                with EventDatabase(self.event_uniq_id, 'w') as event_database:
-                    event_database: EventDatabase
-                    stored_tournament: StoredTournament = event_database.get_stored_tournament(
-                        uniq_id=uniq_id, create_if_absent=True)
-                    event_database.commit()
-                    return stored_tournament
-            else:
-                return self._write_stored_tournament(uniq_id)
+            # the tournaments are stored by the writes only (the display requests never write)
+            assert not self.read_only, ValueError(f'uniq_id=[{uniq_id}], create_if_absent=[{create_if_absent}]')
+            return self._write_stored_tournament(uniq_id)
         return None
 
     """ 
@@ -532,16 +665,20 @@ class EventDatabase(SQLiteDatabase):
 
     def get_illegal_moves(self, tournament_uniq_id: str, round: int) -> Counter[int]:
         # TODO move this method to get_illegal_moves(tournament_id: int, round: int)
+        illegal_moves: Counter[int] = Counter[int]()
+        stored_tournament: StoredTournament | None = self.get_stored_tournament(uniq_id=tournament_uniq_id)
+        if stored_tournament is None:
+            return illegal_moves
+        # uses the index illegal_move_tournament_round_player only
         self._execute(
-            'SELECT `illegal_move`.* '
+            'SELECT `player_id`, COUNT(*) AS `count` '
             'FROM `illegal_move` '
-            'JOIN `tournament` ON `illegal_move`.`tournament_id` = `tournament`.`id`' 
-            'WHERE `tournament`.`uniq_id` = ? AND `round` = ?',
-            (tournament_uniq_id, round, ),
+            'WHERE `tournament_id` = ? AND `round` = ? '
+            'GROUP BY `player_id`',
+            (stored_tournament.id, round, ),
         )
-        illegal_moves: Counter[int] = Counter[int]()
         for row in self._fetchall():
-            illegal_moves[int(row['player_id'])] += 1
+            illegal_moves[int(row['player_id'])] = row['count']
         return illegal_moves
 
     def add_illegal_move(self, tournament_uniq_id: str, round: int, player_id: int) -> StoredIllegalMove:
@@ -627,8 +764,10 @@ class EventDatabase(SQLiteDatabase):
             'INSERT INTO `result`('
             '    `tournament_id`, `round`, `board_id`, '
             '    `white_player_id`, `black_player_id`, '
-            '    `value`, `date`'
-            ') VALUES(?, ?, ?, ?, ?, ?, ?)',
+            '    `value`, `date`, '
+            '    `white_player_name`, `white_player_rating`, '
+            '    `black_player_name`, `black_player_rating`'
+            ') VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
             (
                 stored_tournament.id,
                 round,
@@ -637,6 +776,10 @@ class EventDatabase(SQLiteDatabase):
                 board.black_player.id,
                 result,
                 time.time(),
+                f'{board.white_player.last_name} {board.white_player.first_name}',
+                board.white_player.rating,
+                f'{board.black_player.last_name} {board.black_player.first_name}',
+                board.black_player.rating,
             ),
         )
 
@@ -649,36 +792,65 @@ class EventDatabase(SQLiteDatabase):
             (stored_tournament.id, round, board_id),
         )
 
+    def _get_tournament_uniq_ids_by_id(self, *tournament_uniq_ids: Unpack[str]) -> dict[int, str]:
+        """Returns the uniq_ids of the tournaments by id (of all the tournaments if no uniq_id is given)."""
+        if tournament_uniq_ids:
+            self._execute(
+                f'SELECT `id`, `uniq_id` FROM `tournament` '
+                f'WHERE `uniq_id` IN ({", ".join(["?"] * len(tournament_uniq_ids))})',
+                tuple(tournament_uniq_ids),
+            )
+        else:
+            self._execute('SELECT `id`, `uniq_id` FROM `tournament`', ())
+        return {row['id']: row['uniq_id'] for row in self._fetchall()}
+
     def get_results(self, limit: int, *tournament_uniq_ids: Unpack[str]) -> Iterator[DataResult]:
         # TODO move this method to get_results(limit: int, *tournament_ids: Unpack[int]) -> Iterator[DataResult]
-        if not tournament_uniq_ids:
-            query: str = ('SELECT '
-                          '    `tournament`.`uniq_id` as `tournament_uniq_id`, '
-                          '    `result`.`round`, `result`.`board_id`, '
-                          '    `result`.`white_player_id`, `result`.`black_player_id`, '
-                          '    `result`.`date`, `result`.`value` '
-                          'FROM `result` '
-                          'JOIN `tournament` ON `result`.`tournament_id` = `tournament`.`id` '
-                          'ORDER BY `date` DESC')
-            params: tuple = ()
-            if limit:
-                query += ' LIMIT ?'
-                params = (limit, )
-        else:
-            query: str = ('SELECT '
-                          '    `tournament`.`uniq_id` as `tournament_uniq_id`, '
-                          '    `result`.`round`, `result`.`board_id`, '
-                          '    `result`.`white_player_id`, `result`.`black_player_id`, '
-                          '    `result`.`date`, `result`.`value` '
-                          'FROM `result` '
-                          'JOIN `tournament` ON `result`.`tournament_id` = `tournament`.`id` '
-                          f'WHERE {" OR ".join([f"`tournament`.`uniq_id` = ?", ] * len(tournament_uniq_ids))} '
-                          'ORDER BY `date` DESC')
-            params: list[str] = [tournament_uniq_id for tournament_uniq_id in tournament_uniq_ids]
-            if limit:
-                query += ' LIMIT ?'
-                params += (limit, )
-        self._execute(query, params)
+        # reads the index result_date backwards until the limit is reached (the rows are read for the players only)
+        yield from self._get_results('', (), '`date` DESC', limit, *tournament_uniq_ids)
+
+    def get_results_since(self, last_id: int, limit: int, *tournament_uniq_ids: Unpack[str]) -> Iterator[DataResult]:
+        """Returns the results entered after the result last_id, the latest first."""
+        yield from self._get_results('`id` > ?', (last_id, ), '`id` DESC', limit, *tournament_uniq_ids)
+
+    def count_results(self, first_id: int, last_id: int, *tournament_uniq_ids: Unpack[str]) -> int:
+        """Returns the number of results from the result first_id to the result last_id (to detect the deleted
+        results)."""
+        tournament_uniq_ids_by_id: dict[int, str] = self._get_tournament_uniq_ids_by_id(*tournament_uniq_ids)
+        if not tournament_uniq_ids_by_id:
+            return 0
+        query: str = 'SELECT COUNT(*) AS `count` FROM `result` WHERE `id` BETWEEN ? AND ?'
+        if tournament_uniq_ids:
+            query += f' AND +`tournament_id` IN ({", ".join(["?"] * len(tournament_uniq_ids_by_id))})'
+        self._execute(query, (first_id, last_id, *(tournament_uniq_ids_by_id if tournament_uniq_ids else ())))
+        return self._fetchone()['count']
+
+    def _get_results(
+            self, where: str, params: tuple, order_by: str, limit: int, *tournament_uniq_ids: Unpack[str]
+    ) -> Iterator[DataResult]:
+        tournament_uniq_ids_by_id: dict[int, str] = self._get_tournament_uniq_ids_by_id(*tournament_uniq_ids)
+        if not tournament_uniq_ids_by_id:
+            return
+        query: str = ('SELECT '
+                      '    `id`, `tournament_id`, `round`, `board_id`, '
+                      '    `white_player_id`, `black_player_id`, '
+                      '    `date`, `value`, '
+                      '    `white_player_name`, `white_player_rating`, '
+                      '    `black_player_name`, `black_player_rating` '
+                      'FROM `result` ')
+        conditions: list[str] = [where] if where else []
+        query_params: list = list(params)
+        if tournament_uniq_ids:
+            # the unary + prevents the use of the index result_tournament_round_board, which would need a sort
+            conditions.append(f'+`tournament_id` IN ({", ".join(["?"] * len(tournament_uniq_ids_by_id))})')
+            query_params += list(tournament_uniq_ids_by_id)
+        if conditions:
+            query += f'WHERE {" AND ".join(conditions)} '
+        query += f'ORDER BY {order_by}'
+        if limit:
+            query += ' LIMIT ?'
+            query_params.append(limit)
+        self._execute(query, tuple(query_params))
         for row in self._fetchall():
             try:
                 value: UtilResult = UtilResult.from_papi_value(int(row['value']))
@@ -687,12 +859,103 @@ class EventDatabase(SQLiteDatabase):
                 continue
             yield DataResult(
                     row['date'],
-                    row['tournament_uniq_id'],
+                    tournament_uniq_ids_by_id[row['tournament_id']],
                     row['round'],
                     row['board_id'],
                     row['white_player_id'],
                     row['black_player_id'],
-                    value)
+                    value,
+                    row['white_player_name'],
+                    row['white_player_rating'],
+                    row['black_player_name'],
+                    row['black_player_rating'],
+                    row['id'])
+
+    def get_results_without_players(self, tournament_uniq_id: str) -> list[tuple[int, int, int]]:
+        """Returns the id, the white player id and the black player id of the results of the tournament entered before
+        the players were stored with the results."""
+        self._execute(
+            'SELECT `result`.`id`, `result`.`white_player_id`, `result`.`black_player_id` '
+            'FROM `result` '
+            'JOIN `tournament` ON `result`.`tournament_id` = `tournament`.`id` '
+            'WHERE `tournament`.`uniq_id` = ? AND `result`.`white_player_name` IS NULL',
+            (tournament_uniq_id, ),
+        )
+        return [(row['id'], row['white_player_id'], row['black_player_id']) for row in self._fetchall()]
+
+    def set_result_players(self, result_players: list[tuple[int, str, int, str, int]]):
+        """Stores the players of the results (id, white name and rating, black name and rating)."""
+        self.cursor.executemany(
+            'UPDATE `result` SET '
+            '    `white_player_name` = ?, `white_player_rating` = ?, '
+            '    `black_player_name` = ?, `black_player_rating` = ? '
+            'WHERE `id` = ?',
+            [(white_name, white_rating, black_name, black_rating, id)
+             for id, white_name, white_rating, black_name, black_rating in result_players],
+        )
+
+    """ 
+    ---------------------------------------------------------------------------------
+    Result journal
+    ---------------------------------------------------------------------------------
+    """
+
+    @staticmethod
+    def _row_to_stored_result_journal_entry(row: dict[str, Any]) -> StoredResultJournalEntry:
+        return StoredResultJournalEntry(
+            id=row['id'],
+            tournament_id=row['tournament_id'],
+            round=row['round'],
+            board_id=row['board_id'],
+            white_player_id=row['white_player_id'],
+            black_player_id=row['black_player_id'],
+            white_value=row['white_value'],
+            black_value=row['black_value'],
+            date=row['date'],
+        )
+
+    def add_result_journal_entry(
+            self, tournament_uniq_id: str, round: int, board: Board, white_result: UtilResult,
+            black_result: UtilResult):
+        """Adds a result to write to the Papi file (Result.NOT_PAIRED to delete the result)."""
+        stored_tournament: StoredTournament = self.get_stored_tournament(
+            uniq_id=tournament_uniq_id, create_if_absent=True)
+        self._execute(
+            'INSERT INTO `result_journal`('
+            '    `tournament_id`, `round`, `board_id`, '
+            '    `white_player_id`, `black_player_id`, '
+            '    `white_value`, `black_value`, `date`'
+            ') VALUES(?, ?, ?, ?, ?, ?, ?, ?)',
+            (
+                stored_tournament.id,
+                round,
+                board.id,
+                board.white_player.id,
+                board.black_player.id,
+                white_result.value,
+                black_result.value,
+                time.time(),
+            ),
+        )
+
+    def get_result_journal_entries(self, tournament_uniq_id: str) -> list[StoredResultJournalEntry]:
+        """Returns the results not yet written to the Papi file, in the order they were entered."""
+        self._execute(
+            'SELECT `result_journal`.* '
+            'FROM `result_journal` '
+            'JOIN `tournament` ON `result_journal`.`tournament_id` = `tournament`.`id` '
+            'WHERE `tournament`.`uniq_id` = ? '
+            'ORDER BY `result_journal`.`id`',
+            (tournament_uniq_id, ),
+        )
+        return [self._row_to_stored_result_journal_entry(row) for row in self._fetchall()]
+
+    def delete_result_journal_entries(self, tournament_id: int, last_id: int):
+        """Deletes the results written to the Papi file (up to last_id)."""
+        self._execute(
+            'DELETE FROM `result_journal` WHERE `tournament_id` = ? AND `id` <= ?',
+            (tournament_id, last_id, ),
+        )
 
     """ 
     ---------------------------------------------------------------------------------
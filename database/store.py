@@ -155,3 +155,18 @@ class StoredResult:
     board_id: int
     result: int
     date: float
+
+
+@dataclass
+class StoredResultJournalEntry:
+    """A result entered from Papi-web and not yet written to the Papi file (a result value of 0 deletes the
+    result)."""
+    id: int | None
+    tournament_id: int
+    round: int
+    board_id: int
+    white_player_id: int
+    black_player_id: int
+    white_value: int
+    black_value: int
+    date: float
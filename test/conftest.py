@@ -0,0 +1,29 @@
+"""The fixtures of the tests, run with: python -m pytest test"""
+from pathlib import Path
+
+import pytest
+
+import data.result_journal
+import database.sqlite
+from database.sqlite import EventDatabase
+from test.papi_files import EVENT_UNIQ_ID, SQLitePapiDatabase
+
+
+@pytest.fixture
+def workspace(tmp_path: Path, monkeypatch) -> Path:
+    """Runs the test in a temporary directory, with an empty event database."""
+    monkeypatch.chdir(tmp_path)
+    # the databases of the tests are told apart by their absolute path
+    monkeypatch.setattr(database.sqlite, 'DB_PATH', tmp_path / 'db')
+    with EventDatabase(EVENT_UNIQ_ID, 'w') as event_database:
+        event_database.commit()
+    return tmp_path
+
+
+@pytest.fixture
+def papi_databases(monkeypatch):
+    """Reads the Papi files with SQLitePapiDatabase, the results of the journal are written by the tests only (not by
+    the background thread)."""
+    monkeypatch.setattr('data.tournament_snapshot.PapiDatabase', SQLitePapiDatabase)
+    monkeypatch.setattr('data.result_journal.PapiDatabase', SQLitePapiDatabase)
+    monkeypatch.setattr(data.result_journal._result_journal_applier, 'schedule', lambda *args, **kwargs: None)
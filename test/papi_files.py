@@ -0,0 +1,86 @@
+"""The Papi files of the tests.
+
+The Papi files are Access databases, read with the Microsoft Access ODBC driver which is only available on Windows.
+The tests use Papi files stored in SQLite databases with the same tables (the queries of PapiDatabase are compatible),
+read by SQLitePapiDatabase instead of PapiDatabase."""
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Self
+
+from data.util import Result
+from database.papi import PapiDatabase
+
+EVENT_UNIQ_ID: str = 'test'
+TOURNAMENT_UNIQ_ID: str = 'test'
+
+# the player fields of the Papi files, see database.papi._PLAYER_FIELDS
+_PAPI_PLAYER_COLUMNS: tuple[str, ...] = (
+    'Ref INTEGER', 'Nom TEXT', 'Prenom TEXT', 'Sexe TEXT', 'FideTitre TEXT', 'Fixe INTEGER', 'Pointe INTEGER',
+    'Elo INTEGER', 'Rapide INTEGER', 'Blitz INTEGER', 'Fide TEXT', 'RapideFide TEXT', 'BlitzFide TEXT',
+)
+
+
+class SQLitePapiDatabase(PapiDatabase):
+    """A PapiDatabase reading and writing Papi files stored in SQLite databases."""
+
+    def __enter__(self) -> Self:
+        self.database = sqlite3.connect(self.file)
+        self.cursor = self.database.cursor()
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.cursor.close()
+        self.database.close()
+        self.cursor = self.database = None
+
+    def _fetchval(self) -> Any:
+        row: tuple | None = self.cursor.fetchone()
+        return None if row is None else row[0]
+
+    def _commit(self):
+        self.database.commit()
+
+
+def write_papi_file(
+        file: Path, rounds: int, players: dict[int, str], pairings: dict[int, list[tuple[int, int, Result]]],
+        ratings: dict[int, int] | None = None, pairing: str = 'Standard',
+):
+    """Writes a Papi file with the players (last names by id, the first name is the id) and the pairings of the
+    rounds (white player id, black player id, result of the white player, the black player id being 1 for the
+    exempt player)."""
+    columns: list[str] = list(_PAPI_PLAYER_COLUMNS)
+    for round_ in range(1, rounds + 1):
+        columns += [f'Rd{round_:0>2}Cl TEXT', f'Rd{round_:0>2}Adv INTEGER', f'Rd{round_:0>2}Res INTEGER']
+    rows: dict[int, list] = {
+        player_id: [player_id, last_name, str(player_id), 'M', '', 0, 1,
+                    (ratings or {}).get(player_id, 1500), 0, 0, 'F', 'F', 'F']
+                   + ['R', None, Result.NOT_PAIRED.to_papi_value] * rounds
+        for player_id, last_name in ({1: 'EXEMPT'} | players).items()
+    }
+    for round_, round_pairings in pairings.items():
+        offset: int = len(_PAPI_PLAYER_COLUMNS) + (round_ - 1) * 3
+        for white_player_id, black_player_id, result in round_pairings:
+            rows[white_player_id][offset:offset + 3] = ['B', black_player_id, result.to_papi_value]
+            rows[black_player_id][offset:offset + 3] = ['N', white_player_id, result.opposite_result.to_papi_value]
+    file.unlink(missing_ok=True)
+    with sqlite3.connect(file) as papi_database:
+        papi_database.execute('CREATE TABLE info (Variable TEXT, Value TEXT)')
+        papi_database.executemany('INSERT INTO info VALUES (?, ?)', [
+            ('NbrRondes', str(rounds)), ('Pairing', pairing), ('ClassElo', 'Elo'),
+            ('EloBase1', '2000'), ('EloBase2', '1600'),
+        ])
+        papi_database.execute(f'CREATE TABLE joueur ({", ".join(columns)})')
+        papi_database.executemany(
+            f'INSERT INTO joueur VALUES ({", ".join(["?"] * len(columns))})', list(rows.values()))
+    papi_database.close()
+
+
+def update_papi_file(file: Path, query: str, params: tuple = ()):
+    """Modifies a Papi file as Papi would do."""
+    with sqlite3.connect(file) as papi_database:
+        papi_database.execute(query, params)
+    papi_database.close()
+    # make sure that the version of the file changes, even on file systems with a coarse resolution
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
@@ -0,0 +1,54 @@
+from pathlib import Path
+
+import pytest
+
+from database.access import _AccessConnectionPool, _PooledConnection
+
+
+class _Connection:
+    def __init__(self):
+        self.closed: bool = False
+
+    def close(self):
+        self.closed = True
+
+    def rollback(self):
+        pass
+
+
+@pytest.fixture
+def pool(monkeypatch) -> _AccessConnectionPool:
+    """A pool opening fake connections, with no cleaning thread."""
+    pool: _AccessConnectionPool = _AccessConnectionPool()
+    monkeypatch.setattr(
+        pool, '_connect', lambda file, read_only: _PooledConnection(file, read_only, _Connection()))
+    # the idle connections are not cleaned by a thread
+    pool._cleaner = object()
+    return pool
+
+
+def test_idle_connections_are_reused(pool: _AccessConnectionPool, tmp_path: Path):
+    file: Path = tmp_path / 'test.papi'
+    file.write_bytes(b'')
+    connection: _PooledConnection = pool.acquire(file, True)
+    pool.release(connection)
+    assert pool.acquire(file, True) is connection
+    pool.release(connection)
+    # the file was changed by Papi
+    file.write_bytes(b'changed')
+    assert pool.acquire(file, True) is not connection
+    assert connection.connection.closed
+
+
+def test_idle_connections_are_closed_before_writing(pool: _AccessConnectionPool, tmp_path: Path):
+    file: Path = tmp_path / 'test.papi'
+    file.write_bytes(b'')
+    read_connections: list[_PooledConnection] = [pool.acquire(file, True), pool.acquire(file, True), ]
+    for read_connection in read_connections:
+        pool.release(read_connection)
+    write_connection: _PooledConnection = pool.acquire(file, False)
+    assert write_connection not in read_connections
+    assert all(read_connection.connection.closed for read_connection in read_connections)
+    pool.release(write_connection)
+    # a connection opened for writing is reused for reading
+    assert pool.acquire(file, True) is write_connection
@@ -0,0 +1,31 @@
+from pathlib import Path
+
+from common.config_reader import EVENTS_PATH
+from common.file_watcher import file_watcher
+from data.event import EventSummary, _EventCatalog
+from data.util import Result
+from test.papi_files import EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, update_papi_file, write_papi_file
+
+
+def _write_event_file(file: Path, name: str):
+    file.write_text(
+        f'[event]\nname = {name}\n\n[tournament]\nfilename = {TOURNAMENT_UNIQ_ID}\nname = Open\n', encoding='utf-8')
+
+
+def test_summaries_do_not_depend_on_the_papi_files(workspace: Path, papi_databases):
+    # the files are watched by their path relative to the working directory
+    event_file: Path = EVENTS_PATH / f'{EVENT_UNIQ_ID}.ini'
+    event_file.parent.mkdir()
+    _write_event_file(event_file, 'Test')
+    papi_file: Path = Path('papi') / f'{TOURNAMENT_UNIQ_ID}.papi'
+    papi_file.parent.mkdir()
+    write_papi_file(papi_file, 3, {2: 'A', 3: 'B', }, {1: [(2, 3, Result.NOT_PAIRED), ]})
+    catalog: _EventCatalog = _EventCatalog()
+    summary: EventSummary = catalog.get_summary(EVENT_UNIQ_ID)
+    assert summary.name == 'Test'
+    update_papi_file(papi_file, 'UPDATE joueur SET Nom = ? WHERE Ref = ?', ('C', 2, ))
+    file_watcher.notify(papi_file)
+    assert catalog.get_summary(EVENT_UNIQ_ID) is summary
+    _write_event_file(event_file, 'Test 2')
+    file_watcher.notify(event_file)
+    assert catalog.get_summary(EVENT_UNIQ_ID).name == 'Test 2'
@@ -0,0 +1,100 @@
+from pathlib import Path
+
+import pytest
+
+from data.board import Board
+from data.player import Player
+from data.result import Result as DataResult
+from data.tournament import _store_result_players
+from data.tournament_snapshot import TournamentSnapshotBuilder, TournamentSnapshotKey
+from data.util import PlayerGender, PlayerTitle, Result
+from database.sqlite import EventDatabase
+from test.papi_files import EVENT_UNIQ_ID, write_papi_file
+
+
+def _create_board(board_id: int) -> Board:
+    white_player: Player = Player(
+        2 * board_id, f'BLANC{board_id}', 'Prénom', PlayerGender.MALE, PlayerTitle.NONE, 1500, 'F', 0, True, {})
+    black_player: Player = Player(
+        2 * board_id + 1, f'NOIR{board_id}', 'Prénom', PlayerGender.FEMALE, PlayerTitle.NONE, 1400, 'F', 0, True, {})
+    return Board(board_id, board_id, white_player, black_player)
+
+
+@pytest.fixture
+def result_ids(workspace: Path) -> list[int]:
+    """Enters 6 results, alternately in tournaments a and b, returns their ids in the order they were entered."""
+    with EventDatabase(EVENT_UNIQ_ID, 'w') as event_database:
+        for board_id in range(1, 7):
+            event_database.add_result('a' if board_id % 2 else 'b', 1, _create_board(board_id), Result.GAIN)
+        event_database.commit()
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        return sorted(result.id for result in event_database.get_results(0))
+
+
+def test_results_since(result_ids: list[int]):
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        results: list[DataResult] = list(event_database.get_results_since(result_ids[2], 0))
+        assert [result.id for result in results] == result_ids[:2:-1]
+        assert [result.board_id for result in results] == [6, 5, 4, ]
+        # the players are stored with the results
+        assert (results[0].white_player_name, results[0].white_player_rating) == ('BLANC6 Prénom', 1500)
+        assert (results[0].black_player_name, results[0].black_player_rating) == ('NOIR6 Prénom', 1400)
+        assert (results[0].white_player_str, results[0].black_player_str) == ('BLANC6 Prénom 1500', 'NOIR6 Prénom 1400')
+        assert [result.id for result in event_database.get_results_since(result_ids[2], 2)] == result_ids[:3:-1]
+        assert [result.tournament_uniq_id for result in event_database.get_results_since(0, 0, 'a')] == ['a'] * 3
+        assert [result.board_id for result in event_database.get_results_since(result_ids[2], 0, 'a')] == [5, ]
+        assert list(event_database.get_results_since(result_ids[-1], 0)) == []
+        assert list(event_database.get_results_since(0, 0, 'unknown')) == []
+
+
+def test_count_results(result_ids: list[int]):
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        assert event_database.count_results(result_ids[0], result_ids[-1]) == 6
+        assert event_database.count_results(result_ids[1], result_ids[3], 'a') == 1
+        assert event_database.count_results(result_ids[0], result_ids[-1], 'unknown') == 0
+    with EventDatabase(EVENT_UNIQ_ID, 'w') as event_database:
+        event_database.delete_result('b', 1, 4)
+        event_database.commit()
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        # the deleted results are detected by the screens
+        assert event_database.count_results(result_ids[0], result_ids[-1]) == 5
+
+
+def test_results_latest_first(result_ids: list[int]):
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        results: list[DataResult] = list(event_database.get_results(4))
+        assert len(results) == 4
+        timestamps: list[float] = [result.timestamp for result in results]
+        assert timestamps == sorted(timestamps, reverse=True)
+        assert {result.board_id for result in event_database.get_results(0, 'b')} == {2, 4, 6, }
+
+
+def test_results_entered_before_the_players_were_stored(result_ids: list[int], workspace: Path, papi_databases):
+    with EventDatabase(EVENT_UNIQ_ID, 'w') as event_database:
+        event_database._execute(
+            'UPDATE `result` SET `white_player_name` = NULL, `white_player_rating` = NULL, '
+            '`black_player_name` = NULL, `black_player_rating` = NULL')
+        event_database.commit()
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        results: list[DataResult] = list(event_database.get_results(0, 'a'))
+    # the players are not read from the Papi files by the results screens
+    assert {(result.white_player_str, result.black_player_str) for result in results} == {
+        ('Joueur·euse n°2', 'Joueur·euse n°3'),
+        ('Joueur·euse n°6', 'Joueur·euse n°7'),
+        ('Joueur·euse n°10', 'Joueur·euse n°11'),
+    }
+    # the players are stored when the tournament is read
+    file: Path = workspace / 'a.papi'
+    write_papi_file(file, 1, {player_id: f'JOUEUR{player_id}' for player_id in range(2, 14)}, {})
+    key: TournamentSnapshotKey = TournamentSnapshotKey(EVENT_UNIQ_ID, 'a', file)
+    _store_result_players(key, TournamentSnapshotBuilder(key).snapshot)
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        assert {
+            (result.white_player_str, result.black_player_str) for result in event_database.get_results(0, 'a')
+        } == {
+            ('JOUEUR2 2 1500', 'JOUEUR3 3 1500'),
+            ('JOUEUR6 6 1500', 'JOUEUR7 7 1500'),
+            ('JOUEUR10 10 1500', 'JOUEUR11 11 1500'),
+        }
+        assert {result.white_player_str for result in event_database.get_results(0, 'b')} == {
+            'Joueur·euse n°4', 'Joueur·euse n°8', 'Joueur·euse n°12', }
@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+from pathlib import Path
+from threading import Barrier, Thread
+
+import pytest
+
+import common.file_watcher
+from common.file_watcher import FileWatcher
+
+
+@pytest.fixture
+def watcher(monkeypatch) -> FileWatcher:
+    """A file watcher without its background threads, the changes being checked by the tests."""
+    watcher: FileWatcher = FileWatcher()
+    monkeypatch.setattr(watcher, '_start_threads', lambda: None)
+    return watcher
+
+
+def _touch(file: Path, content: str):
+    file.write_text(content)
+    # make sure that the modification time changes, even on file systems with a coarse resolution
+    stat = file.stat()
+    os.utime(file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_concurrent_checks_bump_the_version_once(watcher: FileWatcher, tmp_path: Path, monkeypatch):
+    get_file_version = common.file_watcher.get_file_version
+
+    def slow_get_file_version(file: Path) -> tuple[int, int, int, int] | None:
+        time.sleep(0.01)
+        return get_file_version(file)
+
+    file: Path = tmp_path / 'tournament.papi'
+    _touch(file, 'a')
+    watcher.watch([file])
+    changes: list[Path] = []
+
+    def listener(changed_file: Path):
+        changes.append(changed_file)
+        time.sleep(0.01)
+
+    watcher.add_listener(listener)
+    _touch(file, 'ab')
+    monkeypatch.setattr(common.file_watcher, 'get_file_version', slow_get_file_version)
+    threads_count: int = 8
+    barrier: Barrier = Barrier(threads_count)
+
+    def check():
+        barrier.wait()
+        watcher._check(file)
+
+    threads: list[Thread] = [Thread(target=check) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert changes == [file, ]
+    assert watcher.version([file]) == watcher.current_version == 1
+
+
+def test_versions(watcher: FileWatcher, tmp_path: Path):
+    files: list[Path] = [tmp_path / 'a.papi', tmp_path / 'b.papi', tmp_path / 'c.papi', ]
+    for file in files[:2]:
+        _touch(file, 'a')
+    watcher.watch(files)
+    assert watcher.versions(files) == (0, 0, 0, )
+    # no change
+    watcher.notify(files[0])
+    assert watcher.current_version == 0
+    _touch(files[1], 'ab')
+    watcher.notify(files[1])
+    _touch(files[2], 'a')
+    watcher.notify(files[2])
+    assert watcher.versions(files) == (0, 1, 2, )
+    assert watcher.version(files[:2]) == 1
+    assert watcher.version(files) == watcher.current_version == 2
+    # the files not watched have no version
+    unwatched_file: Path = tmp_path / 'd.papi'
+    _touch(unwatched_file, 'a')
+    watcher.notify(unwatched_file)
+    assert watcher.version([unwatched_file]) == 0
+    assert watcher.current_version == 2
+    # the deletion of a file is a change
+    files[1].unlink()
+    watcher.notify(files[1])
+    assert watcher.versions(files) == (0, 3, 2, )
+
+
+def test_listeners_are_called_before_the_version_changes(watcher: FileWatcher, tmp_path: Path):
+    file: Path = tmp_path / 'tournament.papi'
+    _touch(file, 'a')
+    watcher.watch([file])
+    versions: list[int] = []
+    watcher.add_listener(lambda changed_file: versions.append(watcher.version([changed_file])))
+    _touch(file, 'ab')
+    watcher.notify(file)
+    assert versions == [0, ]
+    assert watcher.version([file]) == 1
+
+
+def test_wait_for_change(watcher: FileWatcher, tmp_path: Path):
+    file: Path = tmp_path / 'tournament.papi'
+    _touch(file, 'a')
+    watcher.watch([file])
+
+    async def wait_for_change() -> tuple[int, int]:
+        # nothing changed
+        timeout_version: int = await watcher.wait_for_change([file], 0, 0.01)
+        waiter: asyncio.Task = asyncio.create_task(watcher.wait_for_change([file], 0, 10))
+        await asyncio.sleep(0.01)
+        _touch(file, 'ab')
+        await asyncio.to_thread(watcher.notify, file)
+        return timeout_version, await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(wait_for_change()) == (0, 1, )
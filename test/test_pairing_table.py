@@ -0,0 +1,99 @@
+from data.pairing import Pairing
+from data.pairing_table import PairingTable, PlayerPairings
+from data.util import Color, Result
+
+
+def _create_table() -> PairingTable:
+    """A tournament of 3 rounds and 4 players (and the exempt player): round 1 is played, round 2 is paired with one
+    result missing, round 3 is not paired."""
+    table: PairingTable = PairingTable(3)
+    table.add_player(1, [None, None, None], [None, None, None], [Result.NOT_PAIRED] * 3)
+    table.add_player(
+        2, [Color.WHITE, Color.BLACK, None], [3, 4, None], [Result.GAIN, Result.DRAW_OR_HPB, Result.NOT_PAIRED])
+    table.add_player(
+        3, [Color.BLACK, Color.WHITE, None], [2, 5, None], [Result.LOSS, Result.NOT_PAIRED, Result.NOT_PAIRED])
+    table.add_player(
+        4, [Color.WHITE, Color.WHITE, None], [5, 2, None], [Result.DRAW_OR_HPB, Result.DRAW_OR_HPB, Result.NOT_PAIRED])
+    table.add_player(
+        5, [Color.BLACK, Color.BLACK, None], [4, 3, None], [Result.DRAW_OR_HPB, Result.NOT_PAIRED, Result.NOT_PAIRED])
+    return table
+
+
+def test_player_pairings():
+    table: PairingTable = _create_table()
+    pairings: PlayerPairings = PlayerPairings(table, 2)
+    assert list(pairings) == [1, 2, 3, ]
+    assert pairings[1] == Pairing(Color.BLACK, 2, Result.LOSS)
+    assert pairings[3] == Pairing(None, None, Result.NOT_PAIRED)
+    assert pairings.get(4) is None
+    pairings[2] = Pairing(Color.WHITE, 5, Result.GAIN)
+    assert table.get_pairing(2, 2) == Pairing(Color.WHITE, 5, Result.GAIN)
+
+
+def test_other_colors_are_kept():
+    table: PairingTable = PairingTable(2)
+    table.add_player(2, ['F', Color.WHITE], [None, 3], [Result.DRAW_OR_HPB, Result.NOT_PAIRED])
+    assert table.get_pairing(0, 1) == Pairing('F', None, Result.DRAW_OR_HPB)
+    table.set_pairing(0, 1, Pairing(Color.BLACK, 3, Result.LOSS))
+    assert table.get_pairing(0, 1) == Pairing(Color.BLACK, 3, Result.LOSS)
+
+
+def test_update_player():
+    table: PairingTable = _create_table()
+    assert not table.update_player(1, 2, [Color.BLACK, None], [4, None], [Result.DRAW_OR_HPB, Result.NOT_PAIRED])
+    assert table.update_player(1, 2, [Color.BLACK, None], [4, None], [Result.GAIN, Result.NOT_PAIRED])
+    assert table.get_pairing(1, 2) == Pairing(Color.BLACK, 4, Result.GAIN)
+    # the rounds before first_round are not changed
+    assert table.get_pairing(1, 1) == Pairing(Color.WHITE, 3, Result.GAIN)
+
+
+def test_copy_is_independent():
+    table: PairingTable = _create_table()
+    copy: PairingTable = table.copy()
+    assert copy.same_pairings(table, 1, 3)
+    copy.set_pairing(2, 2, Pairing(Color.WHITE, 5, Result.GAIN))
+    assert table.get_pairing(2, 2) == Pairing(Color.WHITE, 5, Result.NOT_PAIRED)
+    assert not copy.same_pairings(table, 1, 3)
+    assert copy.same_pairings(table, 1, 3, results=False)
+    assert copy.same_pairings(table, 1, 1)
+
+
+def test_same_pairings_compares_the_players():
+    table: PairingTable = _create_table()
+    other: PairingTable = PairingTable(3)
+    for row, player_id in enumerate(table.player_ids):
+        other.add_player(
+            player_id if player_id != 5 else 6,
+            [table.get_pairing(row, round_).color for round_ in range(1, 4)],
+            [table.get_pairing(row, round_).opponent_id for round_ in range(1, 4)],
+            [table.get_pairing(row, round_).result for round_ in range(1, 4)])
+    assert not other.same_pairings(table, 1, 3)
+
+
+def test_current_round():
+    table: PairingTable = _create_table()
+    # round 2 is paired and results are missing
+    assert table.current_round() == 2
+    for row in (2, 4, ):
+        pairing: Pairing = table.get_pairing(row, 2)
+        table.set_pairing(row, 2, Pairing(pairing.color, pairing.opponent_id, Result.DRAW_OR_HPB))
+    # all the results are entered, the last round paired
+    assert table.current_round() == 2
+    assert PairingTable(3).current_round() == 0
+
+
+def test_current_round_ignores_the_exempt_player():
+    table: PairingTable = PairingTable(2)
+    table.add_player(1, [Color.BLACK, None], [2, None], [Result.NOT_PAIRED, Result.NOT_PAIRED])
+    table.add_player(2, [Color.WHITE, None], [1, None], [Result.PAB_OR_FORFEIT_GAIN_OR_FPB, Result.NOT_PAIRED])
+    assert table.current_round() == 1
+    table.add_player(3, [None, None], [None, None], [Result.NOT_PAIRED, Result.NOT_PAIRED])
+    assert table.current_round() == 1
+
+
+def test_points():
+    table: PairingTable = _create_table()
+    assert table.points(1) == [0, 0, 0, 0, 0, ]
+    assert table.points(2) == [0, 1, 0, .5, .5, ]
+    # the current round is excluded
+    assert table.points(3) == [0, 1.5, 0, 1, .5, ]
@@ -0,0 +1,77 @@
+from collections.abc import Iterator
+from pathlib import Path
+
+import pytest
+from litestar import Litestar
+from litestar.contrib.htmx.request import HTMXRequest
+from litestar.testing import TestClient
+
+import data.event
+import database.sqlite
+from common.read_only import ReadOnlyError, enable_read_only_check, read_only
+from data.event import EVENT_CACHE_SIZE, Event, _EventCache, _EventCatalog, get_event, prepare_events
+from data.tournament_snapshot import _tournament_snapshot_store
+from data.util import Result
+from test.papi_files import EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, write_papi_file
+from web.settings import middlewares, route_handlers, template_config
+
+
+@pytest.fixture
+def client(workspace: Path, papi_databases, monkeypatch) -> Iterator[TestClient]:
+    """A client of the server, the event being prepared as at server start (the files opened for writing, the
+    directories created and the files renamed in the display requests raise a ReadOnlyError)."""
+    (workspace / 'events').mkdir()
+    (workspace / 'events' / f'{EVENT_UNIQ_ID}.ini').write_text(
+        f'[event]\nname = Test\n\n[tournament]\nfilename = {TOURNAMENT_UNIQ_ID}\nname = Open\n', encoding='utf-8')
+    (workspace / 'papi').mkdir()
+    write_papi_file(
+        workspace / 'papi' / f'{TOURNAMENT_UNIQ_ID}.papi', 3, {2: 'A', 3: 'B', 4: 'C', 5: 'D', },
+        {1: [(2, 3, Result.GAIN), (4, 5, Result.NOT_PAIRED), ]})
+    monkeypatch.setattr(data.event, '_event_cache', _EventCache(EVENT_CACHE_SIZE))
+    monkeypatch.setattr(data.event, '_event_catalog', _EventCatalog())
+    # the tournaments are read before the requests
+    monkeypatch.setattr(data.event, 'warm_tournament_snapshots', _tournament_snapshot_store.warm)
+    prepare_events()
+    enable_read_only_check()
+    with TestClient(app=Litestar(
+            request_class=HTMXRequest,
+            route_handlers=route_handlers,
+            template_config=template_config,
+            middleware=middlewares,
+    )) as client:
+        yield client
+
+
+def test_display_requests_do_not_write(client: TestClient, monkeypatch):
+    event: Event = get_event(EVENT_UNIQ_ID, True)
+    assert event.screens
+    # the database is checked again by the first write, not by the display requests
+    monkeypatch.setattr(database.sqlite, '_checked_files', set())
+    assert client.get(f'/event/{EVENT_UNIQ_ID}').status_code == 200
+    for screen_id in event.screens:
+        assert client.get(f'/screen/{EVENT_UNIQ_ID}/{screen_id}').status_code == 200
+    for rotator_id in event.rotators:
+        assert client.get(f'/rotator/{EVENT_UNIQ_ID}/{rotator_id}').status_code == 200
+    assert not database.sqlite._checked_files
+
+
+def test_display_requests_open_the_databases_read_only(client: TestClient, monkeypatch):
+    event: Event = get_event(EVENT_UNIQ_ID, True)
+    # no idle connection to reuse, the display requests open their own connections
+    monkeypatch.setattr(database.sqlite, '_sqlite_connection_pool', database.sqlite._SQLiteConnectionPool())
+    for screen_id in event.screens:
+        assert client.get(f'/screen/{EVENT_UNIQ_ID}/{screen_id}').status_code == 200
+    idle_connections = database.sqlite._sqlite_connection_pool._idle_connections.get(
+        database.sqlite.DB_PATH / f'{EVENT_UNIQ_ID}.db', [])
+    assert idle_connections
+    assert all(pooled_connection.opened_read_only for pooled_connection in idle_connections)
+    # the connections opened read-only are not reused to write
+    with database.sqlite.EventDatabase(EVENT_UNIQ_ID, 'w') as event_database:
+        assert not event_database._pooled_connection.opened_read_only
+
+
+def test_display_requests_do_not_create_the_databases(workspace: Path):
+    with read_only():
+        with pytest.raises(ReadOnlyError):
+            database.sqlite.EventDatabase('unknown', 'r')
+    assert not (database.sqlite.DB_PATH / 'unknown.db').exists()
@@ -0,0 +1,121 @@
+import time
+from pathlib import Path
+
+import pytest
+
+import data.result_journal
+from data.board import Board
+from data.result_journal import RESULT_JOURNAL_RETRY_DELAYS, _ResultJournalApplier
+from data.tournament_snapshot import TournamentSnapshot, TournamentSnapshotKey, get_tournament_snapshot
+from data.util import Result
+from database.sqlite import EventDatabase
+from database.store import StoredResultJournalEntry
+from test.papi_files import EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, SQLitePapiDatabase, write_papi_file
+
+
+@pytest.fixture
+def applier(monkeypatch) -> _ResultJournalApplier:
+    """An applier not listening to the snapshots, the results being written by the tests."""
+    monkeypatch.setattr(data.result_journal, 'add_tournament_snapshot_listener', lambda listener: None)
+    return _ResultJournalApplier()
+
+
+@pytest.fixture
+def key(workspace: Path, papi_databases) -> TournamentSnapshotKey:
+    """A tournament of 3 rounds, round 1 being paired with no result."""
+    file: Path = workspace / f'{TOURNAMENT_UNIQ_ID}.papi'
+    write_papi_file(
+        file, 3, {2: 'A', 3: 'B', 4: 'C', 5: 'D', 6: 'E', 7: 'F', },
+        {1: [(2, 3, Result.NOT_PAIRED), (4, 5, Result.NOT_PAIRED), (6, 7, Result.NOT_PAIRED), ]})
+    return TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file)
+
+
+def _add_result_journal_entry(board: Board, white_result: Result):
+    with EventDatabase(EVENT_UNIQ_ID, 'w') as event_database:
+        event_database.add_result_journal_entry(
+            TOURNAMENT_UNIQ_ID, 1, board, white_result, white_result.opposite_result)
+        event_database.commit()
+
+
+def _get_result_journal_entries() -> list[StoredResultJournalEntry]:
+    with EventDatabase(EVENT_UNIQ_ID, 'r') as event_database:
+        return event_database.get_result_journal_entries(TOURNAMENT_UNIQ_ID)
+
+
+def _read_results(key: TournamentSnapshotKey) -> dict[int, Result]:
+    """Reads the results of round 1 from the Papi file."""
+    with SQLitePapiDatabase(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, key.file, 'r') as papi_database:
+        players_by_id, _ = papi_database.read_players(papi_database.read_info().rating, 3)
+    return {player_id: player.pairings[1].result for player_id, player in players_by_id.items() if player_id != 1}
+
+
+def test_results_are_written_in_the_order_they_were_entered(applier: _ResultJournalApplier, key: TournamentSnapshotKey):
+    boards: list[Board] = get_tournament_snapshot(key).boards
+    board: Board = next(board for board in boards if board.white_player.id == 2)
+    _add_result_journal_entry(board, Result.GAIN)
+    _add_result_journal_entry(board, Result.DRAW_OR_HPB)
+    applier._apply(key)
+    assert _read_results(key) == {
+        2: Result.DRAW_OR_HPB, 3: Result.DRAW_OR_HPB,
+        4: Result.NOT_PAIRED, 5: Result.NOT_PAIRED, 6: Result.NOT_PAIRED, 7: Result.NOT_PAIRED,
+    }
+    assert _get_result_journal_entries() == []
+    snapshot: TournamentSnapshot = get_tournament_snapshot(key)
+    assert snapshot.pending_results == 0
+    assert snapshot.players_by_id[2].pairings[1].result == Result.DRAW_OR_HPB
+
+
+def test_entries_of_changed_pairings_are_skipped(applier: _ResultJournalApplier, key: TournamentSnapshotKey):
+    snapshot: TournamentSnapshot = get_tournament_snapshot(key)
+    # players 2 and 5 are not paired together
+    _add_result_journal_entry(
+        Board(1, 1, snapshot.players_by_id[2], snapshot.players_by_id[5]), Result.GAIN)
+    board: Board = next(board for board in snapshot.boards if board.white_player.id == 4)
+    _add_result_journal_entry(board, Result.LOSS)
+    applier._apply(key)
+    assert _read_results(key) == {
+        2: Result.NOT_PAIRED, 3: Result.NOT_PAIRED,
+        4: Result.LOSS, 5: Result.GAIN, 6: Result.NOT_PAIRED, 7: Result.NOT_PAIRED,
+    }
+    # the skipped entry is deleted with the others
+    assert _get_result_journal_entries() == []
+
+
+def test_entries_are_deleted_up_to_the_last_entry_written(
+        applier: _ResultJournalApplier, key: TournamentSnapshotKey, monkeypatch
+):
+    boards: list[Board] = get_tournament_snapshot(key).boards
+    _add_result_journal_entry(boards[0], Result.GAIN)
+    commit = SQLitePapiDatabase.commit
+
+    def commit_while_entering_a_result(papi_database: SQLitePapiDatabase):
+        # a result is entered while the Papi file is written
+        _add_result_journal_entry(boards[1], Result.GAIN)
+        commit(papi_database)
+
+    monkeypatch.setattr(SQLitePapiDatabase, 'commit', commit_while_entering_a_result)
+    applier._apply(key)
+    entries: list[StoredResultJournalEntry] = _get_result_journal_entries()
+    assert [(entry.white_player_id, entry.black_player_id) for entry in entries] \
+           == [(boards[1].white_player.id, boards[1].black_player.id)]
+    assert get_tournament_snapshot(key).pending_results == 1
+
+
+def test_failed_writes_are_retried(applier: _ResultJournalApplier, key: TournamentSnapshotKey, monkeypatch):
+    attempts: list[TournamentSnapshotKey] = []
+
+    def apply(failing_key: TournamentSnapshotKey):
+        attempts.append(failing_key)
+        raise OSError('locked by Papi')
+
+    monkeypatch.setattr(applier, '_apply', apply)
+    for failures, delay in enumerate(RESULT_JOURNAL_RETRY_DELAYS + RESULT_JOURNAL_RETRY_DELAYS[-1:], start=1):
+        applier._due_times.pop(key, None)
+        start: float = time.monotonic()
+        applier._try_apply(key)
+        assert applier._failures[key] == failures
+        assert start + delay <= applier._due_times[key] <= time.monotonic() + delay
+    monkeypatch.setattr(applier, '_apply', attempts.append)
+    applier._try_apply(key)
+    assert key not in applier._failures
+    assert len(attempts) == len(RESULT_JOURNAL_RETRY_DELAYS) + 2
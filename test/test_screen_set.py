@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from common.config_reader import TMP_DIR
+from data.board import Board
+from data.screen_set import ScreenSet
+from data.tournament import Tournament
+from data.tournament_snapshot import refresh_tournament_snapshot
+from data.util import Result
+from test.papi_files import EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, update_papi_file, write_papi_file
+
+
+def test_items_are_extracted_from_the_latest_snapshot(workspace: Path, papi_databases):
+    file: Path = workspace / f'{TOURNAMENT_UNIQ_ID}.papi'
+    write_papi_file(
+        file, 3, {2: 'A', 3: 'B', 4: 'C', 5: 'D', },
+        {1: [(2, 3, Result.NOT_PAIRED), (4, 5, Result.NOT_PAIRED), ]})
+    tournament: Tournament = Tournament(
+        EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, 'Open', file, None, None, None, None, None, None, None, None, None, 0)
+    boards_screen_set: ScreenSet = ScreenSet(EVENT_UNIQ_ID, tournament, 'boards', 1, 1, False, first=2)
+    assert boards_screen_set.name_for_boards == 'Ech. 2 à 2'
+    board: Board = boards_screen_set.boards_lists[0][0]
+    assert board.result == Result.NOT_PAIRED
+    # the directory of the markers is created when the event is built
+    (TMP_DIR / 'events' / EVENT_UNIQ_ID).mkdir(parents=True)
+    tournament.add_result(board, Result.GAIN)
+    assert boards_screen_set.boards_lists[0][0].result == Result.GAIN
+    players_screen_set: ScreenSet = ScreenSet(EVENT_UNIQ_ID, tournament, 'players', 1, 1, True, name='%t %f-%l')
+    assert players_screen_set.name_for_players == 'Open A-D'
+    # the configured name is formatted again when the players change
+    update_papi_file(file, 'UPDATE joueur SET Nom = ? WHERE Ref = ?', ('E', 2, ))
+    refresh_tournament_snapshot(tournament.snapshot_key)
+    assert players_screen_set.name_for_players == 'Open B-E'
+    assert players_screen_set.name == '%t %f-%l'
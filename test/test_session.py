@@ -0,0 +1,24 @@
+import time
+from types import SimpleNamespace
+
+from web.session import SessionHandler
+
+
+def test_recent_updates_are_highlighted_in_the_shared_fragments():
+    html: str = (
+        '<tr class="board-row updated-result-t-2-1"></tr>'
+        '<tr class="board-row updated-result-t-2-10"></tr>'
+        '<td class="player-cell updated-illegal-moves-t-3 "></td>'
+        '<td class="player-cell updated-check-in-t-3"></td>')
+    request = SimpleNamespace(session={})
+    assert SessionHandler.highlight_recent_updates(request, html) == html
+    SessionHandler.set_session_last_result_updated(request, 't', 2, 1)
+    SessionHandler.set_session_last_illegal_move_updated(request, 't', 3)
+    highlighted_html: str = SessionHandler.highlight_recent_updates(request, html)
+    assert highlighted_html.count('last_result_updated') == 1
+    assert 'updated-result-t-2-1 last_result_updated"' in highlighted_html
+    assert 'updated-illegal-moves-t-3 last_illegal_move_updated ' in highlighted_html
+    assert 'last_check_in_updated' not in highlighted_html
+    # the expired updates are not highlighted
+    request.session['last_result_updated']['expiration'] = time.time() - 1
+    assert 'last_result_updated' not in SessionHandler.highlight_recent_updates(request, html)
@@ -0,0 +1,199 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from data.board import Board
+from data.player import Player
+import data.tournament_snapshot
+from data.tournament_snapshot import TournamentSnapshot, TournamentSnapshotBuilder, TournamentSnapshotKey, \
+    get_tournament_snapshot
+from data.util import Result
+from test.papi_files import EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, update_papi_file, write_papi_file
+
+NAMES: tuple[str, ...] = ('MARTIN', 'BERNARD', 'THOMAS', 'PETIT', 'ROBERT', 'RICHARD', )
+
+
+def _write_random_papi_file(file: Path, player_count: int, seed: int):
+    """Writes a tournament of 5 rounds with random pairings, round 3 being the current round."""
+    rnd: random.Random = random.Random(seed)
+    player_ids: list[int] = list(range(2, player_count + 2))
+    pairings: dict[int, list[tuple[int, int, Result]]] = {}
+    for round_ in range(1, 4):
+        rnd.shuffle(player_ids)
+        pairings[round_] = []
+        if len(player_ids) % 2:
+            pairings[round_].append((player_ids[-1], 1, Result.PAB_OR_FORFEIT_GAIN_OR_FPB))
+        for white_player_id, black_player_id in zip(player_ids[::2], player_ids[1::2]):
+            result: Result = rnd.choice((Result.GAIN, Result.DRAW_OR_HPB, Result.LOSS, ))
+            if round_ == 3 and rnd.random() < .5:
+                result = Result.NOT_PAIRED
+            pairings[round_].append((white_player_id, black_player_id, result))
+    write_papi_file(
+        file, 5,
+        {player_id: rnd.choice(NAMES) for player_id in player_ids},
+        pairings,
+        ratings={player_id: rnd.choice((1199, 1500, 1850, 2000, )) for player_id in player_ids})
+
+
+def test_board_sort_keys_match_board_order(workspace: Path, papi_databases):
+    for seed, player_count in enumerate((2, 9, 40, 101, )):
+        file: Path = workspace / f'{seed}.papi'
+        _write_random_papi_file(file, player_count, seed)
+        snapshot: TournamentSnapshot = TournamentSnapshotBuilder(
+            TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file)).snapshot
+        assert snapshot.current_round == 3
+        # the order of Board.__lt__ (the boards with no id are compared by their players)
+        expected_boards: list[Board] = sorted(
+            (Board(white_player=board.white_player, black_player=board.black_player) for board in snapshot.boards),
+            reverse=True)
+        assert [(board.white_player.id, board.black_player.id) for board in snapshot.boards] \
+               == [(board.white_player.id, board.black_player.id) for board in expected_boards]
+        assert [board.id for board in snapshot.boards] == list(range(1, len(snapshot.boards) + 1))
+
+
+@pytest.fixture
+def snapshot(workspace: Path, papi_databases) -> TournamentSnapshot:
+    """A tournament of 3 rounds, round 2 being paired with no result."""
+    file: Path = workspace / f'{TOURNAMENT_UNIQ_ID}.papi'
+    write_papi_file(
+        file, 3, {2: 'A', 3: 'B', 4: 'C', 5: 'D', 6: 'E', },
+        {
+            1: [(2, 3, Result.GAIN), (4, 5, Result.DRAW_OR_HPB), (6, 1, Result.PAB_OR_FORFEIT_GAIN_OR_FPB), ],
+            2: [(4, 2, Result.NOT_PAIRED), (3, 6, Result.NOT_PAIRED), (5, 1, Result.NOT_PAIRED), ],
+        })
+    return TournamentSnapshotBuilder(TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file)).snapshot
+
+
+def _get_state(snapshot: TournamentSnapshot) -> tuple:
+    """Returns everything the screens read from a snapshot."""
+    return (
+        snapshot.current_round,
+        snapshot.pending_results,
+        [(board.id, board.white_player.id, board.black_player.id, board.result, board.result_pending)
+         for board in snapshot.boards or ()],
+        {player.id: (dict(player.pairings), player.illegal_moves, player.check_in, player.board_id)
+         for player in snapshot.players_by_id.values()},
+        [player.id for player in snapshot.indexes.players_by_name_with_unpaired],
+        {number: [board.id for board in boards] for number, boards in snapshot.indexes.boards_by_number.items()},
+    )
+
+
+def test_with_result_does_not_change_the_snapshot(snapshot: TournamentSnapshot):
+    state: tuple = _get_state(snapshot)
+    board: Board = snapshot.boards[0]
+    new_snapshot: TournamentSnapshot = snapshot.with_result(
+        board.id, board.white_player.id, board.black_player.id, Result.GAIN)
+    assert _get_state(snapshot) == state
+    assert snapshot.boards[0].result == Result.NOT_PAIRED
+    new_board: Board = new_snapshot.boards[0]
+    assert (new_board.result, new_board.result_pending) == (Result.GAIN, True)
+    assert new_board.white_player.pairings[2].result == Result.GAIN
+    assert new_board.black_player.pairings[2].result == Result.LOSS
+    assert new_snapshot.players_by_id[new_board.white_player.id] is new_board.white_player
+    assert new_snapshot.indexes.boards_by_number[new_board.number] == [new_board]
+    assert new_snapshot.pending_results == 1
+    # the other boards are shared
+    assert new_snapshot.boards[1] is snapshot.boards[1]
+    # the result is deleted
+    new_snapshot = new_snapshot.with_result(board.id, board.white_player.id, board.black_player.id, Result.NOT_PAIRED)
+    assert new_snapshot.boards[0].result == Result.NOT_PAIRED
+    assert new_snapshot.boards[0].white_player.pairings[2].result == Result.NOT_PAIRED
+
+
+def test_with_result_needing_a_new_build(snapshot: TournamentSnapshot, workspace: Path):
+    state: tuple = _get_state(snapshot)
+    board: Board = snapshot.boards[0]
+    # the players of the board changed
+    assert snapshot.with_result(board.id, board.black_player.id, board.white_player.id, Result.GAIN) is None
+    assert snapshot.with_result(len(snapshot.boards) + 1, 2, 3, Result.GAIN) is None
+    assert _get_state(snapshot) == state
+    # the last result of round 1 is entered while round 2 is already paired
+    file: Path = workspace / 'next_round_paired.papi'
+    write_papi_file(
+        file, 3, {2: 'A', 3: 'B', 4: 'C', 5: 'D', },
+        {
+            1: [(2, 3, Result.GAIN), (4, 5, Result.NOT_PAIRED), ],
+            2: [(2, 4, Result.NOT_PAIRED), (5, 3, Result.NOT_PAIRED), ],
+        })
+    snapshot = TournamentSnapshotBuilder(TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file)).snapshot
+    assert snapshot.current_round == 1
+    state = _get_state(snapshot)
+    board = next(board for board in snapshot.boards if board.white_player.id == 4)
+    assert snapshot.with_result(board.id, 4, 5, Result.GAIN) is None
+    assert _get_state(snapshot) == state
+
+
+def test_with_illegal_moves_and_check_in_do_not_change_the_snapshot(snapshot: TournamentSnapshot, workspace: Path):
+    state: tuple = _get_state(snapshot)
+    new_snapshot: TournamentSnapshot = snapshot.with_illegal_moves(2, 1)
+    assert _get_state(snapshot) == state
+    assert new_snapshot.players_by_id[2].illegal_moves == 1
+    board: Board = new_snapshot.boards[new_snapshot.players_by_id[2].board_id - 1]
+    assert board.black_player is new_snapshot.players_by_id[2]
+    assert new_snapshot.with_illegal_moves(99, 1) is None
+    # the players check in before the first round only
+    assert snapshot.with_check_in(2, False) is None
+    file: Path = workspace / 'not_paired.papi'
+    write_papi_file(file, 3, {2: 'A', 3: 'B', }, {})
+    snapshot = TournamentSnapshotBuilder(TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file)).snapshot
+    state = _get_state(snapshot)
+    new_snapshot = snapshot.with_check_in(2, False)
+    assert _get_state(snapshot) == state
+    assert not new_snapshot.players_by_id[2].check_in
+    assert new_snapshot.indexes.players_by_name_with_unpaired[0] is new_snapshot.players_by_id[2]
+
+
+def test_incremental_build_reads_the_identities(snapshot: TournamentSnapshot, workspace: Path):
+    state: tuple = _get_state(snapshot)
+    file: Path = workspace / f'{TOURNAMENT_UNIQ_ID}.papi'
+    update_papi_file(file, 'UPDATE joueur SET Nom = ?, Elo = ? WHERE Ref = ?', ('AA', 2000, 6))
+    new_snapshot: TournamentSnapshot = TournamentSnapshotBuilder(
+        TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file), snapshot).snapshot
+    assert _get_state(snapshot) == state
+    assert snapshot.players_by_id[6].last_name == 'E'
+    player: Player = new_snapshot.players_by_id[6]
+    assert (player.last_name, player.rating) == ('AA', 2000)
+    assert [p.id for p in new_snapshot.indexes.players_by_name_with_unpaired] == [2, 6, 3, 4, 5, ]
+    board: Board = new_snapshot.boards[player.board_id - 1]
+    assert board.black_player is player
+    assert _get_state(new_snapshot)[2] == state[2]
+
+
+def test_warmed_snapshots_are_not_built_again(workspace: Path, papi_databases, monkeypatch):
+    file: Path = workspace / f'{TOURNAMENT_UNIQ_ID}.papi'
+    write_papi_file(file, 3, {2: 'A', 3: 'B', }, {1: [(2, 3, Result.NOT_PAIRED), ]})
+    invalid_file: Path = workspace / 'invalid.papi'
+    invalid_file.write_text('not a Papi file')
+    key: TournamentSnapshotKey = TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file)
+    # the tournaments that can not be read do not prevent the others from being built
+    data.tournament_snapshot._tournament_snapshot_store.warm(
+        [TournamentSnapshotKey(EVENT_UNIQ_ID, 'invalid', invalid_file), key, ])
+
+    def build(*args, **kwargs):
+        raise AssertionError('built on the first read')
+
+    monkeypatch.setattr(data.tournament_snapshot, 'TournamentSnapshotBuilder', build)
+    assert get_tournament_snapshot(key).current_round == 1
+
+
+def test_snapshots_not_retained_are_not_rebuilt(workspace: Path, papi_databases, monkeypatch):
+    file: Path = workspace / f'{TOURNAMENT_UNIQ_ID}.papi'
+    write_papi_file(file, 3, {2: 'A', 3: 'B', }, {1: [(2, 3, Result.NOT_PAIRED), ]})
+    # the snapshots are rebuilt by the test, not by the file watcher thread
+    monkeypatch.setattr(data.tournament_snapshot.file_watcher, 'add_listener', lambda listener: None)
+    store = data.tournament_snapshot._TournamentSnapshotStore()
+    key: TournamentSnapshotKey = TournamentSnapshotKey(EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file)
+    # the handicap settings of the tournament were changed in the INI file
+    handicap_key: TournamentSnapshotKey = TournamentSnapshotKey(
+        EVENT_UNIQ_ID, TOURNAMENT_UNIQ_ID, file, 5400, 30, 100, 60, 600)
+    store.get(key)
+    store.get(handicap_key)
+    store.retain(EVENT_UNIQ_ID, [handicap_key, ])
+    assert key not in store._snapshots and handicap_key in store._snapshots
+    assert store._keys_by_file[file] == {handicap_key, }
+    rebuilt_keys: list[TournamentSnapshotKey] = []
+    store.add_listener(lambda built_key, snapshot: rebuilt_keys.append(built_key))
+    update_papi_file(file, 'UPDATE joueur SET Nom = ? WHERE Ref = ?', ('C', 2, ))
+    store._on_file_changed(file)
+    assert rebuilt_keys == [handicap_key, ]
@@ -0,0 +1,41 @@
+"""A cache of the rendered HTML fragments of the screens, shared by all the clients."""
+from collections import OrderedDict
+from threading import Lock
+
+FRAGMENT_CACHE_SIZE: int = 256
+
+
+class _FragmentCache:
+    """A bounded LRU cache of HTML fragments, each one stored with the version of the data it was rendered from."""
+
+    def __init__(self, size: int):
+        self._size: int = size
+        self._lock: Lock = Lock()
+        self._entries: OrderedDict[tuple, tuple[int, str]] = OrderedDict()
+
+    def get(self, key: tuple, version: int) -> str | None:
+        with self._lock:
+            entry: tuple[int, str] | None = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def store(self, key: tuple, version: int, html: str):
+        with self._lock:
+            self._entries[key] = (version, html)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+
+_fragment_cache: _FragmentCache = _FragmentCache(FRAGMENT_CACHE_SIZE)
+
+
+def get_fragment(key: tuple, version: int) -> str | None:
+    """Returns the fragment rendered for the key at the given version of the data, None if not cached."""
+    return _fragment_cache.get(key, version)
+
+
+def store_fragment(key: tuple, version: int, html: str):
+    _fragment_cache.store(key, version, html)
@@ -52,6 +52,10 @@ class Message:
     def error(request: Request, text: str) -> None:
         Message._message(request, text, Message.ERROR)
 
+    @staticmethod
+    def has_messages(request: Request) -> bool:
+        return bool(request.session.get('_messages', None))
+
     @staticmethod
     def messages(request: Request) -> list:
         return request.session.pop('_messages') if '_messages' in request.session else []
@@ -12,6 +12,7 @@ from litestar.contrib.htmx.request import HTMXRequest
 
 from common.logger import get_logger
 from common.engine import Engine
+from data.event import prepare_events
 import platform
 
 from web.settings import route_handlers, template_config, middlewares
@@ -50,6 +51,8 @@ class ServerEngine(Engine):
         if self.__port_in_use(self._config.web_port):
             logger.error(f'Port [{self._config.web_port}] already in use, can not start Papi-web server')
             return
+        logger.info('Preparing the events...')
+        prepare_events()
         if self._config.web_launch_browser:
             Thread(target=launch_browser, args=(self._config.local_url, )).start()
         app: Litestar = Litestar(
@@ -1,22 +1,27 @@
+import re
 import time
 
 from litestar.contrib.htmx.request import HTMXRequest
 
-from data.event import Event
+from data.event import Event, EventSummary
 
 
 class SessionHandler:
     @staticmethod
-    def session_password_key(event: Event) -> str:
-        return 'auth-' + event.uniq_id
+    def session_password_key(event_uniq_id: str) -> str:
+        return 'auth-' + event_uniq_id
 
     @staticmethod
-    def store_password(request: HTMXRequest, event: Event, password: str | None):
-        request.session[SessionHandler.session_password_key(event)] = password
+    def store_password(request: HTMXRequest, event: Event | EventSummary, password: str | None):
+        request.session[SessionHandler.session_password_key(event.uniq_id)] = password
 
     @staticmethod
-    def get_stored_password(request: HTMXRequest, event: Event) -> str | None:
-        return request.session.get(SessionHandler.session_password_key(event), None)
+    def get_stored_password(request: HTMXRequest, event: Event | EventSummary) -> str | None:
+        return SessionHandler.get_stored_password_by_event_uniq_id(request, event.uniq_id)
+
+    @staticmethod
+    def get_stored_password_by_event_uniq_id(request: HTMXRequest, event_uniq_id: str) -> str | None:
+        return request.session.get(SessionHandler.session_password_key(event_uniq_id), None)
 
     @staticmethod
     def set_session_last_result_updated(request: HTMXRequest, tournament_uniq_id: str, round: int, board_id: int, ):
@@ -54,3 +59,36 @@ class SessionHandler:
     @staticmethod
     def get_session_last_check_in_updated(request: HTMXRequest):
         return request.session.get('last_check_in_updated', None)
+
+    @staticmethod
+    def has_recent_updates(request: HTMXRequest) -> bool:
+        """Returns True if updates made from the session are still to be highlighted."""
+        now: float = time.time()
+        for updated in (
+                SessionHandler.get_session_last_result_updated(request),
+                SessionHandler.get_session_last_illegal_move_updated(request),
+                SessionHandler.get_session_last_check_in_updated(request),
+        ):
+            if updated and updated['expiration'] > now:
+                return True
+        return False
+
+    @staticmethod
+    def highlight_recent_updates(request: HTMXRequest, html: str) -> str:
+        """Highlights the updates made from the session in a fragment rendered without them, the elements that can be
+        highlighted being marked by the classes updated-result-*, updated-illegal-moves-* and updated-check-in-*."""
+        now: float = time.time()
+        highlights: dict[str, str] = {}
+        updated: dict[str, int | str | float] | None
+        if (updated := SessionHandler.get_session_last_result_updated(request)) and updated['expiration'] > now:
+            highlights[f'updated-result-{updated["tournament_uniq_id"]}-{updated["round"]}-{updated["board_id"]}'] = \
+                'last_result_updated'
+        if (updated := SessionHandler.get_session_last_illegal_move_updated(request)) and updated['expiration'] > now:
+            highlights[f'updated-illegal-moves-{updated["tournament_uniq_id"]}-{updated["player_id"]}'] = \
+                'last_illegal_move_updated'
+        if (updated := SessionHandler.get_session_last_check_in_updated(request)) and updated['expiration'] > now:
+            highlights[f'updated-check-in-{updated["tournament_uniq_id"]}-{updated["player_id"]}'] = \
+                'last_check_in_updated'
+        for marker, css_class in highlights.items():
+            html = re.sub(rf'(?<=\s){re.escape(marker)}(?=[\s"])', rf'\g<0> {css_class}', html)
+        return html
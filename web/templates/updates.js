@@ -0,0 +1,49 @@
+var updates_connected = false;
+// the script starting the updates is run again each time the body is swapped, the connection is kept as long as the
+// url does not change and replaced when the version of the page changed
+var updates_source = null;
+var updates_url = null;
+function start_updates(url, event_types) {
+	if (!window.EventSource || url === updates_url) {
+		return;
+	}
+	if (updates_source) {
+		updates_source.close();
+	}
+	updates_connected = false;
+	updates_url = url;
+	var source = new EventSource(url);
+	updates_source = source;
+	source.onopen = function() {
+		updates_connected = true;
+	};
+	source.onerror = function() {
+		updates_connected = false;
+	};
+	event_types.forEach(function(event_type) {
+		source.addEventListener(event_type, function() {
+			htmx.trigger(document.body, 'update-' + event_type);
+		});
+	});
+}
+function results_feed_state() {
+	var rows = document.querySelectorAll('#results-rows > tr[data-result-id]');
+	if (!rows.length) {
+		return {first_id: 0, last_id: 0, count: 0};
+	}
+	return {
+		first_id: rows[rows.length - 1].dataset.resultId,
+		last_id: rows[0].dataset.resultId,
+		count: rows.length,
+	};
+}
+document.addEventListener('htmx:afterSettle', function(event) {
+	var tbody = document.getElementById('results-rows');
+	if (!tbody || event.target !== tbody) {
+		return;
+	}
+	var limit = parseInt(tbody.dataset.limit);
+	while (limit && tbody.rows.length > limit) {
+		tbody.deleteRow(-1);
+	}
+});
@@ -4,14 +4,17 @@ from typing import Annotated
 
 from litestar import get, post, Controller
 from litestar.enums import RequestEncodingType
+from litestar.middleware import MiddlewareProtocol
 from litestar.params import Body
 from litestar.response import Template, Redirect
 from litestar.contrib.htmx.request import HTMXRequest
 from litestar.contrib.htmx.response import HTMXTemplate, ClientRedirect, ClientRefresh
+from litestar.types import ASGIApp, Receive, Scope, Send
 
 from common.logger import get_logger
 from common.papi_web_config import PapiWebConfig
-from data.event import Event, get_events_sorted_by_name
+from common.read_only import read_only
+from data.event import Event, get_event, EventSummary, get_event_summary, get_event_summaries_sorted_by_name
 from data.screen import AScreen
 from database.access import access_driver, odbc_drivers
 from web.messages import Message
@@ -21,6 +24,20 @@ from web.urls import index_url
 logger: Logger = get_logger()
 
 
+class ReadOnlyMiddleware(MiddlewareProtocol):
+    """Runs the display requests (GET and HEAD) in a read-only context, where the files are never written."""
+
+    def __init__(self, app: ASGIApp):
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD', ):
+            with read_only():
+                await self.app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
+
+
 class AController(Controller):
     @staticmethod
     def _redirect_response(request: HTMXRequest, redirect_to: str) -> Redirect | ClientRedirect:
@@ -37,7 +54,7 @@ class AController(Controller):
             })
 
     @staticmethod
-    def _event_login_needed(request: HTMXRequest, event: Event, screen: AScreen | None = None) -> bool:
+    def _event_login_needed(request: HTMXRequest, event: Event | EventSummary, screen: AScreen | None = None) -> bool:
         if screen is not None:
             if not screen.update:
                 return False
@@ -70,9 +87,10 @@ class LoginController(AController):
             ],
             event_uniq_id: str,
     ) -> Template | ClientRedirect | ClientRefresh:
-        event: Event = Event(event_uniq_id, True)
-        if event.errors:
-            for error in event.errors:
+        event: EventSummary | None = get_event_summary(event_uniq_id)
+        if event is None or event.errors_number:
+            # the event is loaded only to get the error messages
+            for error in get_event(event_uniq_id, True).errors:
                 Message.error(request, error)
             return ClientRedirect(redirect_to=index_url(request))
         if data['password'] == event.update_password:
@@ -88,12 +106,14 @@ class LoginController(AController):
 
 
 class IndexController(AController):
+    middleware = [ReadOnlyMiddleware, ]
+
     @get(
         path='/',
         name='index'
     )
     async def index(self, request: HTMXRequest) -> Template:
-        events: list[Event] = get_events_sorted_by_name(True)
+        events: list[EventSummary] = get_event_summaries_sorted_by_name()
         if len(events) == 0:
             Message.error(request, 'Aucun évènement trouvé')
         return HTMXTemplate(
@@ -10,7 +10,7 @@ from litestar.contrib.htmx.response import HTMXTemplate
 
 from common.logger import get_logger
 from common.papi_web_config import PapiWebConfig
-from data.event import Event, get_events_sorted_by_name, get_events_by_uniq_id
+from data.event import Event, EventSummary, get_event, get_event_summaries_sorted_by_name
 from database.access import access_driver, odbc_drivers
 from web.messages import Message
 from web.views import AController
@@ -23,7 +23,7 @@ class AAdminController(AController):
     @staticmethod
     def _admin_render_index(
         request: HTMXRequest,
-        events: list[Event],
+        events: list[EventSummary],
         admin_main_selector: str = '',
         admin_event: Event = None,
         admin_event_selector: str = '',
@@ -65,7 +65,7 @@ class AdminController(AAdminController):
         name='admin-render-index'
     )
     async def admin_render_index(self, request: HTMXRequest) -> Template | Redirect:
-        events: list[Event] = get_events_sorted_by_name(True)
+        events: list[EventSummary] = get_event_summaries_sorted_by_name()
         return self._admin_render_index(request, events)
 
     @post(
@@ -79,17 +79,14 @@ class AdminController(AAdminController):
         admin_main_selector: str = data.get('admin_main_selector', '')
         admin_event_selector: str = data.get('admin_event_selector', '')
         admin_event: Event | None = None
-        load_screens: bool = admin_main_selector == '@events'
-        events_by_id = get_events_by_uniq_id(load_screens=load_screens, with_tournaments_only=False)
+        events: list[EventSummary] = get_event_summaries_sorted_by_name()
         if not admin_main_selector:
             pass
         elif admin_main_selector == '@events':
             pass
         else:
-            try:
-                admin_event = events_by_id[admin_main_selector]
-            except KeyError:
+            if admin_main_selector not in [event.uniq_id for event in events]:
                 Message.error(request, f'Évènement [{admin_main_selector}] introuvable')
                 return self._render_messages(request)
-        events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+            admin_event = get_event(admin_main_selector, False)
         return self._admin_render_index(request, events, admin_main_selector, admin_event, admin_event_selector)
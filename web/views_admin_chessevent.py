@@ -10,7 +10,7 @@ from litestar.contrib.htmx.response import HTMXTemplate
 
 from common.logger import get_logger
 from data.chessevent import ChessEvent
-from data.event import Event, get_events_by_uniq_id
+from data.event import Event, EventSummary, get_event, get_event_summaries_by_uniq_id
 from web.messages import Message
 from web.views_admin import AAdminController
 
@@ -80,13 +80,12 @@ class AdminChessEventController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_chessevent_uniq_id: str = data.get('admin_chessevent_uniq_id', '')
         admin_chessevent: ChessEvent | None = None
         if admin_chessevent_uniq_id:
@@ -118,13 +117,12 @@ class AdminChessEventController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_chessevent_uniq_id: str = data.get('admin_chessevent_uniq_id', '')
         admin_chessevent: ChessEvent | None = None
         if admin_chessevent_uniq_id:
@@ -147,7 +145,7 @@ class AdminChessEventController(AAdminController):
             # admin_event.chessevents[admin_chessevents.uniq_id] = admin_chessevent
             # if data['chessevent_uniq_id'] != admin_chessevent.uniq_id:
             #     delete admin_event.chessevents['chessevent_uniq_id'])
-            events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+            events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
             # return _admin_render_index(
             #     request, events, admin_event=admin_event, admin_chessevent=admin_chessevent)
             Message.error(
@@ -158,7 +156,7 @@ class AdminChessEventController(AAdminController):
             # admin_chessevent: ChessEvent = CREATE_CHESSEVENT(data)
             # Message.success(request, f'La connexion [{admin_chessevents.uniq_id}] a été créée.')
             # admin_event.chessevents[admin_chessevents.uniq_id] = admin_chessevent
-            events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+            events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
             # return _admin_render_index(
             #     request, events, admin_event=admin_event, admin_chessevent=admin_chessevent)
             Message.error(request,
@@ -211,13 +209,12 @@ class AdminChessEventController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_chessevent_uniq_id: str = data.get('admin_chessevent_uniq_id', '')
         try:
             admin_chessevent: ChessEvent = admin_event.chessevents[admin_chessevent_uniq_id]
@@ -239,13 +236,12 @@ class AdminChessEventController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_chessevent_uniq_id: str = data.get('admin_chessevent_uniq_id', '')
         try:
             admin_chessevent: ChessEvent = admin_event.chessevents[admin_chessevent_uniq_id]
@@ -262,5 +258,5 @@ class AdminChessEventController(AAdminController):
         # del admin_event.chessevents[admin_chessevent.uniq_id]
         Message.error(request,
                       f'La suppression des connexions à ChessEvent par l\'interface web n\'est pas encore implémentée.')
-        events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+        events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
         return self._admin_render_index(request, events, admin_event=admin_event, admin_event_selector='@chessevents')
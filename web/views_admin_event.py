@@ -9,7 +9,7 @@ from litestar.contrib.htmx.request import HTMXRequest
 from litestar.contrib.htmx.response import HTMXTemplate
 
 from common.logger import get_logger
-from data.event import Event, get_events_by_uniq_id
+from data.event import EventSummary, get_event, get_event_summaries_by_uniq_id
 from web.messages import Message
 from web.views_admin import AAdminController
 
@@ -19,8 +19,8 @@ logger: Logger = get_logger()
 class AdminEventController(AAdminController):
     @staticmethod
     def _admin_validate_event_update_data(
-            admin_event: Event | None,
-            events_by_id: dict[str, Event],
+            admin_event: EventSummary | None,
+            events_by_id: dict[str, EventSummary],
             data: dict[str, str] | None = None,
     ) -> dict[str, str]:
         errors: dict[str, str] = {}
@@ -56,7 +56,7 @@ class AdminEventController(AAdminController):
 
     @staticmethod
     def _admin_event_render_edit_modal(
-            admin_event: Event | None,
+            admin_event: EventSummary | None,
             data: dict[str, str] | None = None,
             errors: dict[str, str] | None = None,
     ) -> Template:
@@ -84,12 +84,12 @@ class AdminEventController(AAdminController):
             self, request: HTMXRequest,
             data: Annotated[dict[str, str], Body(media_type=RequestEncodingType.URL_ENCODED), ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        admin_event: Event | None = None
+        admin_event: EventSummary | None = None
         if admin_event_uniq_id:
             try:
-                admin_event: Event = events_by_id[admin_event_uniq_id]
+                admin_event: EventSummary = events_by_id[admin_event_uniq_id]
                 data: dict[str, str] = {
                     'event_uniq_id': admin_event.uniq_id,
                     'event_name': admin_event.name,
@@ -114,9 +114,9 @@ class AdminEventController(AAdminController):
             self, request: HTMXRequest,
             data: Annotated[dict[str, str], Body(media_type=RequestEncodingType.URL_ENCODED), ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        admin_event: Event | None = None
+        admin_event: EventSummary | None = None
         if admin_event_uniq_id:
             try:
                 admin_event = events_by_id[admin_event_uniq_id]
@@ -133,24 +133,25 @@ class AdminEventController(AAdminController):
             # events_by_id[admin_event.uniq_uniq_id] = admin_event
             # if data['event_uniq_id'] != admin_event.uniq_uniq_id:
             #     delete events_by_id['event_uniq_id'])
-            events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+            events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
             # return _admin_render_index(request, events, admin_event=admin_event)
             Message.error(
                 request, f'La modification des évènements par l\'interface web n\'est pas encore implémentée.')
-            return self._admin_render_index(request, events, admin_event=admin_event, admin_event_selector='')
+            return self._admin_render_index(
+                request, events, admin_event=get_event(admin_event.uniq_id, False), admin_event_selector='')
         else:
             # TODO Create the event
             # admin_event: Event = CREATE_EVENT(data)
             # Message.success(request, f'L\'évènement [{admin_event.uniq_uniq_id}] a été créé.')
             # events_by_id[admin_event.uniq_uniq_id] = admin_event
-            events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+            events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
             # return _admin_render_index(request, events, admin_event=admin_event)
             Message.error(request, f'La création des évènements par l\'interface web n\'est pas encore implémentée.')
             return self._admin_render_index(request, events, admin_main_selector='@events')
 
     @staticmethod
     def _admin_validate_event_delete_data(
-            admin_event: Event | None,
+            admin_event: EventSummary | None,
             data: dict[str, str] | None = None,
     ) -> dict[str, str]:
         errors: dict[str, str] = {}
@@ -165,7 +166,7 @@ class AdminEventController(AAdminController):
 
     @staticmethod
     def _admin_event_render_delete_modal(
-            admin_event: Event,
+            admin_event: EventSummary,
             data: dict[str, str] | None = None,
             errors: dict[str, str] | None = None,
     ) -> Template:
@@ -187,10 +188,10 @@ class AdminEventController(AAdminController):
             self, request: HTMXRequest,
             data: Annotated[dict[str, str], Body(media_type=RequestEncodingType.URL_ENCODED), ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
         try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
+            admin_event: EventSummary = events_by_id[admin_event_uniq_id]
         except KeyError:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
@@ -206,10 +207,10 @@ class AdminEventController(AAdminController):
             self, request: HTMXRequest,
             data: Annotated[dict[str, str], Body(media_type=RequestEncodingType.URL_ENCODED), ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
         try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
+            admin_event: EventSummary = events_by_id[admin_event_uniq_id]
         except KeyError:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
@@ -221,5 +222,5 @@ class AdminEventController(AAdminController):
         # Message.success(request, f'L\'évènement [{admin_event.uniq_uniq_id}] a été supprimé.')
         # del events_by_id[admin_event.uniq_uniq_id]
         Message.error(request, f'La suppression des évènements par l\'interface web n\'est pas encore implémentée.')
-        events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+        events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
         return self._admin_render_index(request, events, admin_main_selector='@events')
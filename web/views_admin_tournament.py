@@ -11,7 +11,7 @@ from litestar.contrib.htmx.response import HTMXTemplate
 
 from common.logger import get_logger
 from data.tournament import Tournament
-from data.event import Event, get_events_by_uniq_id
+from data.event import Event, EventSummary, get_event, get_event_summaries_by_uniq_id
 from web.messages import Message
 from web.views_admin import AAdminController
 
@@ -87,13 +87,12 @@ class AdminTournamentController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_tournament_uniq_id: str = data.get('admin_tournament_uniq_id', '')
         admin_tournament: Tournament | None = None
         if admin_tournament_uniq_id:
@@ -123,13 +122,12 @@ class AdminTournamentController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_tournament_uniq_id: str = data.get('admin_tournament_uniq_id', '')
         admin_tournament: Tournament | None = None
         if admin_tournament_uniq_id:
@@ -152,7 +150,7 @@ class AdminTournamentController(AAdminController):
             # admin_event.tournaments[admin_tournament.uniq_id] = admin_tournament
             # if data['tournament_uniq_id'] != admin_tournament.uniq_id:
             #     delete admin_event.tournaments['tournament_uniq_id'])
-            events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+            events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
             # return _admin_render_index(
             #     request, events, admin_event=admin_event, admin_tournament=admin_tournament)
             Message.error(
@@ -163,7 +161,7 @@ class AdminTournamentController(AAdminController):
             # admin_tournament: Tournament = CREATE_TOURNAMENT(data)
             # Message.success(request, f'Le tournoi [{admin_tournaments.uniq_id}] a été créé.')
             # admin_event.tournaments[admin_tournament.uniq_id] = admin_tournament
-            events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+            events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
             # return _admin_render_index(
             #     request, events, admin_event=admin_event, admin_tournament=admin_tournament)
             Message.error(request,
@@ -215,13 +213,12 @@ class AdminTournamentController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_tournament_uniq_id: str = data.get('admin_tournament_uniq_id', '')
         try:
             admin_tournament: Tournament = admin_event.tournaments[admin_tournament_uniq_id]
@@ -243,13 +240,12 @@ class AdminTournamentController(AAdminController):
                 Body(media_type=RequestEncodingType.URL_ENCODED),
             ],
     ) -> Template:
-        events_by_id: dict[str, Event] = get_events_by_uniq_id(load_screens=False, with_tournaments_only=False)
+        events_by_id: dict[str, EventSummary] = get_event_summaries_by_uniq_id()
         admin_event_uniq_id: str = data.get('admin_event_uniq_id', '')
-        try:
-            admin_event: Event = events_by_id[admin_event_uniq_id]
-        except KeyError:
+        if admin_event_uniq_id not in events_by_id:
             Message.error(request, f'L\'évènement [{admin_event_uniq_id}] est introuvable.')
             return self._render_messages(request)
+        admin_event: Event = get_event(admin_event_uniq_id, False)
         admin_tournament_uniq_id: str = data.get('admin_tournament_uniq_id', '')
         try:
             admin_tournament: Tournament = admin_event.tournaments[admin_tournament_uniq_id]
@@ -266,5 +262,5 @@ class AdminTournamentController(AAdminController):
         # del admin_event.tournaments[admin_tournament.uniq_id]
         Message.error(request,
                       f'La suppression des tournois par l\'interface web n\'est pas encore implémentée.')
-        events: list[Event] = sorted(events_by_id.values(), key=lambda event: event.name)
+        events: list[EventSummary] = sorted(events_by_id.values(), key=lambda event: event.name)
         return self._admin_render_index(request, events, admin_event=admin_event, admin_event_selector='@tournaments')
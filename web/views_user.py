@@ -1,44 +1,60 @@
+from hashlib import sha1
 from zipfile import ZipFile, ZipInfo
 from io import BytesIO
 from contextlib import suppress
 from pathlib import Path
+from collections.abc import AsyncGenerator
+from typing import Any
 
 import time
 
 from logging import Logger
 
-from litestar import get, Response, put, delete, patch
-from litestar.response import Template, Redirect, File
-from litestar.status_codes import HTTP_200_OK, HTTP_304_NOT_MODIFIED
+from litestar import get, head, Response, put, delete, patch
+from litestar.enums import MediaType
+from litestar.response import Template, Redirect, File, ServerSentEvent
+from litestar.response.sse import ServerSentEventMessage
+from litestar.status_codes import HTTP_200_OK, HTTP_204_NO_CONTENT, HTTP_304_NOT_MODIFIED
 from litestar.contrib.htmx.request import HTMXRequest
 from litestar.contrib.htmx.response import HTMXTemplate, Reswap, ClientRedirect, ClientRefresh
 
+from common.executor import run_in_executor
+from common.file_watcher import file_watcher
 from common.logger import get_logger
 from common.papi_web_config import PapiWebConfig
 from data.board import Board
-from data.event import Event
+from data.event import Event, get_event
 from data.player import Player
 from data.rotator import Rotator
 from data.screen import AScreen
 from data.screen_set import ScreenSet
 from data.tournament import Tournament
-from data.util import Result
+from data.util import Result, ScreenType
 from database.sqlite import EventDatabase
+from web.fragment_cache import get_fragment, store_fragment
 from web.messages import Message
 from web.session import SessionHandler
 from web.urls import index_url, event_url
-from web.views import AController
+from web.views import AController, ReadOnlyMiddleware
 
 logger: Logger = get_logger()
 
+# the delay after which a comment is sent to the clients of the update streams if nothing changed, to keep the
+# connections alive through the proxies
+UPDATES_KEEPALIVE_DELAY: float = 30.0
+
 
 class UserController(AController):
+    middleware = [ReadOnlyMiddleware, ]
+
     @get(
         path='/event/{event_uniq_id:str}',
         name='render-event'
     )
     async def render_event(self, request: HTMXRequest, event_uniq_id: str) -> Template | Redirect:
-        event: Event = Event(event_uniq_id, True)
+        # the version is read before loading the event, so that the changes made while loading are not missed
+        version: int = file_watcher.current_version
+        event: Event = await run_in_executor(get_event, event_uniq_id, True)
         if event.errors:
             for error in event.errors:
                 Message.error(request, error)
@@ -50,37 +66,78 @@ class UserController(AController):
                 'event': event,
                 'messages': Message.messages(request),
                 'now': time.time(),
+                'version': version,
             })
 
     @get(
-        path='/render-event-if-updated/{event_uniq_id:str}/{date:float}',
+        path='/render-event-if-updated/{event_uniq_id:str}/{version:int}',
         name='render-event-if-updated',
     )
     async def htmx_render_event_if_updated(
-            self, request: HTMXRequest, event_uniq_id: str, date: float
+            self, request: HTMXRequest, event_uniq_id: str, version: int
     ) -> Template | ClientRefresh | Reswap:
         file_dependencies: list[Path] = Event.get_event_file_dependencies(event_uniq_id)
         if file_dependencies:
-            try:
-                last_update: float = file_dependencies[0].lstat().st_mtime
-                for dependency in file_dependencies[1:]:
-                    with suppress(FileNotFoundError):
-                        last_update = max(last_update, dependency.lstat().st_mtime)
-                        if last_update > date:
-                            return ClientRefresh()
-                return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
-            except FileNotFoundError as fnfe:
-                Message.warning(request, f'Fichier [{fnfe.filename}] non trouvé')
+            file_watcher.watch(file_dependencies)
+            if file_watcher.version(file_dependencies) > version:
+                return ClientRefresh()
+            return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
         else:
             Message.error(
                 request, f'Aucune dépendance de fichier trouvée pour l\'évènement [{event_uniq_id}]')
         return self._render_messages(request)
 
+    @staticmethod
+    def _get_etag(request: HTMXRequest, event_uniq_id: str, file_dependencies: list[Path]) -> str | None:
+        """Returns a strong entity tag for a response built from the file dependencies, or None if the response
+        depends on the session (messages, updates to highlight) and can not be validated."""
+        if not file_dependencies or Message.has_messages(request) or SessionHandler.has_recent_updates(request):
+            return None
+        password: str = SessionHandler.get_stored_password_by_event_uniq_id(request, event_uniq_id) or ''
+        return (f'"{file_watcher.uniq_id}-{file_watcher.version(file_dependencies)}'
+                f'-{sha1(password.encode()).hexdigest()[:8]}"')
+
+    @staticmethod
+    def _etag_headers(etag: str | None) -> dict[str, str]:
+        return {'ETag': etag, 'Cache-Control': 'no-cache', } if etag else {}
+
+    @staticmethod
+    def _etag_matches(request: HTMXRequest, etag: str | None) -> bool:
+        if etag is None:
+            return False
+        if_none_match: str | None = request.headers.get('If-None-Match', None)
+        if not if_none_match:
+            return False
+        return if_none_match.strip() == '*' or etag in [
+            tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+
+    def _not_modified_or_head_response(self, request: HTMXRequest, etag: str | None) -> Response[None]:
+        """Answers a HEAD request, or a GET request matching its entity tag."""
+        return Response(
+            content=None,
+            status_code=HTTP_304_NOT_MODIFIED if self._etag_matches(request, etag) else HTTP_200_OK,
+            headers=self._etag_headers(etag))
+
+    @staticmethod
+    def _get_screen_file_dependencies(event_uniq_id: str, screen_id: str) -> list[Path]:
+        """Returns the file dependencies of a whole screen page, including the ones of its sets."""
+        file_dependencies: list[Path] = AScreen.get_screen_file_dependencies(event_uniq_id, screen_id)
+        if file_dependencies:
+            screen_set_id: int = 0
+            while screen_set_file_dependencies := ScreenSet.get_screen_set_file_dependencies(
+                    event_uniq_id, screen_id, screen_set_id):
+                file_dependencies += screen_set_file_dependencies
+                screen_set_id += 1
+            file_watcher.watch(file_dependencies)
+        return file_dependencies
+
     def _render_screen(
             self, request: HTMXRequest,
             event: Event,
+            version: int,
             screen: AScreen = None,
             rotator: Rotator = None, rotator_screen_index: int = 0,
+            etag: str | None = None,
     ) -> Template:
         the_screen: AScreen = screen if screen else rotator.screens[rotator_screen_index]
         login_needed: bool = self._event_login_needed(request, event, the_screen)
@@ -91,6 +148,7 @@ class UserController(AController):
                 'event': event,
                 'screen': the_screen,
                 'now': time.time(),
+                'version': version,
                 'login_needed': login_needed,
                 'rotator': rotator,
                 'rotator_screen_index': rotator_screen_index,
@@ -98,20 +156,38 @@ class UserController(AController):
                 'last_illegal_move_updated': SessionHandler.get_session_last_illegal_move_updated(request),
                 'last_check_in_updated': SessionHandler.get_session_last_check_in_updated(request),
                 'messages': Message.messages(request),
-            })
+            },
+            headers=self._etag_headers(etag))
+
+    @head(
+        path='/screen/{event_uniq_id:str}/{screen_id:str}',
+    )
+    async def head_screen(self, request: HTMXRequest, event_uniq_id: str, screen_id: str) -> Response[None]:
+        file_dependencies: list[Path] = self._get_screen_file_dependencies(event_uniq_id, screen_id)
+        return self._not_modified_or_head_response(
+            request, self._get_etag(request, event_uniq_id, file_dependencies))
 
     @get(
         path='/screen/{event_uniq_id:str}/{screen_id:str}',
         name='render-screen',
     )
-    async def render_screen(self, request: HTMXRequest, event_uniq_id: str, screen_id: str) -> Template | Redirect:
-        event: Event = Event(event_uniq_id, True)
+    async def render_screen(
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str
+    ) -> Template | Redirect | Response[None]:
+        file_dependencies: list[Path] = self._get_screen_file_dependencies(event_uniq_id, screen_id)
+        # the version and the entity tag only depend on the file dependencies (when known), so that the same data
+        # always give the same page
+        version: int = file_watcher.version(file_dependencies) if file_dependencies else file_watcher.current_version
+        etag: str | None = self._get_etag(request, event_uniq_id, file_dependencies)
+        if self._etag_matches(request, etag):
+            return self._not_modified_or_head_response(request, etag)
+        event: Event = await run_in_executor(get_event, event_uniq_id, True, screen_id=screen_id)
         error: str
         redirect_to: str
         if not event.errors:
             try:
                 screen: AScreen = event.screens[screen_id]
-                return self._render_screen(request, event=event, screen=screen, )
+                return self._render_screen(request, event=event, version=version, screen=screen, etag=etag, )
             except KeyError:
                 error = f'écran [{screen_id}] introuvable'
                 redirect_to = event_url(request, event_uniq_id)
@@ -123,11 +199,11 @@ class UserController(AController):
         return Redirect(path=redirect_to)
 
     @get(
-        path='/render-screen-if-updated/{event_uniq_id:str}/{screen_id:str}/{date:float}',
+        path='/render-screen-if-updated/{event_uniq_id:str}/{screen_id:str}/{version:int}',
         name='render-screen-if-updated',
     )
     async def htmx_render_screen_if_updated(
-            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, date: float
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, version: int
     ) -> Template | ClientRefresh | Reswap:
         file_dependencies: list[Path] = AScreen.get_screen_file_dependencies(
             event_uniq_id, screen_id)
@@ -136,27 +212,110 @@ class UserController(AController):
                 request,
                 f'Aucune dépendance de fichier trouvée pour l\'écran [{screen_id}] de l\'évènement [{event_uniq_id}]')
         else:
-            try:
-                for dependency in file_dependencies:
-                    with suppress(FileNotFoundError):
-                        if dependency.lstat().st_mtime > date:
-                            return ClientRefresh()
-                return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
-            except FileNotFoundError as fnfe:
-                Message.warning(request, f'Fichier [{fnfe.filename}] non trouvé')
+            file_watcher.watch(file_dependencies)
+            if file_watcher.version(file_dependencies) > version:
+                return ClientRefresh()
+            return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
         return self._render_messages(request)
 
+    @get(
+        path='/render-results-since/{event_uniq_id:str}/{screen_id:str}/{version:int}',
+        name='render-results-since',
+    )
+    async def htmx_render_results_since(
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, version: int,
+            first_id: int = 0, last_id: int = 0, count: int = 0,
+    ) -> Template | ClientRefresh | Reswap:
+        """Renders the results entered after the result last_id, the screen showing count results from the result
+        first_id to the result last_id."""
+        file_dependencies: list[Path] = AScreen.get_screen_file_dependencies(event_uniq_id, screen_id)
+        if not file_dependencies:
+            Message.error(
+                request,
+                f'Aucune dépendance de fichier trouvée pour l\'écran [{screen_id}] de l\'évènement [{event_uniq_id}]')
+            return self._render_messages(request)
+        file_watcher.watch(file_dependencies)
+        files_version: int = file_watcher.version(file_dependencies)
+        if files_version <= version:
+            return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
+        # the screen is reloaded when its configuration changed, only the results markers are followed here
+        if file_watcher.version(file for file in file_dependencies if file.suffix != '.marker') > version:
+            return ClientRefresh()
+        event: Event = await run_in_executor(get_event, event_uniq_id, True, screen_id=screen_id)
+        screen: AScreen | None = event.screens.get(screen_id) if not event.errors else None
+        if screen is None or screen.type != ScreenType.Results or not screen.results_feed:
+            return ClientRefresh()
+        # the screen is also reloaded when results were deleted
+        if count and await run_in_executor(screen.count_results, first_id, last_id) != count:
+            return ClientRefresh()
+        return HTMXTemplate(
+            template_name='results_screen_rows.html',
+            context={
+                'event': event,
+                'screen': screen,
+                'results': await run_in_executor(screen.get_results_since, last_id),
+                'version': files_version,
+            })
+
+    @staticmethod
+    async def _stream_updates(
+            file_dependencies_by_event_type: dict[str, list[Path]], version: int
+    ) -> AsyncGenerator[ServerSentEventMessage, None]:
+        """Sends an event each time the file dependencies of an event type change after the given version."""
+        versions: dict[str, int] = {event_type: version for event_type in file_dependencies_by_event_type}
+        files: list[Path] = list(dict.fromkeys(
+            file for file_dependencies in file_dependencies_by_event_type.values() for file in file_dependencies))
+        file_watcher.watch(files)
+        while True:
+            version = await file_watcher.wait_for_change(files, version, UPDATES_KEEPALIVE_DELAY)
+            updated: bool = False
+            for event_type, file_dependencies in file_dependencies_by_event_type.items():
+                event_type_version: int = file_watcher.version(file_dependencies)
+                if event_type_version > versions[event_type]:
+                    versions[event_type] = event_type_version
+                    updated = True
+                    yield ServerSentEventMessage(data=str(event_type_version), event=event_type)
+            if not updated:
+                yield ServerSentEventMessage(comment='keepalive')
+
+    @get(
+        path='/event-updates/{event_uniq_id:str}/{version:int}',
+        name='event-updates',
+    )
+    async def event_updates(self, event_uniq_id: str, version: int) -> ServerSentEvent | Response:
+        file_dependencies: list[Path] = Event.get_event_file_dependencies(event_uniq_id)
+        if not file_dependencies:
+            return Response(content=None, status_code=HTTP_204_NO_CONTENT)
+        return ServerSentEvent(self._stream_updates({'event': file_dependencies, }, version))
+
+    @get(
+        path='/screen-updates/{event_uniq_id:str}/{screen_id:str}/{version:int}',
+        name='screen-updates',
+    )
+    async def screen_updates(self, event_uniq_id: str, screen_id: str, version: int) -> ServerSentEvent | Response:
+        file_dependencies: list[Path] = AScreen.get_screen_file_dependencies(event_uniq_id, screen_id)
+        if not file_dependencies:
+            return Response(content=None, status_code=HTTP_204_NO_CONTENT)
+        file_dependencies_by_event_type: dict[str, list[Path]] = {'screen': file_dependencies, }
+        event: Event = await run_in_executor(get_event, event_uniq_id, True, screen_id=screen_id)
+        if screen_id in event.screens:
+            for screen_set in event.screens[screen_id].sets:
+                file_dependencies_by_event_type[f'screen-set-{screen_set.id}'] = \
+                    ScreenSet.get_screen_set_file_dependencies(event_uniq_id, screen_id, screen_set.id)
+        return ServerSentEvent(self._stream_updates(file_dependencies_by_event_type, version))
+
     def _render_rotator_screen(
             self, request: HTMXRequest, event_uniq_id: str, rotator_id: str, rotator_screen_index: int = 0,
     ) -> Template | Redirect | ClientRedirect:
-        event: Event = Event(event_uniq_id, True)
+        version: int = file_watcher.current_version
+        event: Event = get_event(event_uniq_id, True, rotator_id=rotator_id)
         error: str
         redirect_to: str
         if not event.errors:
             try:
                 rotator: Rotator = event.rotators[rotator_id]
                 return self._render_screen(
-                    request, event=event, rotator=rotator,
+                    request, event=event, version=version, rotator=rotator,
                     rotator_screen_index=rotator_screen_index % len(rotator.screens))
             except KeyError:
                 error = f'écran rotatif [{rotator_id}] introuvable'
@@ -175,7 +334,7 @@ class UserController(AController):
     async def render_rotator(
             self, request: HTMXRequest, event_uniq_id: str, rotator_id: str
     ) -> Template | Redirect:
-        return self._render_rotator_screen(request, event_uniq_id, rotator_id)
+        return await run_in_executor(self._render_rotator_screen, request, event_uniq_id, rotator_id)
 
     @get(
         path='/render-rotator-screen/{event_uniq_id:str}/{rotator_id:str}/{rotator_screen_index:int}',
@@ -184,13 +343,14 @@ class UserController(AController):
     async def htmx_render_rotator_screen(
             self, request: HTMXRequest, event_uniq_id: str, rotator_id: str, rotator_screen_index: int
     ) -> Template | ClientRedirect:
-        return self._render_rotator_screen(request, event_uniq_id, rotator_id, rotator_screen_index)
+        return await run_in_executor(
+            self._render_rotator_screen, request, event_uniq_id, rotator_id, rotator_screen_index)
 
     def _load_boards_screen_board_result_modal_data(
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, board_id: int, screen_id: str,
     ) -> tuple[Event | None, Tournament | None, Board | None, AScreen | None, ]:
         error: str
-        event: Event = Event(event_uniq_id, True)
+        event: Event = get_event(event_uniq_id, True, screen_id=screen_id)
         if not event.errors:
             if not self._event_login_needed(request, event):
                 try:
@@ -241,7 +401,8 @@ class UserController(AController):
     async def htmx_render_boards_screen_board_result_modal(
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, board_id: int, screen_id: str,
     ) -> Template:
-        event, tournament, board, screen = self._load_boards_screen_board_result_modal_data(
+        event, tournament, board, screen = await run_in_executor(
+            self._load_boards_screen_board_result_modal_data,
             request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
         if event is None:
             return self._render_messages(request)
@@ -251,7 +412,7 @@ class UserController(AController):
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, board_id: int, screen_id: str,
     ) -> tuple[Event | None, Tournament | None, Board | None, AScreen | None]:
         error: str
-        event: Event = Event(event_uniq_id, True)
+        event: Event = get_event(event_uniq_id, True, screen_id=screen_id)
         if not event.errors:
             if not self._event_login_needed(request, event):
                 try:
@@ -277,19 +438,17 @@ class UserController(AController):
         Message.error(request, f'L\'écriture du résultat à échoué ({error})')
         return None, None, None, None,
 
+    @staticmethod
     def _render_boards_screen_board_row(
-            self,
             request: HTMXRequest,
-            event_uniq_id: str,
-            tournament_uniq_id: str,
+            event: Event,
+            tournament: Tournament,
             board_id: int,
-            screen_id: str,
+            screen: AScreen,
     ) -> Template:
+        """Renders the row of a board after a change, from the tournament updated in memory."""
         template_name: str = 'boards_screen_board_row.html'
-        event, tournament, board, screen = self._load_boards_screen_board_row_data(
-            request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
-        if event is None:
-            return self._render_messages(request)
+        board: Board = tournament.boards[board_id - 1]
         return HTMXTemplate(
             template_name=template_name,
             context={
@@ -317,17 +476,17 @@ class UserController(AController):
             self, request: HTMXRequest,
             event_uniq_id: str, tournament_uniq_id: str, round: int, board_id: int, result: int | None, screen_id: str,
     ) -> Template:
-        event, tournament, board, screen = self._load_boards_screen_board_row_data(
-            request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
+        event, tournament, board, screen = await run_in_executor(
+            self._load_boards_screen_board_row_data, request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
         if event is None:
             return self._render_messages(request)
         if result not in Result.imputable_results():
             Message.error(
                 request, f'L\'écriture du résultat a échoué (résultat invalide [{result}])')
             return self._render_messages(request)
-        tournament.add_result(board, Result.from_papi_value(result))
+        await run_in_executor(tournament.add_result, board, Result.from_papi_value(result))
         SessionHandler.set_session_last_result_updated(request, tournament_uniq_id, round, board_id)
-        return self._render_boards_screen_board_row(request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
+        return self._render_boards_screen_board_row(request, event, tournament, board_id, screen)
 
     @delete(
         path='/board-result/{event_uniq_id:str}/{tournament_uniq_id:str}/{round:int}/{board_id:int}/{screen_id:str}',
@@ -338,20 +497,20 @@ class UserController(AController):
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, round: int, board_id: int,
             screen_id: str,
     ) -> Template:
-        event, tournament, board, screen = self._load_boards_screen_board_row_data(
-            request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
+        event, tournament, board, screen = await run_in_executor(
+            self._load_boards_screen_board_row_data, request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
         if event is None:
             return self._render_messages(request)
         with suppress(ValueError):
-            tournament.delete_result(board)
+            await run_in_executor(tournament.delete_result, board)
             SessionHandler.set_session_last_result_updated(request, tournament_uniq_id, round, board_id)
-        return self._render_boards_screen_board_row(request, event_uniq_id, tournament_uniq_id, board_id, screen_id)
+        return self._render_boards_screen_board_row(request, event, tournament, board_id, screen)
 
     def _load_boards_screen_board_row_illegal_move_data(
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, player_id: int, screen_id: str,
     ) -> tuple[Event | None, Tournament | None, Player | None, Board | None, AScreen | None]:
         error: str
-        event: Event = Event(event_uniq_id, True)
+        event: Event = get_event(event_uniq_id, True, screen_id=screen_id)
         if not event.errors:
             if not self._event_login_needed(request, event):
                 try:
@@ -391,13 +550,14 @@ class UserController(AController):
     async def htmx_add_illegal_move(
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, player_id: int, screen_id: str,
     ) -> Template:
-        event, tournament, player, board, screen = self._load_boards_screen_board_row_illegal_move_data(
+        event, tournament, player, board, screen = await run_in_executor(
+            self._load_boards_screen_board_row_illegal_move_data,
             request, event_uniq_id, tournament_uniq_id, player_id, screen_id)
         if event is None:
             return self._render_messages(request)
-        tournament.store_illegal_move(player)
+        await run_in_executor(tournament.store_illegal_move, player)
         SessionHandler.set_session_last_illegal_move_updated(request, tournament_uniq_id, player_id)
-        return self._render_boards_screen_board_row(request, event_uniq_id, tournament_uniq_id, board.id, screen_id)
+        return self._render_boards_screen_board_row(request, event, tournament, board.id, screen)
 
     @delete(
         path='/player-illegal-move/{event_uniq_id:str}/{tournament_uniq_id:str}/{player_id:int}/{screen_id:str}',
@@ -407,23 +567,24 @@ class UserController(AController):
     async def htmx_delete_illegal_move(
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, player_id: int, screen_id: str,
     ) -> Template:
-        event, tournament, player, board, screen = self._load_boards_screen_board_row_illegal_move_data(
+        event, tournament, player, board, screen = await run_in_executor(
+            self._load_boards_screen_board_row_illegal_move_data,
             request, event_uniq_id, tournament_uniq_id, player_id, screen_id)
         if event is None:
             return self._render_messages(request)
-        if not tournament.delete_illegal_move(player):
+        if not await run_in_executor(tournament.delete_illegal_move, player):
             Message.error(
                 request,
                 f'Pas de coup illégal trouvé pour le·la joueur·euse {player_id} dans le tournoi [{tournament.uniq_id}]')
             return self._render_messages(request)
         SessionHandler.set_session_last_illegal_move_updated(request, tournament_uniq_id, player_id)
-        return self._render_boards_screen_board_row(request, event_uniq_id, tournament_uniq_id, board.id, screen_id)
+        return self._render_boards_screen_board_row(request, event, tournament, board.id, screen)
 
     def _load_boards_screen_player_row_player_cell_data(
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, player_id: int, screen_id: str,
     ) -> tuple[Event | None, Tournament | None, Player | None, AScreen | None]:
         error: str
-        event: Event = Event(event_uniq_id, True)
+        event: Event = get_event(event_uniq_id, True, screen_id=screen_id)
         if not event.errors:
             if not self._event_login_needed(request, event):
                 try:
@@ -449,14 +610,13 @@ class UserController(AController):
         Message.error(request, f'L\'opération a échoué ({error})')
         return None, None, None, None,
 
+    @staticmethod
     def _render_boards_screen_player_row_player_cell(
-            self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str, player_id: int, screen_id: str,
+            request: HTMXRequest, event: Event, tournament: Tournament, player_id: int, screen: AScreen,
     ) -> Template:
+        """Renders the cell of a player after a change, from the tournament updated in memory."""
         template_name: str = 'boards_screen_player_row_player_cell.html'
-        event, tournament, player, screen = self._load_boards_screen_player_row_player_cell_data(
-            request, event_uniq_id, tournament_uniq_id, player_id, screen_id)
-        if event is None:
-            return self._render_messages(request)
+        player: Player = tournament.players_by_id[player_id]
         return HTMXTemplate(
             template_name=template_name,
             context={
@@ -475,21 +635,32 @@ class UserController(AController):
     async def htmx_toggle_player_check_in(
             self, request: HTMXRequest, event_uniq_id: str, screen_id: str, tournament_uniq_id: str, player_id: int
     ) -> Template:
-        event, tournament, player, screen = self._load_boards_screen_player_row_player_cell_data(
+        event, tournament, player, screen = await run_in_executor(
+            self._load_boards_screen_player_row_player_cell_data,
             request, event_uniq_id, tournament_uniq_id, player_id, screen_id)
         if not event:
             return self._render_messages(request)
-        tournament.check_in_player(player, not player.check_in)
+        await run_in_executor(tournament.check_in_player, player, not player.check_in)
         SessionHandler.set_session_last_check_in_updated(request, tournament_uniq_id, player_id)
-        return self._render_boards_screen_player_row_player_cell(
-            request, event_uniq_id, tournament_uniq_id, player_id, screen_id)
+        return self._render_boards_screen_player_row_player_cell(request, event, tournament, player_id, screen)
+
+    def _head_screen_set(
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int
+    ) -> Response[None]:
+        file_dependencies: list[Path] = ScreenSet.get_screen_set_file_dependencies(
+            event_uniq_id, screen_id, screen_set_id)
+        if file_dependencies:
+            file_dependencies += AScreen.get_screen_file_dependencies(event_uniq_id, screen_id)
+            file_watcher.watch(file_dependencies)
+        return self._not_modified_or_head_response(
+            request, self._get_etag(request, event_uniq_id, file_dependencies))
 
     @staticmethod
     def _load_boards_or_players_screen_set_data(
             request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int,
     ) -> tuple[Event | None, AScreen | None, ScreenSet | None, ]:
         error: str
-        event: Event = Event(event_uniq_id, True)
+        event: Event = get_event(event_uniq_id, True, screen_id=screen_id)
         if not event.errors:
             try:
                 screen: AScreen = event.screens[screen_id]
@@ -506,96 +677,115 @@ class UserController(AController):
             request, f'La mise à jour de l\'écran [{event_uniq_id}/{screen_id}/{screen_set_id}] a échoué ({error})')
         return None, None, None,
 
+    @head(
+        path='/render-boards-screen-set-if-updated'
+             '/{event_uniq_id:str}'
+             '/{screen_id:str}'
+             '/{screen_set_id:int}'
+             '/{version:int}',
+    )
+    async def head_boards_screen_set(
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int, version: int
+    ) -> Response[None]:
+        return self._head_screen_set(request, event_uniq_id, screen_id, screen_set_id)
+
     @get(
         path='/render-boards-screen-set-if-updated'
              '/{event_uniq_id:str}'
              '/{screen_id:str}'
              '/{screen_set_id:int}'
-             '/{date:float}',
+             '/{version:int}',
         name='render-boards-screen-set-if-updated',
     )
     async def htmx_render_boards_screen_set_if_updated(
-            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int, date: float
-    ) -> Template | Reswap:
-        file_dependencies: list[Path] = ScreenSet.get_screen_set_file_dependencies(
-            event_uniq_id, screen_id, screen_set_id)
-        if not file_dependencies:
-            Message.error(
-                request,
-                f'Aucune dépendance de fichier trouvée pour l\'ensemble [{screen_set_id}] '
-                f'de l\'écran [{screen_id}] de l\'évènement [{event_uniq_id}]')
-            return self._render_messages(request)
-        try:
-            last_update: float = file_dependencies[0].lstat().st_mtime
-            for dependency in file_dependencies[1:]:
-                with suppress(FileNotFoundError):
-                    last_update = max(last_update, dependency.lstat().st_mtime)
-            if last_update < date:
-                return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
-        except FileNotFoundError as fnfe:
-            Message.warning(request, f'Fichier [{fnfe.filename}] non trouvé')
-            return self._render_messages(request)
-        template_name: str = 'boards_screen_set.html'
-        event, screen, screen_set = self._load_boards_or_players_screen_set_data(
-            request, event_uniq_id, screen_id, screen_set_id)
-        if event is None:
-            return self._render_messages(request)
-        return HTMXTemplate(
-            template_name=template_name,
-            context={
-                'event': event,
-                'screen': screen,
-                'screen_set': screen_set,
-                'now': time.time(),
-                'last_result_updated': SessionHandler.get_session_last_result_updated(request),
-                'last_illegal_move_updated': SessionHandler.get_session_last_illegal_move_updated(request),
-                'last_check_in_updated': SessionHandler.get_session_last_check_in_updated(request),
-            },
-        )
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int, version: int
+    ) -> Template | Reswap | Response:
+        return await run_in_executor(
+            self._render_screen_set_if_updated,
+            request, 'boards_screen_set.html', event_uniq_id, screen_id, screen_set_id, version)
+
+    @head(
+        path='/render-players-screen-set-if-updated'
+             '/{event_uniq_id:str}'
+             '/{screen_id:str}'
+             '/{screen_set_id:int}'
+             '/{version:int}',
+    )
+    async def head_players_screen_set(
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int, version: int
+    ) -> Response[None]:
+        return self._head_screen_set(request, event_uniq_id, screen_id, screen_set_id)
 
     @get(
         path='/render-players-screen-set-if-updated'
              '/{event_uniq_id:str}'
              '/{screen_id:str}'
              '/{screen_set_id:int}'
-             '/{date:float}',
+             '/{version:int}',
         name='render-players-screen-set-if-updated',
     )
     async def htmx_render_players_screen_set_if_updated(
-            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int, date: float
-    ) -> Template | Reswap:
+            self, request: HTMXRequest, event_uniq_id: str, screen_id: str, screen_set_id: int, version: int
+    ) -> Template | Reswap | Response:
+        return await run_in_executor(
+            self._render_screen_set_if_updated,
+            request, 'players_screen_set.html', event_uniq_id, screen_id, screen_set_id, version)
+
+    def _render_screen_set_if_updated(
+            self, request: HTMXRequest, template_name: str, event_uniq_id: str, screen_id: str, screen_set_id: int,
+            version: int,
+    ) -> Template | Reswap | Response:
         file_dependencies: list[Path] = ScreenSet.get_screen_set_file_dependencies(
             event_uniq_id, screen_id, screen_set_id)
         if not file_dependencies:
             Message.error(
                 request,
-                f'Aucune dépendance de fichier trouvée pour l\'ensemble [{screen_set_id}] de l\'écran [{screen_id}] '
-                f'de l\'évènement [{event_uniq_id}]')
-            return self._render_messages(request)
-        try:
-            last_update: float = file_dependencies[0].lstat().st_mtime
-            for dependency in file_dependencies[1:]:
-                with suppress(FileNotFoundError):
-                    last_update = max(last_update, dependency.lstat().st_mtime)
-            if last_update < date:
-                return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
-        except FileNotFoundError as fnfe:
-            Message.warning(request, f'Fichier [{fnfe.filename}] non trouvé')
-            return self._render_messages(request)
-        template_name: str = 'players_screen_set.html'
-        event, screen, screen_set = self._load_boards_or_players_screen_set_data(
-            request, event_uniq_id, screen_id, screen_set_id)
-        if event is None:
+                f'Aucune dépendance de fichier trouvée pour l\'ensemble [{screen_set_id}] '
+                f'de l\'écran [{screen_id}] de l\'évènement [{event_uniq_id}]')
             return self._render_messages(request)
-        return HTMXTemplate(
-            template_name=template_name,
-            context={
+        file_watcher.watch(file_dependencies)
+        files_version: int = file_watcher.version(file_dependencies)
+        if files_version <= version:
+            return Reswap(content=None, method='none', status_code=HTTP_304_NOT_MODIFIED)
+        # the rendering also depends on the configuration of the screen
+        fragment_files: list[Path] = file_dependencies + AScreen.get_screen_file_dependencies(event_uniq_id, screen_id)
+        file_watcher.watch(fragment_files)
+        fragment_version: int = file_watcher.version(fragment_files)
+        etag: str | None = self._get_etag(request, event_uniq_id, fragment_files)
+        if self._etag_matches(request, etag):
+            return self._not_modified_or_head_response(request, etag)
+        # the fragments are shared by all the sessions, the updates of the session are highlighted afterwards
+        fragment_key: tuple = (template_name, event_uniq_id, screen_id, screen_set_id, )
+        if (html := get_fragment(fragment_key, fragment_version)) is None:
+            event, screen, screen_set = self._load_boards_or_players_screen_set_data(
+                request, event_uniq_id, screen_id, screen_set_id)
+            if event is None:
+                return self._render_messages(request)
+            context: dict[str, Any] = {
                 'event': event,
                 'screen': screen,
                 'screen_set': screen_set,
                 'now': time.time(),
-            },
-        )
+                'version': files_version,
+                'last_result_updated': None,
+                'last_illegal_move_updated': None,
+                'last_check_in_updated': None,
+            }
+            html = request.app.template_engine.get_template(template_name).render(**context, request=request)
+            store_fragment(fragment_key, fragment_version, html)
+        return Response(
+            content=SessionHandler.highlight_recent_updates(request, html), media_type=MediaType.HTML,
+            headers=self._etag_headers(etag))
+
+    @staticmethod
+    def _zip_files(files: list[Path]) -> bytes:
+        archive = BytesIO()
+        with ZipFile(archive, 'w') as zip_archive:
+            for file in files:
+                zip_entry: ZipInfo = ZipInfo(file.name)
+                with open(file, 'rb') as handler:
+                    zip_archive.writestr(zip_entry, handler.read())
+        return bytes(archive.getbuffer())
 
     @get(
         path='/download-event-tournaments/{event_uniq_id:str}',
@@ -605,7 +795,7 @@ class UserController(AController):
             self, request: HTMXRequest, event_uniq_id: str
     ) -> Response[bytes] | Template:
         error: str
-        event: Event = Event(event_uniq_id, True)
+        event: Event = await run_in_executor(get_event, event_uniq_id, False)
         if not event.errors:
             tournament_files: list[Path] = [
                 tournament.file
@@ -613,14 +803,8 @@ class UserController(AController):
                 if tournament.file.exists()
             ]
             if tournament_files:
-                archive = BytesIO()
-                with ZipFile(archive, 'w') as zip_archive:
-                    for tournament_file in tournament_files:
-                        zip_entry: ZipInfo = ZipInfo(tournament_file.name)
-                        with open(tournament_file, 'rb') as tournament_handler:
-                            zip_archive.writestr(
-                                zip_entry, tournament_handler.read())
-                return Response(content=bytes(archive.getbuffer()), media_type='application/zip')
+                return Response(
+                    content=await run_in_executor(self._zip_files, tournament_files), media_type='application/zip')
             else:
                 error = f'Aucun fichier de tournoi pour l\'évènement [{event_uniq_id}]'
         else:
@@ -638,7 +822,7 @@ class UserController(AController):
             self, request: HTMXRequest, event_uniq_id: str, tournament_uniq_id: str
     ) -> File | Template:
         error: str
-        event: Event = Event(event_uniq_id, True)
+        event: Event = await run_in_executor(get_event, event_uniq_id, False)
         if not event.errors:
             try:
                 tournament: Tournament = event.tournaments[tournament_uniq_id]